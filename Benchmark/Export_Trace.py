@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：Export_Trace.py
+@Time: 10/20/2026 10:05 AM
+@Author: Mingchen Li
+"""
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from meterbrick.instrumentation import export_chrome_trace, summarize_trace
+
+# Directory given in METERBRICK_TRACE when the traced scripts were run
+TRACE_DIR = os.path.join("..", "Trace")
+
+if __name__ == "__main__":
+    # Chrome trace of all processes, to open in chrome://tracing or https://ui.perfetto.dev
+    n_events = export_chrome_trace(TRACE_DIR, os.path.join(TRACE_DIR, "trace.json"))
+    print(f"{n_events} events written to {os.path.join(TRACE_DIR, 'trace.json')}")
+
+    # Time, rows and bytes of every step, the slowest first
+    summary = summarize_trace(TRACE_DIR)
+    summary.to_csv(os.path.join(TRACE_DIR, "trace_summary.csv"), index=False)
+    print(summary.to_string(index=False))
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：Load_Test.py
+@Time: 10/20/2026 4:30 PM
+@Author: Mingchen Li
+"""
+import asyncio
+import time
+from urllib.parse import quote
+
+# Address of the query service started with "python -m meterbrick serve"
+HOST = "127.0.0.1"
+PORT = 8765
+# Number of concurrent connections (keep-alive) and total number of requests
+CONCURRENCY = 32
+N_REQUESTS = 2000
+
+# Requests sent in turn; repeated requests are answered from the response cache
+TARGETS = [
+    "/meters?entity=Zone_E_Lift_27_28_Elect&through=hasPart",
+    "/meters?entity=Student_Hall_10_GGT_1F_Bedroom_and_Toilets",
+    "/series?entity=Student_Hall_10_GGT_1F_Bedroom_and_Toilets&freq=H&kw=1",
+    "/sparql?q=" + quote("SELECT ?building WHERE { ?building a brick:Building . }"),
+]
+
+
+async def client(queue, latencies, statuses):
+    """
+    Send the requests of the queue over one keep-alive connection.
+    """
+    reader, writer = await asyncio.open_connection(HOST, PORT)
+    try:
+        while True:
+            try:
+                target = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            start = time.perf_counter()
+            writer.write(f"GET {target} HTTP/1.1\r\nHost: {HOST}\r\n\r\n".encode())
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            content_length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.lower() == "content-length":
+                    content_length = int(value)
+            await reader.readexactly(content_length)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def main():
+    queue = asyncio.Queue()
+    for i in range(N_REQUESTS):
+        queue.put_nowait(TARGETS[i % len(TARGETS)])
+
+    latencies = []
+    statuses = {}
+    start = time.perf_counter()
+    await asyncio.gather(*(client(queue, latencies, statuses) for _ in range(CONCURRENCY)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"{len(latencies)} requests in {elapsed:.2f} s: {len(latencies) / elapsed:.0f} requests/s")
+    print(f"Status codes: {statuses}")
+    for percentile in (50, 90, 99):
+        print(f"p{percentile} latency: {latencies[int(len(latencies) * percentile / 100) - 1] * 1000:.1f} ms")
+    print(f"max latency: {latencies[-1] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
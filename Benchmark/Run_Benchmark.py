@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：Run_Benchmark.py
+@Time: 10/19/2026 11:00 PM
+@Author: Mingchen Li
+"""
+import os
+import shutil
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from meterbrick.aggregation import aggregate_entities, entity_meter_sets
+from meterbrick.benchmark import Benchmark, compare_runs, load_results, previous_run
+from meterbrick.evaluation import (daily_zone_readings, load_zone_table, write_zone_data, zone_mae_percentages,
+                                   zone_meter_sets)
+from meterbrick.graph import load_graph
+from meterbrick.interpolation import NO_GAP_LIMIT
+from meterbrick.matrix import build_meter_matrix
+from meterbrick.missing_rate import multi_resolution_missing_rates
+from meterbrick.resampling import run_resampling, summarize_results
+from meterbrick.rollup import rollup_loader
+from meterbrick.synthetic import generate_campus
+from meterbrick.topology import TopologyIndex
+
+# Number of meters of the synthetic campus (e.g. 100, 1000, 10000 or 50000)
+N_METERS = 100
+# Days of raw data of every meter
+DAYS = 120
+# Seed of the synthetic campus
+SEED = 0
+# Number of worker processes (memory is only profiled in this process, so 1 profiles everything)
+N_WORKERS = 1
+# Record the peak memory of every stage (tracing slows down the stages that read Excel files)
+TRACE_MEMORY = True
+# The synthetic campus is generated once per configuration and reused by later runs
+WORK_DIR = os.path.join("..", ".meterbrick_cache", "benchmark", f"campus_{N_METERS}_{DAYS}_{SEED}")
+# Every run is appended to this file (ignored by git, the timings are specific to the machine)
+# and compared with the previous run of the same configuration
+RESULTS_FILE = "benchmark_results.jsonl"
+
+# Difference every meter before summing, as Evaluation/Data_Calculation.py
+METER_DELTAS = True
+
+if __name__ == "__main__":
+    benchmark = Benchmark({'n_meters': N_METERS, 'days': DAYS, 'seed': SEED, 'n_workers': N_WORKERS,
+                           'meter_deltas': METER_DELTAS},
+                          trace_memory=TRACE_MEMORY)
+
+    ttl_path = os.path.join(WORK_DIR, "Synthetic_Meter_Metadata.ttl")
+    raw_dir = os.path.join(WORK_DIR, "Raw_data")
+    if not os.path.exists(ttl_path):
+        with benchmark.stage("generate"):
+            generate_campus(WORK_DIR, N_METERS, days=DAYS, seed=SEED, n_workers=N_WORKERS)
+
+    # Outputs of the previous run are removed, so every run does the same work
+    store_dir = os.path.join(WORK_DIR, "Resampled Data")
+    output_dir = os.path.join(WORK_DIR, "Output")
+    for path in (store_dir, output_dir):
+        shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(output_dir)
+
+    # Data Resampling.py (with the meter rollups read by the later stages)
+    with benchmark.stage("resampling"):
+        file_paths = sorted(os.path.join(raw_dir, file_name) for file_name in os.listdir(raw_dir))
+        results = run_resampling(file_paths, store_dir, n_workers=N_WORKERS, rollups=True)
+        sampling_info, empty_data, duplicated_time, failed_files = summarize_results(results)
+
+    # Parse the TTL file without the snapshot cache
+    with benchmark.stage("graph_load"):
+        g = load_graph(ttl_path, use_cache=False)
+
+    # Zone query of Data_Calculation.py
+    with benchmark.stage("zone_query"):
+        zone_meters, zone_has_meters = zone_meter_sets(g)
+
+    with benchmark.stage("topology"):
+        topology = TopologyIndex.from_graph(g)
+
+    # Missing_Rate_Sampling_Times.py (calculate_quarterly_missing_rates at every sampling time)
+    with benchmark.stage("missing_rate"):
+        file_sampling_times = [(file_name.replace('GUI_NO.', ''), sampling_time)
+                               for file_name, sampling_time in sampling_info]
+        missing_rates = multi_resolution_missing_rates(file_sampling_times, store_dir=store_dir,
+                                                       n_workers=N_WORKERS)
+
+    # Data_Calculation.py and Relative Error.py
+    with benchmark.stage("zone_evaluation"):
+        daily_readings = daily_zone_readings(zone_meters, zone_has_meters,
+                                             os.path.join(output_dir, "daily_first_readings"),
+                                             loader=rollup_loader('D', 'first', store_dir))
+        zone_dir = os.path.join(output_dir, "Zone_Data")
+        write_zone_data(zone_meters, zone_has_meters, daily_readings, zone_dir, meter_deltas=METER_DELTAS)
+        zone_table, zones = load_zone_table(zone_dir)
+        zone_results = zone_mae_percentages(zone_table, zones)
+    print(f"Average MAE %: {zone_results['mae_percentage'].mean():.2f}%")
+
+    # Lighting Analysis.py (lighting meters of every floor of every building)
+    with benchmark.stage("floor_aggregation"):
+        floors = sorted(topology.entities_of_type("Floor"))
+        floor_meters = entity_meter_sets(topology, entities=floors, equipment_type="Lighting")
+        all_meters = sorted(set(meter for meters in floor_meters.values() for meter in meters))
+        meter_matrix = build_meter_matrix(all_meters, os.path.join(output_dir, "lighting_meter_matrix"),
+                                          freq='H', loader=rollup_loader('H', 'mean', store_dir),
+                                          max_gap=NO_GAP_LIMIT)
+        floor_aggregation = aggregate_entities(floor_meters, meter_matrix, uris=topology.uris)
+
+    # Record the run and compare it with the previous run of the same configuration
+    previous = previous_run(load_results(RESULTS_FILE), benchmark.config)
+    current = benchmark.save(RESULTS_FILE)
+    if previous is not None:
+        print(f"Compared with {previous['time']} (commit {previous['commit']}):")
+        for name, before, after, ratio, regression in compare_runs(previous, current):
+            flag = "  <-- regression" if regression else ""
+            print(f"  {name}: {before:.2f} s -> {after:.2f} s ({ratio:.2f}x){flag}")
@@ -6,91 +6,79 @@
 @Author: Mingchen Li
 """
 import os
+import sys
 import pandas as pd
-from tqdm import tqdm
-import gc
-import math
 
-# Get the current working directory
-row_data_path = os.getcwd() + r"\Raw_data"
-current_directory = os.getcwd()
-empty_data = []
-duplicated_time = []
-# Get the list of all files and directories in this directory
-file_names = os.listdir(row_data_path)
-
-# Initialize a list to store file names and sampling times
-sampling_info = []
-
-print("List of files and directories in the directory:", file_names)
-
-# Loop through all the file names in the file_names list
-for i in tqdm(range(0, len(file_names)), desc="Processing files"):
-    # Construct the path to the file
-    temp_path = row_data_path + "\\" + file_names[i]
-    # Read the data from the Excel file
-    data = pd.read_excel(temp_path, sheet_name='Sheet1')
-
-    # Check if the data has less than 20 rows
-    if len(data) < 100:
-        print(f"File skipped due to insufficient data: {file_names[i]}")
-        empty_data.append(file_names[i])
-        continue  # Skip to the next iteration
-
-    # Convert the 'time' column to datetime
-    data['time'] = pd.to_datetime(data['time'])
-    # Set the 'time' column as the index
-    data.set_index('time', inplace=True)
-
-    # Remove duplicate timestamps
-    if data.index.duplicated().any():
-        # print(f"File: {file_names[i]} contains duplicate timestamps. These records will be excluded.")
-        duplicated_time.append(file_names[i])
-        data = data.loc[~data.index.duplicated(keep='first')]
-
-    last_times = data.index[-100:]
-    # Calculate time differences
-    time_deltas = last_times.to_series().diff().dt.total_seconds().dropna()
-
-    # Find the most common time interval (in seconds)
-    most_common_interval = time_deltas.mode()[0]
-
-    # Convert seconds to minutes
-    interval_in_minutes = most_common_interval / 60
-
-    # Check if interval is approximately 15, 30, or 60 minutes using a tolerance
-    if math.isclose(interval_in_minutes, 15, abs_tol=0.9):
-        sampling_time = '15T'
-    elif math.isclose(interval_in_minutes, 30, abs_tol=0.9):
-        sampling_time = '30T'
-    elif math.isclose(interval_in_minutes, 60, abs_tol=0.9):
-        sampling_time = '60T'
-    elif math.isclose(interval_in_minutes, 1440, abs_tol=0.9):
-        sampling_time = '1440T'
-    else:
-        sampling_time = '60T'  # Default value
-    # Add file name and sampling time to the list
-    sampling_info.append([file_names[i], sampling_time])
-
-
-    # Resample the data to 15-minute averages
-    resampled_data = data.resample(sampling_time).mean()
-    # Construct the path for the output file
-    save_file_path = current_directory + "\\Resampled Data" + "\\" + file_names[i].split('.')[1] + '.xlsx'
-    # save_file_path = current_directory + "\\Data\\Resampled Data" + "\\" + file_names[i].split('.')[1] + '.xlsx'
-    # Save the resampled data to an Excel file
-    resampled_data.to_excel(save_file_path)
-
-    gc.collect()
-# Final statement to indicate completion
-
-# Convert the list to a DataFrame
-df_sampling_info = pd.DataFrame(sampling_info, columns=['File Name', 'Sampling Time'])
-
-# Save the DataFrame to an Excel file
-output_path = current_directory + "\\Sampling_Info.xlsx"
-df_sampling_info.to_excel(output_path, index=False)
-
-print("All files processed and saved.")
-print("Files with insufficient data:", empty_data)
-# print("Files with duplicate timestamps:", duplicated_time)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from meterbrick.manifest import MANIFEST_FILE_NAME, ResamplingManifest
+from meterbrick.resampling import run_resampling, summarize_results
+from meterbrick.rollup import ENTITY_THROUGH, write_entity_rollups
+from meterbrick.storage import script_store_dir
+
+# Number of worker processes (1 processes the files one by one in this process)
+N_WORKERS = os.cpu_count() or 1
+# Address-space cap of each worker process in MB (None for no limit, ignored on Windows). This is
+# RLIMIT_AS: it limits virtual memory, not RSS, so set it well above the expected resident memory
+MAX_WORKER_MEMORY_MB = None
+# Raw files of at least this size (MB) are read in chunks of CHUNK_ROWS rows (None reads every file at once)
+CHUNKED_MIN_FILE_MB = 100
+CHUNK_ROWS = 200_000
+# Skip raw files that are unchanged since the last run (False reprocesses everything)
+INCREMENTAL = True
+# Write the hourly, daily and monthly rollups of every meter and of the Brick entities of the graph
+BUILD_ROLLUPS = True
+# Metadata giving the meters of the entities (the entity rollups are skipped if it is missing)
+TTL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "HKUST_Meter_Metadata.ttl")
+
+if __name__ == "__main__":
+    # Get the current working directory
+    row_data_path = os.getcwd() + r"\Raw_data"
+    current_directory = os.getcwd()
+    # "Resampled Data" in the working directory, unless the command line gives the store
+    resampled_data_path = script_store_dir(os.path.join(current_directory, "Resampled Data"))
+    # Get the list of all files and directories in this directory
+    file_names = os.listdir(row_data_path)
+
+    print("List of files and directories in the directory:", file_names)
+
+    # The manifest records every processed file, so unchanged files are skipped
+    # and an interrupted run resumes where it stopped
+    manifest = None
+    if INCREMENTAL:
+        manifest = ResamplingManifest(os.path.join(current_directory, MANIFEST_FILE_NAME))
+
+    # Resample the new or modified files, spread over N_WORKERS processes
+    file_paths = [os.path.join(row_data_path, file_name) for file_name in file_names]
+    results = run_resampling(file_paths, resampled_data_path, n_workers=N_WORKERS,
+                             max_worker_memory_mb=MAX_WORKER_MEMORY_MB, manifest=manifest,
+                             chunked_min_mb=CHUNKED_MIN_FILE_MB, chunk_rows=CHUNK_ROWS,
+                             rollups=BUILD_ROLLUPS)
+    # With a manifest, the results cover all files, so Sampling_Info.xlsx is rebuilt from it
+    sampling_info, empty_data, duplicated_time, failed_files = summarize_results(results)
+
+    # Convert the list to a DataFrame
+    df_sampling_info = pd.DataFrame(sampling_info, columns=['File Name', 'Sampling Time'])
+
+    # Save the DataFrame to an Excel file
+    output_path = current_directory + "\\Sampling_Info.xlsx"
+    df_sampling_info.to_excel(output_path, index=False)
+
+    # Rollups of every entity with meters (the meters located in it or in its parts), summed from
+    # the meter rollups; only the entities with a meter reprocessed in this run are rewritten
+    if BUILD_ROLLUPS and not os.path.exists(TTL_PATH):
+        print(f"Warning: {TTL_PATH} not found, the entity rollups are not written "
+              f"(the meter rollups are).")
+    elif BUILD_ROLLUPS:
+        # Imported here, so resampling without the entity rollups does not need rdflib
+        from meterbrick.aggregation import entity_meter_sets
+        from meterbrick.topology import load_topology
+
+        topology = load_topology(TTL_PATH)
+        n_written, n_fresh = write_entity_rollups(entity_meter_sets(topology, through=ENTITY_THROUGH),
+                                                  resampled_data_path)
+        print(f"Rollups written for {n_written} entities ({n_fresh} up to date).")
+
+    print("All files processed and saved.")
+    print("Files with insufficient data:", empty_data)
+    print("Files that failed to process:", failed_files)
+    # print("Files with duplicate timestamps:", duplicated_time)
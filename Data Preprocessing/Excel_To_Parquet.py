@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：Excel_To_Parquet.py
+@Time: 10/18/2026 9:40 AM
+@Author: Mingchen Li
+
+One-shot conversion of an existing "Resampled Data/*.xlsx" tree into the
+Parquet store read by the analysis scripts.
+"""
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from meterbrick.storage import convert_excel_tree
+
+if __name__ == "__main__":
+    # The Parquet files are written next to the Excel files they are converted from
+    resampled_data_path = os.path.join(os.getcwd(), "Resampled Data")
+
+    failed_files = convert_excel_tree(resampled_data_path)
+
+    print("All files converted.")
+    print("Files that could not be converted:", failed_files)
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：Sampling_Interval_Scan.py
+@Time: 10/18/2026 2:10 PM
+@Author: Mingchen Li
+
+Fast scan of "Raw_data" that only detects the sampling time of every meter and
+writes Sampling_Info.xlsx, without loading or resampling the data.
+"""
+import os
+import sys
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from meterbrick.interval_scan import scan_sampling_times
+from meterbrick.storage import script_store_dir
+
+# Number of worker processes (1 scans the files one by one in this process)
+N_WORKERS = os.cpu_count() or 1
+
+if __name__ == "__main__":
+    # Get the current working directory
+    row_data_path = os.getcwd() + r"\Raw_data"
+    current_directory = os.getcwd()
+    # Get the list of all files and directories in this directory
+    file_names = os.listdir(row_data_path)
+
+    # Files resampled since their last change take their sampling time from the store of Data Resampling.py
+    resampled_data_path = script_store_dir(os.path.join(current_directory, "Resampled Data"))
+
+    file_paths = [os.path.join(row_data_path, file_name) for file_name in file_names]
+    results = scan_sampling_times(file_paths, n_workers=N_WORKERS, store_dir=resampled_data_path)
+
+    sampling_info = [[result['file_name'], result['sampling_time']] for result in results
+                     if result['status'] == 'ok']
+    empty_data = [result['file_name'] for result in results if result['status'] == 'empty']
+    failed_files = [(result['file_name'], result['error']) for result in results
+                    if result['status'] == 'failed']
+
+    # Convert the list to a DataFrame
+    df_sampling_info = pd.DataFrame(sampling_info, columns=['File Name', 'Sampling Time'])
+
+    # Save the DataFrame to an Excel file
+    output_path = current_directory + "\\Sampling_Info.xlsx"
+    df_sampling_info.to_excel(output_path, index=False)
+
+    print("All files scanned.")
+    print("Files with insufficient data:", empty_data)
+    print("Files that failed to scan:", failed_files)
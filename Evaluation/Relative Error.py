@@ -1,9 +1,18 @@
 import pandas as pd
 import numpy as np
 import os
-from sklearn.metrics import mean_absolute_error
+import sys
 from tqdm import tqdm
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from meterbrick.evaluation import load_zone_table, zone_mae_percentages
+from meterbrick.outliers import IQRFilter
+
+# Evaluate all zones at once with grouped operations (False evaluates one file at a time)
+BATCH = True
+# Rank error of the quartiles of the outlier filter (None computes exact quartiles)
+SKETCH_EPSILON = None
+
 
 def calculate_metrics(file_path):
     """
@@ -22,20 +31,16 @@ def calculate_metrics(file_path):
     # Calculate the difference between total_kwh and sub_meter_kwh
     df['difference'] = df['total_kwh'] - df['sub_meter_kwh']
 
-    # Remove outliers using the 1.5*IQR method
-    Q1 = df['difference'].quantile(0.25)  # First quartile (25th percentile)
-    Q3 = df['difference'].quantile(0.75)  # Third quartile (75th percentile)
-    IQR = Q3 - Q1  # Interquartile Range
-    lower_bound = Q1 - 1.5 * IQR  # Define the lower bound for outliers
-    upper_bound = Q3 + 1.5 * IQR  # Define the upper bound for outliers
-    df_filtered = df[(df['difference'] >= lower_bound) & (df['difference'] <= upper_bound)]  # Filter out outliers
+    # Remove outliers using the 1.5*IQR method (quartiles from a quantile sketch)
+    outlier_filter = IQRFilter(epsilon=SKETCH_EPSILON).update(df['difference'])
+    df_filtered = df[outlier_filter.mask(df['difference'])]  # Filter out outliers
 
     # Check if there are enough data points left after filtering
     if df_filtered.shape[0] < 2:
         return None  # Return None if there are insufficient data points for evaluation
 
     # Calculate Mean Absolute Error (MAE)
-    mae = mean_absolute_error(df_filtered['total_kwh'], df_filtered['sub_meter_kwh'])
+    mae = np.mean(np.abs(df_filtered['total_kwh'] - df_filtered['sub_meter_kwh']))
 
     # Calculate the mean of both total_kwh and sub_meter_kwh columns
     mean_total_kwh = np.mean(df_filtered['total_kwh'])
@@ -83,11 +88,25 @@ def process_all_files(directory):
     return average_mae_percentage  # Return the average MAE percentage
 
 
-# Set the directory containing the CSV files
-csv_directory = "Zone_Data"
+if __name__ == "__main__":
+    # Set the directory containing the CSV files
+    csv_directory = "Zone_Data"
 
-# Process all files and calculate the average MAE percentage across the files
-average_mae_percentage = process_all_files(csv_directory)
+    if BATCH:
+        # Load all zones into one table and evaluate them together
+        zone_table, zones = load_zone_table(csv_directory)
+        zone_results = zone_mae_percentages(zone_table, zones, epsilon=SKETCH_EPSILON)
+        for row in zone_results.itertuples():
+            if np.isnan(row.mae_percentage):
+                print(f"File: {row.zone}, Insufficient data for evaluation")
+            else:
+                print(f"File: {row.zone}, MAE %: {row.mae_percentage:.2f}%")
+        # Save the per-zone results table
+        zone_results.to_csv("Relative_Error_Results.csv", index=False)
+        average_mae_percentage = zone_results['mae_percentage'].mean()
+    else:
+        # Process all files and calculate the average MAE percentage across the files
+        average_mae_percentage = process_all_files(csv_directory)
 
-# Print the final average MAE percentage
-print(f"Average MAE %: {average_mae_percentage:.2f}%")
+    # Print the final average MAE percentage
+    print(f"Average MAE %: {average_mae_percentage:.2f}%")
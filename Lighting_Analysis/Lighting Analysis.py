@@ -5,94 +5,87 @@
 @Time: 05/16/2024 4:34 PM
 @Author: Mingchen Li
 """
-import pandas as pd
-from rdflib import Graph
-import matplotlib.pyplot as plt
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from meterbrick.aggregation import aggregate_entities, entity_meter_sets
+from meterbrick.deltas import count_flags, delta_matrix
+from meterbrick.interpolation import NO_GAP_LIMIT, max_gaps, read_sampling_times
+from meterbrick.loader import MeterLoader
+from meterbrick.matrix import build_meter_matrix
+from meterbrick.outliers import IQRFilter
+from meterbrick.rollup import rollup_loader
+from meterbrick.storage import script_store_dir
+from meterbrick.topology import load_topology
 
 # List of floor information
 Floor_Info = ['GF', '1F', '2F', '3F', '4F', '5F', '6F', '7F']
 
-def get_data_from_excel_file_with_str(Lighting_name):
-    """
-    Get data from an Excel file based on the lighting name.
-
-    Args:
-        Lighting_name (str): The name of the lighting device.
-
-    Returns:
-        pd.DataFrame: The data from the Excel file.
-    """
-    Lighting_name = Lighting_name.split("_")[-1] + ".xlsx"
-    # Load the data from the Excel file
-    data = pd.read_excel("../Resampled Data/" + Lighting_name)
-    data = data.interpolate(method='linear')
-    return data
-
-# Open and parse the TTL file
-with open("../HKUST_Meter_Metadata.ttl", "r", encoding="utf-8") as file:
-    ttl_data = file.read()
-    g = Graph()
-    g.parse(data=ttl_data, format='ttl')
-
-for Floor in Floor_Info:
-    print(Floor)
-
-    # SPARQL query to select all related components
-    query_all = f"""
-        SELECT  ?meter
-        WHERE {{
-            bldg:Academic_Building_{Floor}  brick:isLocationOf*  ?Light  .
-            ?Light a brick:Lighting .
-            ?Light brick:isMeteredBy ?meter .
-        }}
-    """
-    results_all = g.query(query_all)
-    AcadBldg_With_Lighting = list(set(row['meter'] for row in results_all))
-    # print(AcadBldg_With_Lighting)
-
-    dfs = []
-    for i in range(0, len(AcadBldg_With_Lighting)):
-        Single_Meter = AcadBldg_With_Lighting[i].split("#")[-1]
-        print(Single_Meter)
-        try:
-            data = get_data_from_excel_file_with_str(Single_Meter)
-        except FileNotFoundError:
-            continue  # Skip to the next iteration if the file is not found
-        except Exception as e:
-            continue  # Skip to the next iteration for any other exceptions
-        df = pd.DataFrame(data)
-        dfs.append(df)
-
-    # Step 1: Resample each DataFrame to hourly intervals
-    resampled_dfs = []
-    for df in dfs:
-        # Convert the 'time' column to DateTime type and set it as the index
-        df['time'] = pd.to_datetime(df['time'])
-        df.set_index('time', inplace=True)
-
-        # Resample to hourly intervals and take the mean value
-        resampled_df = df.resample('H').mean()
-
-        # Collect the resampled DataFrame
-        resampled_dfs.append(resampled_df)
-
-    # Step 2: Align and merge all DataFrames by time
-    aligned_df = pd.concat(resampled_dfs, axis=1)
-
-    # Step 3: Sum horizontally to get a new column and delete other columns
-    aligned_df['All_kWh'] = aligned_df.sum(axis=1)
-    final_df = aligned_df[['All_kWh']]
-    final_df.reset_index(inplace=True)  # Reset index to make 'time' a regular column
-
-    # Calculate hourly differences to convert to kW
-    final_df['kW'] = final_df['All_kWh'].diff().fillna(0)
-
-    # Remove outliers using the IQR method
-    Q1 = final_df['kW'].quantile(0.25)
-    Q3 = final_df['kW'].quantile(0.75)
-    IQR = Q3 - Q1
-    filter = (final_df['kW'] >= Q1 - 1.5 * IQR) & (final_df['kW'] <= Q3 + 1.5 * IQR)
-    final_df_cleaned = final_df[filter]
-
-    # Save the cleaned final result to a CSV file
-    final_df_cleaned.to_csv(f'final_data_{Floor}.csv', index=False)
+# Rank error of the quartiles of the outlier filter (None computes exact quartiles)
+SKETCH_EPSILON = None
+# Longest gap filled by interpolation, in sampling intervals of each meter (Sampling_Info.xlsx),
+# e.g. 8; longer outages are left missing. None interpolates every gap
+MAX_GAP_SAMPLES = None
+# Difference every meter before summing, with counter resets and rollovers corrected
+# (False takes the difference of the summed readings)
+METER_DELTAS = True
+# Read the hourly means of the meters from the hourly rollups of Data Resampling.py and fill the gaps
+# on the hourly grid (False interpolates the resampled data of every meter before taking the hourly mean)
+USE_ROLLUPS = True
+
+if __name__ == "__main__":
+    # Load the topology index of the RDF graph (from the cached snapshot when the TTL file is unchanged)
+    topology = load_topology("../HKUST_Meter_Metadata.ttl")
+
+    # Lighting meters of every floor, the same as the SPARQL pattern
+    # "bldg:Academic_Building_{Floor} brick:isLocationOf* ?Light . ?Light a brick:Lighting . ?Light brick:isMeteredBy ?meter"
+    Floor_Entities = {Floor: f"Academic_Building_{Floor}" for Floor in Floor_Info}
+    Floor_Meters = entity_meter_sets(topology, entities=Floor_Entities.values(), equipment_type="Lighting")
+
+    # Resample the (interpolated) data of the meters of all floors to hourly intervals once,
+    # on a shared time grid stored as a memory-mapped meter x time matrix
+    All_Meters = sorted(set(meter for meters in Floor_Meters.values() for meter in meters))
+    # Maximum gap of every meter from its sampling time
+    max_gap = None
+    if MAX_GAP_SAMPLES is not None:
+        max_gap = max_gaps(All_Meters, read_sampling_times("../Data Preprocessing/Sampling_Info.xlsx"),
+                           MAX_GAP_SAMPLES)
+    matrix_path = os.path.join("..", ".meterbrick_cache", "lighting_meter_matrix")
+    # The store of the command line, or "../Resampled Data"
+    store_dir = script_store_dir()
+    if USE_ROLLUPS:
+        # Hourly means read from the hourly rollups, every gap filled on the grid unless limited
+        meter_matrix = build_meter_matrix(All_Meters, matrix_path, freq='H',
+                                          loader=rollup_loader('H', 'mean', store_dir),
+                                          max_gap=max_gap if max_gap is not None else NO_GAP_LIMIT)
+    else:
+        meter_matrix = build_meter_matrix(All_Meters, matrix_path, freq='H', max_gap=max_gap,
+                                          loader=MeterLoader(store_dir).load)
+
+    # Sum the hourly data of the meters of every floor in one sparse matrix product
+    floor_aggregation = aggregate_entities(Floor_Meters, meter_matrix, uris=topology.uris)
+    if METER_DELTAS:
+        # Hourly consumption of every meter (counter resets and rollovers corrected), summed per floor
+        meter_deltas, flags = delta_matrix(meter_matrix)
+        print("Counter corrections:", count_flags(flags))
+        floor_deltas = aggregate_entities(Floor_Meters, meter_deltas, uris=topology.uris)
+
+    for Floor in Floor_Info:
+        print(Floor)
+
+        # Summed hourly data of the meters of the floor as 'All_kWh'
+        final_df = floor_aggregation.series(Floor_Entities[Floor]).rename('All_kWh').reset_index()
+
+        # Calculate hourly differences to convert to kW
+        if METER_DELTAS:
+            final_df['kW'] = floor_deltas.series(Floor_Entities[Floor]).to_numpy()
+        else:
+            final_df['kW'] = final_df['All_kWh'].diff().fillna(0)
+
+        # Remove outliers using the IQR method
+        outlier_filter = IQRFilter(epsilon=SKETCH_EPSILON).update(final_df['kW'])
+        final_df_cleaned = final_df[outlier_filter.mask(final_df['kW'])]
+
+        # Save the cleaned final result to a CSV file
+        final_df_cleaned.to_csv(f'final_data_{Floor}.csv', index=False)
@@ -6,90 +6,38 @@
 @Author: Mingchen Li
 """
 import os
+import sys
 import pandas as pd
-from tqdm import tqdm
-import gc
 
-# Get the current working directory
-resampled_data_path = os.getcwd() + r"\Resampled Data"
-current_directory = os.getcwd()
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from meterbrick.missing_rate import category_missing_rates
+from meterbrick.storage import script_store_dir
 
-# Get the list of all files and directories in this directory
-file_names = os.listdir(resampled_data_path)
+# Number of worker processes (1 processes the files in this process)
+N_WORKERS = os.cpu_count() or 1
 
-# Initialize a list to store the results
-results = []
+if __name__ == "__main__":
+    # "Resampled Data" in the working directory, unless the command line gives the store
+    resampled_data_path = script_store_dir(os.getcwd() + r"\Resampled Data")
 
-# Load meter category data
-data_check = pd.read_excel("meter_category.xlsx")
+    # Load meter category data
+    data_check = pd.read_excel("meter_category.xlsx")
 
-# Group files by category
-categories = data_check['Category'].unique()
-category_files = {category: data_check[data_check['Category'] == category]['Meter'].tolist() for category in categories}
+    # Group the meter IDs by category
+    categories = data_check['Category'].unique()
+    category_meters = {category: [file_name.split('_')[1]
+                                  for file_name in data_check[data_check['Category'] == category]['Meter']]
+                       for category in categories}
 
-# Define a function to calculate quarterly missing rates
-def calculate_quarterly_missing_rates(file_names, resample_freq='H'):
-    quarterly_missing_rates = {}
+    # Create new output directory if not exists
+    new_output_dir = "Building_Missing_Rate"
+    if not os.path.exists(new_output_dir):
+        os.makedirs(new_output_dir)
 
-    for file_name in tqdm(file_names):
-        file_name = file_name.split('_')[1]
-        file_path = os.path.join(resampled_data_path, file_name + ".xlsx")
+    # Each meter is read once, even when it belongs to several categories
+    category_results = category_missing_rates(category_meters, store_dir=resampled_data_path,
+                                              n_workers=N_WORKERS)
+    for category, results in category_results.items():
+        results.to_csv(f"{new_output_dir}/average_quarterly_missing_rates_{category}.csv", index=False)
 
-        # Check if the file exists, if not, skip it
-        if not os.path.exists(file_path):
-            print(f"File {file_path} does not exist. Skipping.")
-            continue
-
-        # Read file data
-        df = pd.read_excel(file_path)
-
-        # Convert 'time' column to datetime type
-        df['time'] = pd.to_datetime(df['time'], errors='coerce')
-
-        # Drop rows with invalid 'time'
-        df = df.dropna(subset=['time'])
-
-        # Filter out unreasonable years (e.g., before 2022)
-        df = df[df['time'].dt.year >= 2022]
-
-        # Check if data is already daily, if so, skip resampling
-        if df['time'].dt.date.nunique() == df.shape[0]:
-            resample_freq = None
-
-        # Resample if necessary
-        if resample_freq:
-            df = df.set_index('time').resample(resample_freq).first().reset_index()
-
-        # Group by quarter and calculate missing rate for each quarter
-        df['quarter'] = df['time'].dt.to_period('Q')
-        missing_rates = df.groupby('quarter')['number'].apply(lambda x: x.isna().mean())
-
-        # Add results to quarterly_missing_rates dictionary
-        for quarter, rate in missing_rates.items():
-            if quarter not in quarterly_missing_rates:
-                quarterly_missing_rates[quarter] = []
-            quarterly_missing_rates[quarter].append(rate)
-
-        # Free memory
-        gc.collect()
-
-    # Calculate the average missing rate for each quarter
-    average_quarterly_missing_rates = {quarter: sum(rates) / len(rates) for quarter, rates in quarterly_missing_rates.items()}
-
-    # Convert the dictionary to a sorted DataFrame
-    results_df = pd.DataFrame(list(average_quarterly_missing_rates.items()), columns=['Quarter', 'Average Missing Rate'])
-    results_df = results_df.sort_values(by='Quarter')
-
-    return results_df
-
-# Create new output directory if not exists
-new_output_dir = "Building_Missing_Rate"
-if not os.path.exists(new_output_dir):
-    os.makedirs(new_output_dir)
-
-# Calculate and save the results for each category
-for category, files in category_files.items():
-    results = calculate_quarterly_missing_rates(files)
-    results.to_csv(f"{new_output_dir}/average_quarterly_missing_rates_{category}.csv", index=False)
-
-print("Average quarterly missing rates have been calculated and saved for each category in the new directory.")
+    print("Average quarterly missing rates have been calculated and saved for each category in the new directory.")
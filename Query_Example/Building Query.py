@@ -5,47 +5,22 @@
 @Time: 05/27/2024 11:01 AM
 @Author: Mingchen Li
 """
-import pandas as pd
-from rdflib import Graph
-import matplotlib.pyplot as plt
+import os
+import sys
 
-def get_data_from_excel_file_with_str(Lighting_name):
-    """
-    Load data from an Excel file based on the lighting name.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from meterbrick.graph import load_graph
+from meterbrick.queries import buildings
 
-    Args:
-        Lighting_name (str): The name of the lighting device.
 
-    Returns:
-        pd.DataFrame: The data from the Excel file.
-    """
-    # Extract the specific part of the lighting name and append the .xlsx extension
-    Lighting_name = Lighting_name.split("_")[-1] + ".xlsx"
-    # Load the data from the specified Excel file
-    data = pd.read_excel("../Resampled Data/" + Lighting_name)
-    # Perform linear interpolation to fill in any missing data points
-    data = data.interpolate(method='linear')
-    return data
+def main():
+    # Load the RDF graph (from the cached snapshot when the TTL file is unchanged)
+    g = load_graph("../HKUST_Meter_Metadata.ttl")
 
-# Open and parse the TTL file containing metadata
-with open("../HKUST_Meter_Metadata.ttl", "r", encoding="utf-8") as file:
-    ttl_data = file.read()
-    g = Graph()
-    # Parse the TTL data to create a graph
-    g.parse(data=ttl_data, format='ttl')
+    # SPARQL query to select all buildings, printing only the building names
+    for building in buildings(g):
+        print(building)
 
-# SPARQL query to select all buildings
-query_all = f"""
-    SELECT ?building
-    WHERE {{
-        ?building a brick:Building .
-    }}
-"""
-
-# Execute the SPARQL query
-result = g.query(query_all)
 
-# Iterate through the results and print the building names
-for i in result:
-    # Split the building URI and print only the building name
-    print(i['building'].split("#")[-1])
+if __name__ == "__main__":
+    main()
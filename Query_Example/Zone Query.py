@@ -6,92 +6,29 @@
 @Author: Mingchen Li
 """
 
-import pandas as pd
-from rdflib import Graph
-import matplotlib.pyplot as plt
+import os
+import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from meterbrick.graph import load_graph
+from meterbrick.queries import building_zones, other_zones, zone_meters
 
-def get_data_from_excel_file_with_str(Lighting_name):
-    """
-    Load data from an Excel file based on the lighting name.
 
-    Args:
-        Lighting_name (str): The name of the lighting device.
+def main():
+    # Load the RDF graph (from the cached snapshot when the TTL file is unchanged) with the
+    # transitive closures materialized, so the property paths become single-hop lookups
+    g = load_graph("../HKUST_Meter_Metadata.ttl", materialize=True)
 
-    Returns:
-        pd.DataFrame: The data from the Excel file.
-    """
-    # Extract the specific part of the lighting name and append the .xlsx extension
-    Lighting_name = Lighting_name.split("_")[-1] + ".xlsx"
-    # Load the data from the specified Excel file
-    data = pd.read_excel("../Resampled Data/" + Lighting_name)
-    # Perform linear interpolation to fill in any missing data points
-    data = data.interpolate(method='linear')
-    return data
+    # Select all zones that are part of the Academic Building
+    for Zone_name in building_zones(g, "Academic_Building"):
+        # Select all meters associated with the zone, then print the zone name and its meters
+        meter_list = zone_meters(g, Zone_name)
+        print(Zone_name + ":   " + str(meter_list))
 
+    # Select all zones that are not part of the Academic Building and print their names
+    for Zone_name in other_zones(g, "Academic_Building"):
+        print(Zone_name)
 
-# Open and parse the TTL file containing meter metadata
-with open("../HKUST_Meter_Metadata.ttl", "r", encoding="utf-8") as file:
-    ttl_data = file.read()
-    g = Graph()
-    # Parse the TTL data to create a graph
-    g.parse(data=ttl_data, format='ttl')
 
-# SPARQL query to select all zones that are part of the Academic Building
-query_all = f"""
-    SELECT  ?zone
-    WHERE {{
-        ?zone a brick:Zone .
-        bldg:Academic_Building brick:hasPart ?zone  .
-    }}
-"""
-
-# Execute the SPARQL query
-result = g.query(query_all)
-
-# Initialize a counter for demonstration purposes
-n = 0
-
-# Iterate through the query results
-for row in result:
-    # For demonstration, break after the first iteration
-    if n == 1:
-        break
-    # Extract the zone name from the URI
-    Zone_name = row['zone'].split("#")[-1]
-
-    # Query to select all meters associated with the zone
-    temp_query = f"""
-        SELECT  ?meter
-        WHERE {{
-            bldg:{Zone_name} brick:isMeteredBy ?meter .
-            ?meter rdf:type/rdfs:subClassOf* brick:Meter .
-        }}
-    """
-    result_meter = g.query(temp_query)
-
-    # Initialize a list to store meter names
-    meter_list = []
-
-    # Iterate through the meter query results and append to the list
-    for meter in result_meter:
-        meter_list.append(meter['meter'].split("#")[-1])
-
-    # Print the zone name and its associated meters
-    print(Zone_name + ":   " + str(meter_list))
-
-# SPARQL query to select all zones that are not part of the Academic Building
-query_all = f"""
-    SELECT ?zone
-    WHERE {{
-        ?zone a brick:Zone .
-        FILTER NOT EXISTS {{ bldg:Academic_Building brick:hasPart ?zone }}
-    }}
-"""
-
-# Execute the SPARQL query
-result = g.query(query_all)
-
-# Iterate through the query results and print the zone names
-for i in result:
-    print(i['zone'].split("#")[-1])
+if __name__ == "__main__":
+    main()
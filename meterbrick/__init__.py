@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：__init__.py
+@Time: 10/18/2026 9:12 AM
+@Author: Mingchen Li
+
+Shared helpers used by the analysis scripts of HKUST_Meter_Brick.
+"""
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：__main__.py
+@Time: 10/20/2026 1:15 PM
+@Author: Mingchen Li
+
+Run the command line with "python -m meterbrick ..." from the repository root.
+"""
+import sys
+
+from meterbrick.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
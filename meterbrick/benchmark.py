@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：benchmark.py
+@Time: 10/19/2026 10:30 PM
+@Author: Mingchen Li
+
+Benchmark harness timing and memory-profiling the stages of the pipeline.
+
+Every stage is run inside `Benchmark.stage`, which records its wall time and
+the peak of the memory allocated by Python and NumPy during the stage
+(tracemalloc). A run is appended as one JSON line to a results file together
+with its configuration and the git commit, and compared with the previous run
+of the same configuration to spot regressions.
+"""
+import json
+import os
+import subprocess
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+# A stage is reported as a regression when it is this many times slower than the previous run
+REGRESSION_TOLERANCE = 1.2
+
+
+def git_commit(path="."):
+    """
+    Short hash of the current git commit, or None outside a git repository.
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=path, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Benchmark:
+    """
+    Wall time and peak traced memory of the stages of one benchmark run.
+    """
+
+    def __init__(self, config, trace_memory=True):
+        """
+        Args:
+            config (dict): Parameters of the run (scale, workers, ...). Runs are
+                only compared with runs of the same configuration.
+            trace_memory (bool): Record the peak memory of every stage. Tracing
+                slows down allocation-heavy stages such as reading Excel files,
+                so it is part of the configuration.
+        """
+        self.config = dict(config, trace_memory=trace_memory)
+        self.trace_memory = trace_memory
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time and memory-profile the code run in the `with` block.
+
+        Memory allocated by worker processes is not traced, so stages are best
+        profiled with a single worker.
+        """
+        tracing = tracemalloc.is_tracing()
+        if self.trace_memory:
+            if not tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak_mb = None
+            if self.trace_memory:
+                peak_mb = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 2)
+                if not tracing:
+                    tracemalloc.stop()
+            self.stages[name] = {'seconds': round(seconds, 4), 'peak_mb': peak_mb}
+            print(f"{name}: {seconds:.2f} s" + (f", peak {peak_mb:.1f} MB" if peak_mb is not None else ""))
+
+    def to_dict(self):
+        return {'time': datetime.now().isoformat(timespec='seconds'), 'commit': git_commit(),
+                'config': self.config, 'stages': self.stages}
+
+    def save(self, results_path):
+        """
+        Append the run to a JSON-lines results file.
+
+        Returns:
+            dict: The saved entry.
+        """
+        entry = self.to_dict()
+        with open(results_path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(entry) + "\n")
+        return entry
+
+
+def load_results(results_path):
+    """
+    Read all the runs of a results file, oldest first.
+    """
+    if not os.path.exists(results_path):
+        return []
+    with open(results_path, "r", encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def compare_runs(previous, current, tolerance=REGRESSION_TOLERANCE):
+    """
+    Compare the stages of two runs.
+
+    Args:
+        previous (dict): The reference run.
+        current (dict): The new run.
+        tolerance (float): Time ratio above which a stage is a regression.
+
+    Returns:
+        list: (stage, previous seconds, current seconds, ratio, regression) of
+            the stages present in both runs.
+    """
+    rows = []
+    for name, stage in current['stages'].items():
+        if name not in previous['stages']:
+            continue
+        before = previous['stages'][name]['seconds']
+        ratio = stage['seconds'] / before if before > 0 else float('nan')
+        rows.append((name, before, stage['seconds'], ratio, ratio > tolerance))
+    return rows
+
+
+def previous_run(results, config):
+    """
+    The latest run of a list of runs with the given configuration, or None.
+    """
+    for entry in reversed(results):
+        if entry['config'] == config:
+            return entry
+    return None
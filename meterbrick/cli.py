@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：cli.py
+@Time: 10/20/2026 1:15 PM
+@Author: Mingchen Li
+
+Command line entry point of the pipeline, run from the repository root:
+
+    python -m meterbrick resample
+    python -m meterbrick missing-rate {sampling-times,building-hour}
+    python -m meterbrick evaluate [--skip-calculation]
+    python -m meterbrick lighting
+    python -m meterbrick dorm
+    python -m meterbrick query {buildings,zones,other-zones,meters,equipment,sparql} ...
+    python -m meterbrick serve [--port 8765] [--preload]
+
+The pipeline subcommands run the stage scripts from their own directory, as
+when they are run by hand, so their relative paths and settings are unchanged,
+except for the store: every subcommand uses the same store (--store, by
+default "Resampled Data" in the repository root), passed to the scripts in the
+METERBRICK_STORE_DIR environment variable.
+Nothing heavy is imported before a subcommand is chosen. The building and zone
+queries are answered from the topology snapshot, the other queries load the
+graph snapshot; neither imports pandas, NumPy or matplotlib, which are only
+imported by the stages that use them.
+"""
+import argparse
+import os
+import sys
+
+# Repository root, the parent directory of this package
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_TTL = os.path.join(REPO_DIR, "HKUST_Meter_Metadata.ttl")
+
+# Store of every subcommand: DEFAULT_STORE_DIR ("../Resampled Data") seen from the stage directories
+DEFAULT_STORE = os.path.join(REPO_DIR, "Resampled Data")
+
+# Stage scripts of every subcommand, relative to the repository root
+SCRIPTS = {
+    'resample': "Data Preprocessing/Data Resampling.py",
+    'sampling-times': "Missing Rate/Missing_Rate_Sampling_Times.py",
+    'building-hour': "Missing Rate/Missing_Rate_Building_Hour.py",
+    'calculation': "Evaluation/Data_Calculation.py",
+    'relative-error': "Evaluation/Relative Error.py",
+    'lighting': "Lighting_Analysis/Lighting Analysis.py",
+    'dorm': "Dorm_Room_Analysis/Dorm_Room_Analysis.py",
+}
+
+
+def run_script(relative_path, store_dir=DEFAULT_STORE):
+    """
+    Run a stage script as __main__ from its own directory.
+
+    Args:
+        relative_path (str): Path of the script relative to the repository root.
+        store_dir (str): The directory of the resampled data store of the script.
+    """
+    import runpy
+
+    from meterbrick.storage import STORE_DIR_ENV
+
+    script_path = os.path.join(REPO_DIR, *relative_path.split("/"))
+    current_directory = os.getcwd()
+    previous_store = os.environ.get(STORE_DIR_ENV)
+    # Absolute, as the script runs from its own directory (worker processes inherit the variable)
+    os.environ[STORE_DIR_ENV] = os.path.abspath(store_dir)
+    os.chdir(os.path.dirname(script_path))
+    try:
+        runpy.run_path(script_path, run_name="__main__")
+    finally:
+        os.chdir(current_directory)
+        if previous_store is None:
+            del os.environ[STORE_DIR_ENV]
+        else:
+            os.environ[STORE_DIR_ENV] = previous_store
+
+
+def _run_scripts(names, store_dir):
+    for name in names:
+        run_script(SCRIPTS[name], store_dir=store_dir)
+    return 0
+
+
+def _query(args):
+    if args.what in ('buildings', 'zones', 'other-zones'):
+        # Answered by the topology index, whose snapshot loads much faster than the graph
+        from meterbrick.topology import load_topology
+
+        topology = load_topology(args.ttl, use_cache=not args.no_cache)
+        if args.what == 'buildings':
+            names = topology.entities_of_type("Building")
+        else:
+            # Zones that are (not) a brick:hasPart of the building
+            parts = set(topology.parts_of(args.name or "Academic_Building"))
+            names = [zone for zone in topology.entities_of_type("Zone")
+                     if (zone in parts) == (args.what == 'zones')]
+        for name in names:
+            print(name)
+        return 0
+
+    from meterbrick.graph import load_graph
+    from meterbrick import queries
+
+    # The meter and equipment queries use the materialized closures (closure:typeStar)
+    g = load_graph(args.ttl, use_cache=not args.no_cache, materialize=True)
+    if args.what == 'meters':
+        names = queries.zone_meters(g, args.name)
+    elif args.what == 'equipment':
+        names = queries.zone_equipment(g, args.name)
+    else:
+        # Free SPARQL query, one tab-separated row per result with local names
+        for row in g.query(args.name):
+            print("\t".join(str(value).split("#")[-1] for value in row))
+        return 0
+    for name in names:
+        print(name)
+    return 0
+
+
+def _serve(args):
+    from meterbrick.service import serve
+
+    serve(args.ttl, store_dir=args.store, host=args.host, port=args.port, cache_size=args.cache_size,
+          n_threads=args.threads, preload=args.preload)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m meterbrick",
+                                     description="HKUST_Meter_Brick data pipeline.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    # Store shared by the pipeline subcommands and the service
+    store = argparse.ArgumentParser(add_help=False)
+    store.add_argument("--store", default=DEFAULT_STORE, help="Directory of the resampled data store.")
+
+    subparsers.add_parser("resample", parents=[store], help="Resample the raw data (Data Resampling.py).")
+
+    missing_rate = subparsers.add_parser("missing-rate", parents=[store], help="Quarterly missing rates.")
+    missing_rate.add_argument("kind", choices=["sampling-times", "building-hour"],
+                              help="Missing_Rate_Sampling_Times.py or Missing_Rate_Building_Hour.py.")
+
+    evaluate = subparsers.add_parser("evaluate", parents=[store], help="Zone data and relative error of the sub meters.")
+    evaluate.add_argument("--skip-calculation", action="store_true",
+                          help="Only run Relative Error.py on the existing Zone_Data.")
+
+    subparsers.add_parser("lighting", parents=[store],
+                          help="Hourly lighting load of every floor (Lighting Analysis.py).")
+    subparsers.add_parser("dorm", parents=[store],
+                          help="Hourly load of the GGT bedrooms and toilets (Dorm_Room_Analysis.py).")
+
+    query = subparsers.add_parser("query", help="Query the Brick metadata graph.")
+    query.add_argument("what", choices=["buildings", "zones", "other-zones", "meters", "equipment", "sparql"])
+    query.add_argument("name", nargs="?",
+                       help="Building of zones/other-zones (Academic_Building by default), zone of "
+                            "meters/equipment, or the query text of sparql.")
+    query.add_argument("--ttl", default=DEFAULT_TTL, help="Path of the TTL file.")
+    query.add_argument("--no-cache", action="store_true", help="Parse the TTL file instead of using the snapshot.")
+
+    server = subparsers.add_parser("serve", parents=[store],
+                                   help="Local HTTP query service keeping the graph and data loaded.")
+    server.add_argument("--ttl", default=DEFAULT_TTL, help="Path of the TTL file.")
+    server.add_argument("--host", default="127.0.0.1", help="Address to listen on.")
+    server.add_argument("--port", type=int, default=8765, help="Port to listen on.")
+    server.add_argument("--cache-size", type=int, default=1024, help="Number of cached responses.")
+    server.add_argument("--threads", type=int, default=4, help="Number of threads running the queries.")
+    server.add_argument("--preload", action="store_true", help="Load the data of every meter at start.")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == "query":
+        if args.what in ('meters', 'equipment', 'sparql') and not args.name:
+            parser.error(f"query {args.what} needs a name")
+        return _query(args)
+    if args.command == "serve":
+        return _serve(args)
+    if args.command == "missing-rate":
+        return _run_scripts([args.kind], args.store)
+    if args.command == "evaluate":
+        return _run_scripts(["relative-error"] if args.skip_calculation else ["calculation", "relative-error"],
+                            args.store)
+    return _run_scripts([args.command], args.store)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
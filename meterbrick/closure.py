@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：closure.py
+@Time: 10/18/2026 6:10 PM
+@Author: Mingchen Li
+
+Materialized transitive closures of the Brick metadata graph.
+
+rdflib evaluates property paths such as "brick:isLocationOf*" and
+"rdf:type/rdfs:subClassOf*" with repeated graph walks for every query. The
+closures are computed once here and added to the graph as explicit triples, so
+the same queries become single-hop lookups:
+
+    bldg:Academic_Building_1F  brick:isLocationOf*  ?Light
+        -> bldg:Academic_Building_1F  closure:isLocationOfStar  ?Light
+    ?meter  rdf:type/rdfs:subClassOf*  brick:Meter
+        -> ?meter  closure:typeStar  brick:Meter
+    ?class  rdfs:subClassOf*  brick:Equipment
+        -> ?class  closure:subClassOfStar  brick:Equipment
+
+Like the SPARQL "*" operator, the closures are reflexive (zero-length paths
+are included).
+"""
+from collections import defaultdict
+
+from rdflib import RDF, RDFS, Namespace
+
+# Namespace of the materialized closure predicates
+CLOSURE = Namespace("urn:meterbrick:closure#")
+
+# Used when the graph does not bind the 'brick' prefix itself
+BRICK = Namespace("https://brickschema.org/schema/Brick#")
+
+
+def reachability(edges):
+    """
+    Compute the reflexive transitive closure of a directed graph.
+
+    Args:
+        edges (dict): node -> set of successor nodes.
+
+    Returns:
+        dict: node -> set of nodes reachable from it, including itself.
+    """
+    nodes = set(edges)
+    for successors in edges.values():
+        nodes.update(successors)
+
+    reachable = {}
+    for start in nodes:
+        seen = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for successor in edges.get(node, ()):
+                if successor in seen:
+                    continue
+                # Reuse the closure of a node that is already complete
+                if successor in reachable:
+                    seen.update(reachable[successor])
+                else:
+                    seen.add(successor)
+                    stack.append(successor)
+        reachable[start] = seen
+    return reachable
+
+
+def _edges(g, predicate):
+    edges = defaultdict(set)
+    for subject, obj in g.subject_objects(predicate):
+        edges[subject].add(obj)
+    return edges
+
+
+def materialize_closures(g):
+    """
+    Add the location closure and the class-hierarchy closures to a graph.
+
+    Args:
+        g (rdflib.Graph): The Brick metadata graph, modified in place.
+
+    Returns:
+        int: Number of triples added.
+    """
+    n_before = len(g)
+    brick = Namespace(dict(g.namespaces()).get("brick", BRICK))
+    location_predicate = brick.isLocationOf
+    g.bind("closure", CLOSURE)
+
+    # isLocationOf*: every location to everything located in it, directly or not
+    for location, located in reachability(_edges(g, location_predicate)).items():
+        for entity in located:
+            g.add((location, CLOSURE.isLocationOfStar, entity))
+
+    # rdfs:subClassOf*: every class to all its superclasses
+    superclasses = reachability(_edges(g, RDFS.subClassOf))
+    for cls, supers in superclasses.items():
+        for superclass in supers:
+            g.add((cls, CLOSURE.subClassOfStar, superclass))
+
+    # rdf:type/rdfs:subClassOf*: every entity to all the superclasses of its classes
+    for entity, cls in list(g.subject_objects(RDF.type)):
+        for superclass in superclasses.get(cls, {cls}):
+            g.add((entity, CLOSURE.typeStar, superclass))
+
+    return len(g) - n_before
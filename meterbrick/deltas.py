@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：deltas.py
+@Time: 10/21/2026 11:40 AM
+@Author: Mingchen Li
+
+Counter-reset-aware consumption of cumulative kWh meters.
+
+Summing the cumulative readings of many meters and taking the difference of the
+sum turns a reset or rollover of a single meter (and the first reading of a
+meter that starts later than the others) into a huge spike of the whole group.
+`consumption_deltas` instead takes the difference of every meter between
+consecutive grid steps, for all rows of a meter x time block at once, and
+corrects the steps where a counter went backwards:
+
+- rollover: with the capacity of the register known, the step plus the
+  capacity, if that is a plausible consumption;
+- reset: otherwise the reading after the reset, i.e. the consumption since
+  the counter restarted from zero, if that is plausible.
+
+Steps that cannot be corrected, and jumps larger than `SPIKE_FACTOR` times the
+99th percentile of the steps of the meter, are set to NaN. The resulting
+consumption can be summed over meters directly (see `delta_matrix`). The
+consumption of a memory-mapped meter matrix is written to a memory-mapped file
+next to it, so it never has to fit in memory either.
+"""
+import json
+import os
+import shutil
+import warnings
+
+import numpy as np
+
+from meterbrick.instrumentation import file_size, span
+from meterbrick.matrix import MeterMatrix
+
+# Largest plausible step of a meter, as a multiple of the 99th percentile of its steps
+SPIKE_FACTOR = 10
+
+# Percentile of the steps of a meter used as its typical high consumption
+TYPICAL_PERCENTILE = 99
+
+# Number of rows processed at a time, which bounds the memory of the temporary arrays
+DEFAULT_CHUNK_ROWS = 256
+
+# Flags of the steps
+OK = 0
+ROLLOVER = 1
+RESET = 2
+REJECTED = 3
+
+
+def _per_row(value, n_rows):
+    # One value per row from a scalar or a sequence (None is no value)
+    if value is None:
+        return np.full(n_rows, np.nan)
+    return np.broadcast_to(np.asarray(value, dtype=np.float64), (n_rows,))
+
+
+def consumption_deltas(values, rollover=None, spike_factor=SPIKE_FACTOR, tolerance=0.0,
+                       chunk_rows=DEFAULT_CHUNK_ROWS, out=None, flags_out=None):
+    """
+    Consumption of every meter between consecutive grid steps, with counter
+    resets and rollovers corrected.
+
+    Args:
+        values (np.ndarray): (n_meters, n_timestamps) cumulative readings with
+            NaN for missing ones, e.g. a memmap.
+        rollover (float or list, optional): Capacity of the register of all
+            meters or of every meter (e.g. 1e6 for a counter wrapping at
+            999999.9 kWh). None only considers resets to zero.
+        spike_factor (float): Steps larger than this multiple of the 99th
+            percentile of the steps of a meter are rejected. None keeps them.
+        tolerance (float): Decreases up to this value are kept as they are
+            (e.g. rounding of the readings), larger ones are resets.
+        chunk_rows (int): Number of rows processed at a time.
+        out (np.ndarray, optional): float64 array receiving the deltas, e.g. a
+            memmap. A new array by default.
+        flags_out (np.ndarray, optional): int8 array receiving the flags, e.g.
+            a memmap. A new array by default.
+
+    Returns:
+        tuple: (deltas, flags) arrays of the shape of values. The first column
+            and the steps next to a missing reading are NaN. flags holds OK,
+            ROLLOVER, RESET or REJECTED for every step.
+    """
+    n_rows, n_timestamps = values.shape
+    rollover = _per_row(rollover, n_rows)
+    deltas = np.empty(values.shape, dtype=np.float64) if out is None else out
+    flags = np.empty(values.shape, dtype=np.int8) if flags_out is None else flags_out
+    deltas[:, :1] = np.nan
+    flags[:, :1] = OK
+
+    for start in range(0, n_rows, chunk_rows):
+        end = min(start + chunk_rows, n_rows)
+        block = np.array(values[start:end], dtype=np.float64)
+        step = np.diff(block, axis=1)
+
+        # Largest plausible step of every meter, from its non-negative steps
+        if spike_factor is None:
+            limit = np.full((end - start, 1), np.inf)
+        else:
+            normal = np.where(step >= 0, step, np.nan)
+            with warnings.catch_warnings():
+                # Meters without any step give NaN ("All-NaN slice")
+                warnings.simplefilter("ignore", RuntimeWarning)
+                typical = np.nanpercentile(normal, TYPICAL_PERCENTILE, axis=1)
+            # Meters without usable steps are not limited
+            limit = np.where(np.isnan(typical) | (typical <= 0), np.inf, typical * spike_factor)[:, None]
+
+        step_flags = np.zeros(step.shape, dtype=np.int8)
+        backwards = step < -tolerance
+
+        # Rollover: the counter wrapped at the capacity of its register
+        wrapped = step + rollover[start:end, None]
+        rolled = backwards & (wrapped >= 0) & (wrapped <= limit)
+        step_flags[rolled] = ROLLOVER
+        step = np.where(rolled, wrapped, step)
+
+        # Reset: the counter restarted from zero, the reading after it is the consumption since
+        after = block[:, 1:]
+        reset = backwards & ~rolled & (after >= 0) & (after <= limit)
+        step_flags[reset] = RESET
+        step = np.where(reset, after, step)
+
+        # Decreases that are neither, and implausible jumps, are rejected
+        rejected = (backwards & ~rolled & ~reset) | (step > limit)
+        step_flags[rejected] = REJECTED
+        step[rejected] = np.nan
+
+        deltas[start:end, 1:] = step
+        flags[start:end, 1:] = step_flags
+    return deltas, flags
+
+
+def flags_path(path):
+    """
+    Return the path of the flags of a consumption matrix.
+    """
+    return path + ".flags.npy"
+
+
+def delta_matrix(meter_matrix, path=None, rollover=None, spike_factor=SPIKE_FACTOR, tolerance=0.0):
+    """
+    Consumption matrix of a meter matrix of cumulative readings.
+
+    The result has the meters, grid and spans of the meter matrix, so its
+    `sum_meters` and `aggregate_entities` give the consumption of meter groups
+    and entities; missing steps count as 0. Its `complete_sum` only keeps the
+    steps where every meter of the group has a consumption, so the first step
+    of the grid and every step where a meter of the group was rejected are
+    dropped for the whole group.
+
+    Args:
+        meter_matrix (MeterMatrix): Cumulative readings, e.g. hourly kWh.
+        path (str, optional): Path of the consumption matrix without extension.
+            By default it is written next to a matrix stored on disk (with the
+            suffix ".deltas") and kept in memory otherwise.
+        rollover, spike_factor, tolerance: See `consumption_deltas`.
+
+    Returns:
+        tuple: (MeterMatrix of the consumption, flags array), opened read-only
+            when written to disk.
+    """
+    if path is None and meter_matrix.path is not None:
+        path = meter_matrix.path + ".deltas"
+    if path is None:
+        deltas, flags = consumption_deltas(meter_matrix.values, rollover=rollover, spike_factor=spike_factor,
+                                           tolerance=tolerance)
+        return MeterMatrix(deltas, meter_matrix.meter_ids, meter_matrix.times, meter_matrix.spans), flags
+
+    data_path, meta_path = MeterMatrix.paths(path)
+    os.makedirs(os.path.dirname(os.path.abspath(data_path)), exist_ok=True)
+    shape = meter_matrix.values.shape
+    with span("write_deltas", "io", path=os.path.basename(path), rows=shape[0]) as info:
+        deltas = np.lib.format.open_memmap(data_path, mode='w+', dtype=np.float64, shape=shape)
+        flags = np.lib.format.open_memmap(flags_path(path), mode='w+', dtype=np.int8, shape=shape)
+        consumption_deltas(meter_matrix.values, rollover=rollover, spike_factor=spike_factor,
+                           tolerance=tolerance, out=deltas, flags_out=flags)
+        deltas.flush()
+        flags.flush()
+        del deltas, flags
+        info['bytes'] = file_size(data_path)
+
+    # Same meters, grid and spans as the meter matrix
+    if meter_matrix.path is not None:
+        shutil.copyfile(MeterMatrix.paths(meter_matrix.path)[1], meta_path)
+    else:
+        with open(meta_path, "w", encoding="utf-8") as file:
+            json.dump({'meter_ids': meter_matrix.meter_ids, 'start': str(meter_matrix.times[0]),
+                       'freq': meter_matrix.times.freqstr, 'n_timestamps': len(meter_matrix.times),
+                       'spans': np.asarray(meter_matrix.spans).tolist()}, file)
+    return MeterMatrix.open(path), np.load(flags_path(path), mmap_mode='r')
+
+
+def count_flags(flags):
+    """
+    Number of rollovers, resets and rejected steps.
+
+    Returns:
+        dict: 'rollovers', 'resets' and 'rejected'.
+    """
+    return {'rollovers': int((flags == ROLLOVER).sum()), 'resets': int((flags == RESET).sum()),
+            'rejected': int((flags == REJECTED).sum())}
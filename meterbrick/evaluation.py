@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：evaluation.py
+@Time: 10/19/2026 8:10 PM
+@Author: Mingchen Li
+
+Zone evaluation of Data_Calculation.py and Relative Error.py.
+
+`zone_meter_sets` collects the total meters (brick:isMeteredBy) and sub meters
+(brick:hasPart) of every zone with one query, and `write_zone_data` writes the
+daily total and sub meter consumption of every zone to the Zone_Data CSV files,
+from one shared meter x date matrix of the first daily readings.
+
+For the evaluation, all zones are loaded into one long table with a 'zone'
+column. The quartiles of the total - sub meter difference, the 1.5*IQR filter
+and the MAE percentage are then computed for all zones at once with groupby
+operations, instead of one file at a time.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+from meterbrick.deltas import count_flags, delta_matrix
+from meterbrick.instrumentation import span
+from meterbrick.matrix import build_meter_matrix
+from meterbrick.outliers import WHISKER, IQRFilter
+from meterbrick.rollup import rollup_loader
+from meterbrick.storage import meter_id_from_name
+
+# Minimum number of days left after the outlier filter for a zone to be evaluated
+MIN_DAYS = 2
+
+# Single query returning every (zone, meter, relation) of the zones:
+# the total meters through brick:isMeteredBy and the sub meters through brick:hasPart.
+# The types are checked with FILTER EXISTS, because rdflib would otherwise evaluate
+# "?zone a brick:Zone" and "?meter a brick:Electrical_Meter" first, as a cross product.
+ZONE_QUERY = """
+    SELECT  ?zone  ?meter  ?relation
+    WHERE {
+        {
+            ?zone  brick:isMeteredBy  ?meter  .
+            BIND("isMeteredBy" AS ?relation)
+        }
+        UNION
+        {
+            ?zone  brick:hasPart  ?meter  .
+            BIND("hasPart" AS ?relation)
+        }
+        FILTER EXISTS { ?zone  a  brick:Zone }
+        FILTER EXISTS { ?meter  a  brick:Electrical_Meter }
+    }
+"""
+
+
+def zone_meter_sets(g):
+    """
+    Total meters and sub meters of every zone.
+
+    Args:
+        g (rdflib.Graph): The graph.
+
+    Returns:
+        tuple: (zone_meters, zone_has_meters), dicts of zone name -> meter
+            names. Only the zones with at least one total meter are in zone_meters.
+    """
+    # Imported here, so the evaluation of the CSV files does not need rdflib
+    from meterbrick.graph import run_query
+
+    zone_meters = {}
+    zone_has_meters = {}
+    for row in run_query(g, ZONE_QUERY, name="zone_query"):
+        zone = str(row['zone']).split("#")[-1]
+        meter = str(row['meter']).split("#")[-1]
+        if str(row['relation']) == "isMeteredBy":
+            zone_meters.setdefault(zone, []).append(meter)
+        else:
+            zone_has_meters.setdefault(zone, []).append(meter)
+    return zone_meters, zone_has_meters
+
+
+def daily_zone_readings(zone_meters, zone_has_meters, path, start=None, end=None, loader=None):
+    """
+    Daily table (meters x dates) of the first reading of every day of all the
+    meters of all the zones, so meters shared across zones are read only once.
+
+    Args:
+        zone_meters, zone_has_meters (dict): See `zone_meter_sets`.
+        path (str): Path of the matrix without extension.
+        start, end (str or pd.Timestamp, optional): Bounds of the dates.
+        loader (callable, optional): Meter loader. By default the first readings
+            are read from the daily rollups of the default store.
+
+    Returns:
+        MeterMatrix: The daily first readings.
+    """
+    all_meters = [meter for meters in zone_meters.values() for meter in meters] + \
+                 [meter for meters in zone_has_meters.values() for meter in meters]
+    return build_meter_matrix(all_meters, path, freq='D', interpolate=False, start=start, end=end, how='first',
+                              loader=loader if loader is not None else rollup_loader('D', 'first'))
+
+
+def write_zone_data(zone_meters, zone_has_meters, daily_readings, output_dir, meter_deltas=True, verbose=False):
+    """
+    Write the daily total and sub meter consumption of every zone to "<zone>_data.csv".
+
+    Zones with a meter missing from the daily table are skipped.
+
+    Args:
+        zone_meters, zone_has_meters (dict): See `zone_meter_sets`.
+        daily_readings (MeterMatrix): See `daily_zone_readings`.
+        output_dir (str): The Zone_Data directory.
+        meter_deltas (bool): Difference every meter before summing, with counter
+            resets and rollovers corrected (see `meterbrick.deltas`). False takes
+            the difference of the summed daily readings.
+        verbose (bool): Print the meters of every zone and the skipped zones.
+
+    Returns:
+        tuple: (number of zones written, counts of the counter corrections or
+            None without meter_deltas)
+    """
+    corrections = None
+    if meter_deltas:
+        # Daily consumption of every meter, with counter resets and rollovers corrected
+        daily_deltas, flags = delta_matrix(daily_readings)
+        corrections = count_flags(flags)
+
+    os.makedirs(output_dir, exist_ok=True)
+    written = 0
+    for zone in tqdm(list(zone_meters), desc="Processing Zones"):
+        meters = zone_meters[zone]
+        has_meters = [item for item in zone_has_meters.get(zone, []) if item not in meters]
+        if verbose:
+            print(f"Zone: {zone}")
+            print(f"  Total Meters: {meters}")
+            print(f"  Sub Meters: {has_meters}")
+
+        # Skip this Zone if there are any meters missing from the daily table
+        if any(meter_id_from_name(meter) not in daily_readings.row_of for meter in meters + has_meters):
+            if verbose:
+                print(f"Skipping Zone: {zone} due to missing meters.")
+            continue
+
+        with span("zone_sums", "compute", entity=zone, meters=len(meters) + len(has_meters)) as info:
+            if meter_deltas:
+                # Sum the daily consumption of the meters on the days where all of them have one.
+                # As with the difference of the summed readings, the first day has no consumption;
+                # a day where a step of any meter was rejected is dropped for the whole zone
+                total_kwh_series = daily_deltas.complete_sum(meters)
+                sub_meter_kwh_series = daily_deltas.complete_sum(has_meters)
+            else:
+                # Sum the meters on the days where all of them have a reading, then take the difference
+                total_kwh_series = daily_readings.complete_sum(meters).diff().dropna()
+                sub_meter_kwh_series = daily_readings.complete_sum(has_meters).diff().dropna()
+
+            # Ensure we only keep the dates where both series have valid data
+            valid_indices = total_kwh_series.index.intersection(sub_meter_kwh_series.index)
+            info['rows'] = len(valid_indices)
+
+        pd.DataFrame({
+            'date': valid_indices,
+            'total_kwh': total_kwh_series[valid_indices].to_numpy(),
+            'sub_meter_kwh': sub_meter_kwh_series[valid_indices].to_numpy()
+        }).to_csv(os.path.join(output_dir, f"{zone}_data.csv"), index=False)
+        written += 1
+    return written, corrections
+
+
+def load_zone_table(directory):
+    """
+    Load every Zone_Data CSV file into one long-format table.
+
+    Args:
+        directory (str): The directory containing the CSV files.
+
+    Returns:
+        tuple: (table, zones) where table has the columns 'zone', 'date',
+            'total_kwh' and 'sub_meter_kwh', and zones lists the file names of
+            all the zones, including those without rows.
+    """
+    zones = sorted(filename for filename in os.listdir(directory) if filename.endswith('.csv'))
+    frames = {filename: pd.read_csv(os.path.join(directory, filename)) for filename in zones}
+    # Zones without rows are left out of the table but kept in the list of zones
+    frames = {filename: frame for filename, frame in frames.items() if len(frame)}
+    if not frames:
+        return pd.DataFrame(columns=['zone', 'date', 'total_kwh', 'sub_meter_kwh']), zones
+    table = pd.concat(frames, names=['zone', None]).reset_index(level=0)
+    return table.reset_index(drop=True), zones
+
+
+def zone_mae_percentages(table, zones=None, epsilon=None):
+    """
+    MAE percentage between total_kwh and sub_meter_kwh of every zone, after
+    removing the outliers of their difference with the 1.5*IQR method.
+
+    Args:
+        table (pd.DataFrame): Long table of `load_zone_table`.
+        zones (list, optional): All the zones to report; zones without enough
+            data get NaN. Defaults to the zones of the table.
+        epsilon (float, optional): Rank error of the quartiles, estimated with
+            one quantile sketch per zone (see `meterbrick.outliers`). None
+            computes exact quartiles with grouped operations.
+
+    Returns:
+        pd.DataFrame: One row per zone with 'n_days', 'n_filtered', 'mae',
+            'mean_total_kwh', 'mean_sub_meter_kwh' and 'mae_percentage'.
+    """
+    if zones is None:
+        zones = list(pd.unique(table['zone']))
+    difference = table['total_kwh'] - table['sub_meter_kwh']
+
+    # Bounds of the difference of every zone, broadcast back to the rows
+    if epsilon is None:
+        quartiles = difference.groupby(table['zone'])
+        Q1 = quartiles.transform('quantile', 0.25)
+        Q3 = quartiles.transform('quantile', 0.75)
+        IQR = Q3 - Q1
+        lower, upper = Q1 - WHISKER * IQR, Q3 + WHISKER * IQR
+    else:
+        bounds = pd.DataFrame({zone: IQRFilter(epsilon=epsilon).update(values).bounds()
+                               for zone, values in difference.groupby(table['zone'])},
+                              index=['lower', 'upper']).T
+        lower = table['zone'].map(bounds['lower'])
+        upper = table['zone'].map(bounds['upper'])
+    keep = (difference >= lower) & (difference <= upper)
+
+    # Mean absolute error and means of the remaining days of every zone
+    filtered = pd.DataFrame({'zone': table['zone'],
+                             'absolute_error': difference.abs(),
+                             'total_kwh': table['total_kwh'],
+                             'sub_meter_kwh': table['sub_meter_kwh']})[keep]
+    groups = filtered.groupby('zone')
+    results = pd.DataFrame({
+        'n_days': table.groupby('zone').size(),
+        'n_filtered': groups.size(),
+        'mae': groups['absolute_error'].mean(),
+        'mean_total_kwh': groups['total_kwh'].mean(),
+        'mean_sub_meter_kwh': groups['sub_meter_kwh'].mean(),
+    }).reindex(zones)
+    results[['n_days', 'n_filtered']] = results[['n_days', 'n_filtered']].fillna(0).astype(int)
+
+    # MAE divided by the larger of the two means
+    results['mae_percentage'] = results['mae'] / results[['mean_total_kwh', 'mean_sub_meter_kwh']].max(axis=1) * 100
+    results.loc[results['n_filtered'] < MIN_DAYS, 'mae_percentage'] = np.nan
+    results.index.name = 'zone'
+    return results.reset_index()
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：graph.py
+@Time: 10/18/2026 3:05 PM
+@Author: Mingchen Li
+
+Shared loader of the Brick metadata graph (HKUST_Meter_Metadata.ttl).
+
+Parsing the Turtle file with rdflib is slow, so the parsed graph is pickled
+into a snapshot next to the TTL file. The snapshot name contains the hash of the
+TTL content and is only used while the TTL is unchanged.
+"""
+import os
+import pickle
+import re
+
+from rdflib import Graph
+
+from meterbrick.closure import materialize_closures
+from meterbrick.instrumentation import file_size, span
+from meterbrick.manifest import file_hash
+
+# Default location of the metadata, relative to the analysis scripts
+DEFAULT_TTL_PATH = os.path.join("..", "HKUST_Meter_Metadata.ttl")
+
+# Directory (next to the TTL file) holding the graph snapshots
+CACHE_DIR_NAME = ".meterbrick_cache"
+
+# Version suffix of a snapshot kind, e.g. "-v2" in "topology-v2"
+KIND_VERSION = re.compile(r"-v\d+$")
+
+
+def snapshot_path(ttl_path, ttl_hash, kind="graph"):
+    """
+    Build the path of a snapshot derived from a TTL file with a given content hash.
+
+    Args:
+        ttl_path (str): Path to the TTL file.
+        ttl_hash (str): SHA-256 of the TTL content.
+        kind (str): What the snapshot holds, e.g. 'graph'.
+
+    Returns:
+        str: The path to the snapshot file.
+    """
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(ttl_path)), CACHE_DIR_NAME)
+    ttl_name = os.path.splitext(os.path.basename(ttl_path))[0]
+    return os.path.join(cache_dir, f"{ttl_name}.{ttl_hash[:16]}.{kind}.pickle")
+
+
+def write_snapshot(obj, ttl_path, ttl_hash, kind="graph"):
+    """
+    Pickle an object to a snapshot file, removing the snapshots of the same
+    kind left by older versions of the TTL. A versioned kind (e.g.
+    'topology-v2') also removes the snapshots of the other versions of that
+    kind (e.g. 'topology-v1'), which can no longer be read.
+    """
+    path = snapshot_path(ttl_path, ttl_hash, kind)
+    cache_dir = os.path.dirname(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    ttl_name = os.path.splitext(os.path.basename(ttl_path))[0]
+    family = KIND_VERSION.sub("", kind) if KIND_VERSION.search(kind) else None
+    for file_name in os.listdir(cache_dir):
+        if not (file_name.startswith(ttl_name + ".") and file_name.endswith(".pickle")):
+            continue
+        # "<ttl name>.<hash>.<kind>.pickle"
+        file_kind = file_name[len(ttl_name) + 1:-len(".pickle")].partition(".")[2]
+        if file_kind == kind or (family is not None and KIND_VERSION.search(file_kind)
+                                 and KIND_VERSION.sub("", file_kind) == family):
+            os.remove(os.path.join(cache_dir, file_name))
+
+    # Write to a temporary file first, so an interrupted run never leaves a broken snapshot
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as file:
+        pickle.dump(obj, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path)
+
+
+def read_snapshot(path):
+    """
+    Load a snapshot file, returning None if it is missing or unreadable.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as file:
+            return pickle.load(file)
+    except Exception as e:
+        print(f"Ignoring unreadable snapshot {path}: {e}")
+        return None
+
+
+def load_graph(ttl_path=DEFAULT_TTL_PATH, use_cache=True, materialize=False):
+    """
+    Load the Brick metadata graph, from the snapshot when the TTL is unchanged.
+
+    Args:
+        ttl_path (str): Path to the TTL file.
+        use_cache (bool): Read and write the snapshot. False always parses the TTL.
+        materialize (bool): Add the transitive closures of `meterbrick.closure`
+            (closure:isLocationOfStar, closure:typeStar, closure:subClassOfStar).
+            The materialized graph is cached in its own snapshot.
+
+    Returns:
+        rdflib.Graph: The parsed graph, with the prefixes of the TTL bound.
+    """
+    with span("load_graph", "graph", ttl=os.path.basename(ttl_path), materialize=materialize) as info:
+        if not use_cache:
+            g = _parse_ttl(ttl_path)
+            if materialize:
+                materialize_closures(g)
+            info['triples'] = len(g)
+            return g
+
+        ttl_hash = file_hash(ttl_path)
+        kind = "closure-graph" if materialize else "graph"
+        path = snapshot_path(ttl_path, ttl_hash, kind)
+        g = read_snapshot(path)
+        info['source'] = "snapshot" if g is not None else "ttl"
+        if g is None:
+            if materialize:
+                g = load_graph(ttl_path)
+                materialize_closures(g)
+            else:
+                g = _parse_ttl(ttl_path)
+            write_snapshot(g, ttl_path, ttl_hash, kind)
+        info['bytes'] = file_size(path)
+        info['triples'] = len(g)
+    return g
+
+
+def run_query(g, query, name="query"):
+    """
+    Run a SPARQL query and fetch all its rows, as one traced step.
+
+    Args:
+        g (rdflib.Graph): The graph.
+        query (str): The SPARQL query.
+        name (str): Name of the query in the trace.
+
+    Returns:
+        list: The result rows.
+    """
+    with span(name, "graph") as info:
+        rows = list(g.query(query))
+        info['rows'] = len(rows)
+    return rows
+
+
+def _parse_ttl(ttl_path):
+    """
+    Parse a TTL file into an RDF graph.
+    """
+    # Open and parse the TTL (Turtle) file
+    with span("parse_ttl", "graph", bytes=file_size(ttl_path)):
+        with open(ttl_path, "r", encoding="utf-8") as file:
+            ttl_data = file.read()
+            g = Graph()
+            g.parse(data=ttl_data, format='ttl')
+    return g
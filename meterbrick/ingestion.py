@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：ingestion.py
+@Time: 10/19/2026 6:20 PM
+@Author: Mingchen Li
+
+Chunked (out-of-core) ingestion of very large raw meter exports.
+
+The raw workbook is streamed in chunks of rows with openpyxl in read-only mode.
+Every chunk is reduced to per 15-minute sums and counts of valid readings, which
+are exact building blocks of the 15T, 30T, 60T and 1440T means since all these
+bins are aligned on the 15-minute grid. Once the whole file has been read, the
+sampling time is detected from the last 100 distinct timestamps and the blocks
+are rolled up to it. Peak memory is bounded by the chunk size plus the size of
+the resampled output, not by the size of the raw file.
+
+Duplicate timestamps are removed with keep='first'. The rows of the last
+15-minute bin of a chunk are carried over to the next chunk, so duplicates
+across chunk boundaries of a time-ordered export are removed as well. Rows that
+arrive out of order, in a bin already completed, are still added to their bin
+but cannot be checked against the rows already reduced; they are counted in
+'late_rows'.
+"""
+import os
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from meterbrick.resampling import MIN_ROWS, detect_sampling_time
+from meterbrick.storage import write_meter
+
+# Resolution of the partial aggregates, a divisor of every supported sampling time
+BASE_FREQ = '15T'
+
+DEFAULT_CHUNK_ROWS = 200_000
+
+# Number of partial aggregates kept before they are merged
+MAX_PARTIALS = 16
+
+
+def iter_excel_chunks(temp_path, sheet_name='Sheet1', chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Read a worksheet in chunks of rows.
+
+    Args:
+        temp_path (str): Path to the Excel file.
+        sheet_name (str): The worksheet to read. The first row is the header.
+        chunk_rows (int): Number of rows per chunk.
+
+    Yields:
+        pd.DataFrame: The next chunk of rows.
+    """
+    workbook = load_workbook(temp_path, read_only=True, data_only=True)
+    try:
+        rows = workbook[sheet_name].iter_rows(values_only=True)
+        header = [str(name) if name is not None else f"Unnamed: {i}"
+                  for i, name in enumerate(next(rows, ()))]
+        buffer = []
+        for row in rows:
+            buffer.append(row[:len(header)])
+            if len(buffer) >= chunk_rows:
+                yield pd.DataFrame(buffer, columns=header)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=header)
+    finally:
+        workbook.close()
+
+
+def _reduce(data):
+    """
+    Sums and counts of valid readings per base bin.
+    """
+    groups = data.groupby(data.index.floor(BASE_FREQ))
+    return groups.sum(), groups.count()
+
+
+def _merge(partials):
+    """
+    Merge partial (sums, counts) aggregates into one.
+    """
+    sums = pd.concat([sums for sums, _ in partials])
+    counts = pd.concat([counts for _, counts in partials])
+    return sums.groupby(level=0).sum(), counts.groupby(level=0).sum()
+
+
+def resample_raw_file_chunked(temp_path, store_dir, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Chunked equivalent of `resample_raw_file` for raw files too large for memory.
+
+    Args:
+        temp_path (str): Path to the raw Excel file (e.g. 'Raw_data/GUI_NO.12345.xlsx').
+        store_dir (str): The directory of the resampled data store.
+        chunk_rows (int): Number of raw rows read at a time.
+
+    Returns:
+        dict: The result of `resample_raw_file`, plus 'late_rows'.
+    """
+    file_name = os.path.basename(temp_path)
+    result = {'file_name': file_name, 'status': 'ok', 'sampling_time': None,
+              'duplicated': False, 'output_path': None, 'error': None, 'late_rows': 0}
+
+    n_rows = 0
+    carry = None
+    last_times = pd.DatetimeIndex([])
+    partials = []
+    completed_until = None
+    for chunk in iter_excel_chunks(temp_path, chunk_rows=chunk_rows):
+        n_rows += len(chunk)
+        # Convert the 'time' column to datetime and the readings to numbers
+        chunk['time'] = pd.to_datetime(chunk['time'])
+        chunk = chunk.set_index('time').apply(pd.to_numeric, errors='coerce')
+        if carry is not None:
+            chunk = pd.concat([carry, chunk])
+
+        # Remove duplicate timestamps (including the rows carried over from the previous chunk)
+        duplicated = chunk.index.duplicated(keep='first')
+        if duplicated.any():
+            result['duplicated'] = True
+            chunk = chunk[~duplicated]
+
+        # Keep the rows of the last bin for the next chunk, reduce the others
+        bins = chunk.index.floor(BASE_FREQ)
+        last_bin = bins.max()
+        in_last_bin = bins == last_bin
+        done = chunk[~in_last_bin]
+        carry = chunk[in_last_bin]
+        if completed_until is not None:
+            result['late_rows'] += int((bins[~in_last_bin] <= completed_until).sum())
+        if len(done):
+            done_until = bins[~in_last_bin].max()
+            completed_until = done_until if completed_until is None else max(completed_until, done_until)
+            partials.append(_reduce(done))
+            last_times = last_times.append(done.index)[-100:]
+        if len(partials) > MAX_PARTIALS:
+            partials = [_merge(partials)]
+
+    # Check if the data has less than 100 rows
+    if n_rows < MIN_ROWS:
+        result['status'] = 'empty'
+        return result
+
+    if carry is not None and len(carry):
+        partials.append(_reduce(carry))
+        last_times = last_times.append(carry.index)[-100:]
+
+    sampling_time = detect_sampling_time(last_times)
+    result['sampling_time'] = sampling_time
+
+    # Roll the base bins up to the sampling time: mean = sum of sums / sum of counts
+    sums, counts = _merge(partials)
+    target_bins = sums.index.floor(sampling_time)
+    sums = sums.groupby(target_bins).sum()
+    counts = counts.groupby(target_bins).sum()
+    resampled_data = sums / counts.where(counts > 0)
+
+    # Empty bins between the first and the last one are kept as NaN, as with resample()
+    full_range = pd.date_range(start=resampled_data.index.min(), end=resampled_data.index.max(),
+                               freq=sampling_time, name='time')
+    resampled_data = resampled_data.reindex(full_range)
+
+    # Save the resampled data to the Parquet store (one file per meter)
+    result['output_path'] = write_meter(resampled_data, file_name.split('.')[1], store_dir=store_dir)
+    return result
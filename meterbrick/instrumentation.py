@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：instrumentation.py
+@Time: 10/20/2026 9:10 AM
+@Author: Mingchen Li
+
+Lightweight stage instrumentation with JSON and Chrome trace output.
+
+The shared helpers wrap their steps (Excel parsing, `pd.to_datetime`,
+resampling, Parquet reads and writes, graph loading and queries, matrix and
+aggregation builds) in `span`. Tracing is off by default and a disabled span
+costs next to nothing. When the environment variable METERBRICK_TRACE names a
+directory (or after `enable_tracing`), every finished span is appended as one
+JSON line to "events.<pid>.jsonl" in that directory, with its wall time, the
+meter or entity it worked on, the rows processed, the bytes read or written and
+the peak RSS of the process. Worker processes inherit the variable and write
+their own file.
+
+`export_chrome_trace` merges the files of all processes into a trace that can
+be opened in chrome://tracing or https://ui.perfetto.dev, and
+`summarize_trace` totals the time, rows and bytes of every stage.
+"""
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Environment variable holding the trace directory
+TRACE_ENV = "METERBRICK_TRACE"
+
+# Events file of the current process, reopened after a fork
+_events = {'pid': None, 'dir': None, 'file': None}
+
+
+def enable_tracing(trace_dir):
+    """
+    Record the spans of this process and of the worker processes it starts.
+
+    Args:
+        trace_dir (str): Directory of the events files.
+    """
+    os.makedirs(trace_dir, exist_ok=True)
+    os.environ[TRACE_ENV] = os.path.abspath(trace_dir)
+
+
+def disable_tracing():
+    """
+    Stop recording spans.
+    """
+    os.environ.pop(TRACE_ENV, None)
+    if _events['file'] is not None:
+        _events['file'].close()
+    _events.update(pid=None, dir=None, file=None)
+
+
+def tracing_enabled():
+    return bool(os.environ.get(TRACE_ENV))
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of the process in MB, or None where the `resource`
+    module is not available (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KB on Linux
+    return round(peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def file_size(path):
+    """
+    Size of a file in bytes, or None if it does not exist.
+    """
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+def _events_file(trace_dir):
+    pid = os.getpid()
+    if _events['pid'] != pid or _events['dir'] != trace_dir:
+        # A forked worker must not write through the file object of its parent
+        os.makedirs(trace_dir, exist_ok=True)
+        _events.update(pid=pid, dir=trace_dir,
+                       file=open(os.path.join(trace_dir, f"events.{pid}.jsonl"), "a", encoding="utf-8",
+                                 buffering=1))
+    return _events['file']
+
+
+@contextmanager
+def span(name, category="stage", **args):
+    """
+    Time a step and record it as a trace event.
+
+    The yielded dict holds the arguments of the event; the step can add the
+    rows it processed or the bytes it read to it, e.g.
+
+        with span("read_excel", "io", file=file_name) as info:
+            data = pd.read_excel(path)
+            info['rows'] = len(data)
+
+    Args:
+        name (str): Name of the step.
+        category (str): Category of the step, e.g. 'io', 'graph' or 'compute'.
+        **args: Arguments of the event (meter, entity, bytes, ...).
+
+    Yields:
+        dict: The arguments of the event.
+    """
+    trace_dir = os.environ.get(TRACE_ENV)
+    if not trace_dir:
+        yield args
+        return
+    start_us = time.time_ns() // 1000
+    start = time.perf_counter_ns()
+    try:
+        yield args
+    finally:
+        duration_us = (time.perf_counter_ns() - start) // 1000
+        args['peak_rss_mb'] = peak_rss_mb()
+        event = {'name': name, 'cat': category, 'ph': 'X', 'ts': start_us, 'dur': duration_us,
+                 'pid': os.getpid(), 'tid': threading.get_ident(), 'args': args}
+        _events_file(trace_dir).write(json.dumps(event, default=str) + "\n")
+
+
+def read_trace_events(trace_dir):
+    """
+    Read the events of all the processes of a trace directory, sorted by start time.
+    """
+    events = []
+    for path in sorted(glob.glob(os.path.join(trace_dir, "events.*.jsonl"))):
+        with open(path, "r", encoding="utf-8") as file:
+            events.extend(json.loads(line) for line in file if line.strip())
+    return sorted(events, key=lambda event: event['ts'])
+
+
+def export_chrome_trace(trace_dir, output_path):
+    """
+    Write the events of a trace directory as a Chrome trace (JSON object format).
+
+    Args:
+        trace_dir (str): Directory of the events files.
+        output_path (str): Path of the ".json" trace.
+
+    Returns:
+        int: Number of events written.
+    """
+    events = read_trace_events(trace_dir)
+    with open(output_path, "w", encoding="utf-8") as file:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file)
+    return len(events)
+
+
+def summarize_trace(trace_dir):
+    """
+    Total time, rows and bytes of every step of a trace directory.
+
+    Returns:
+        pd.DataFrame: One row per (category, name) with 'count', 'total_s',
+            'mean_ms', 'max_ms', 'rows', 'bytes' and 'peak_rss_mb', sorted by
+            total time.
+    """
+    # Imported here so that tracing does not make the helpers import pandas
+    import pandas as pd
+
+    events = read_trace_events(trace_dir)
+    table = pd.DataFrame({'category': [event['cat'] for event in events],
+                          'name': [event['name'] for event in events],
+                          'dur_ms': [event['dur'] / 1000 for event in events],
+                          'rows': [event['args'].get('rows') for event in events],
+                          'bytes': [event['args'].get('bytes') for event in events],
+                          'peak_rss_mb': [event['args'].get('peak_rss_mb') for event in events]})
+    table[['rows', 'bytes', 'peak_rss_mb']] = table[['rows', 'bytes', 'peak_rss_mb']].astype('float64')
+    summary = table.groupby(['category', 'name']).agg(count=('dur_ms', 'size'), total_s=('dur_ms', 'sum'),
+                                                      mean_ms=('dur_ms', 'mean'), max_ms=('dur_ms', 'max'),
+                                                      rows=('rows', 'sum'), bytes=('bytes', 'sum'),
+                                                      peak_rss_mb=('peak_rss_mb', 'max'))
+    summary['total_s'] = summary['total_s'] / 1000
+    return summary.sort_values('total_s', ascending=False).reset_index()
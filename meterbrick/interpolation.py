@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：interpolation.py
+@Time: 10/21/2026 9:20 AM
+@Author: Mingchen Li
+
+Gap-limited linear interpolation of a whole meter x time block at once.
+
+`interpolate_block` fills the missing readings of every row of a block (e.g.
+the array of a `MeterMatrix`) with NumPy index arithmetic instead of one
+`DataFrame.interpolate` per meter: the positions of the previous and next
+readings of every timestamp come from a running maximum and minimum along the
+time axis, and the missing values are interpolated between them in time. Only
+gaps of at most the maximum gap of the meter are filled, so a meter that was
+offline for a month is left missing instead of getting a straight line through
+the outage. The maximum gap of every meter is a number of its sampling
+intervals, read from Sampling_Info.xlsx.
+
+The mask of the real readings is returned with the filled block, so the filled
+points can be left out of later statistics.
+"""
+import numpy as np
+import pandas as pd
+
+from meterbrick.storage import meter_id_from_name
+
+# Sampling time of the meters missing from Sampling_Info.xlsx (the default of resampling.py)
+DEFAULT_SAMPLING_TIME = '60T'
+
+# Number of rows interpolated at a time, which bounds the memory of the index arrays
+DEFAULT_CHUNK_ROWS = 256
+
+# Maximum gap meaning no limit
+NO_LIMIT = np.iinfo(np.int64).max
+
+# Maximum gap filling every gap, e.g. for `build_meter_matrix(..., max_gap=NO_GAP_LIMIT)`
+NO_GAP_LIMIT = pd.Timedelta(NO_LIMIT)
+
+
+def read_sampling_times(sampling_info_path):
+    """
+    Read the sampling time of every meter from Sampling_Info.xlsx.
+
+    Args:
+        sampling_info_path (str): Path to Sampling_Info.xlsx ('File Name' and 'Sampling Time').
+
+    Returns:
+        dict: Meter ID -> sampling time, e.g. {'12345': '15T'}.
+    """
+    sampling_info = pd.read_excel(sampling_info_path)
+    # 'GUI_NO.12345.xlsx' -> '12345'
+    meter_ids = sampling_info['File Name'].astype(str).str.split('.').str[1]
+    return dict(zip(meter_ids, sampling_info['Sampling Time']))
+
+
+def max_gaps(meter_names, sampling_times, max_gap_samples):
+    """
+    Maximum gap filled for every meter, as a number of its sampling intervals.
+
+    Args:
+        meter_names (list): Meter names or IDs.
+        sampling_times (dict): Meter ID -> sampling time (see `read_sampling_times`).
+        max_gap_samples (float): Longest gap filled, in sampling intervals.
+
+    Returns:
+        dict: Meter ID -> pd.Timedelta.
+    """
+    gaps = {}
+    for meter_name in meter_names:
+        meter_id = meter_id_from_name(meter_name)
+        sampling_time = pd.to_timedelta(pd.tseries.frequencies.to_offset(
+            sampling_times.get(meter_id, DEFAULT_SAMPLING_TIME)))
+        gaps[meter_id] = sampling_time * max_gap_samples
+    return gaps
+
+
+def _gap_nanoseconds(max_gap, n_rows):
+    # One maximum gap in nanoseconds per row, from a scalar or a sequence (None is no limit)
+    if max_gap is None:
+        return np.full(n_rows, NO_LIMIT, dtype=np.int64)
+    if np.ndim(max_gap) == 0:
+        return np.full(n_rows, pd.Timedelta(max_gap).value, dtype=np.int64)
+    return np.array([NO_LIMIT if gap is None else pd.Timedelta(gap).value for gap in max_gap], dtype=np.int64)
+
+
+def interpolate_block(values, times, max_gap=None, out=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Linearly interpolate the gaps of every row of a meter x time block.
+
+    A gap is the time between the readings around it. Gaps longer than the
+    maximum gap of the row, and the missing values before the first or after
+    the last reading of a row, are left NaN.
+
+    Args:
+        values (np.ndarray): (n_meters, n_timestamps) readings with NaN for
+            missing ones, e.g. a memmap.
+        times (pd.DatetimeIndex): Timestamps of the columns (increasing).
+        max_gap (pd.Timedelta or list, optional): Longest gap filled, for all
+            rows or one per row (None entries are not limited). None fills
+            every gap.
+        out (np.ndarray, optional): Array receiving the result, e.g. `values`
+            itself to interpolate in place. A new array by default.
+        chunk_rows (int): Number of rows interpolated at a time.
+
+    Returns:
+        tuple: (filled values, observed) where observed is a boolean array
+            that is True at the real readings.
+    """
+    n_rows, n_timestamps = values.shape
+    times = pd.DatetimeIndex(times).asi8
+    gaps = _gap_nanoseconds(max_gap, n_rows)
+    if out is None:
+        out = np.empty(values.shape, dtype=np.float64)
+    observed = np.empty(values.shape, dtype=bool)
+    positions = np.arange(n_timestamps)
+
+    for start in range(0, n_rows, chunk_rows):
+        end = min(start + chunk_rows, n_rows)
+        block = np.array(values[start:end], dtype=np.float64)
+        valid = ~np.isnan(block)
+
+        # Position of the last reading at or before, and of the first reading at or after, every timestamp
+        previous = np.maximum.accumulate(np.where(valid, positions, -1), axis=1)
+        following = np.minimum.accumulate(np.where(valid, positions, n_timestamps)[:, ::-1], axis=1)[:, ::-1]
+
+        # Missing values between two readings that are close enough
+        rows, columns = np.nonzero(~valid & (previous >= 0) & (following < n_timestamps))
+        before = previous[rows, columns]
+        after = following[rows, columns]
+        gap = times[after] - times[before]
+        fill = gap <= gaps[start + rows]
+        rows, columns, before, after, gap = rows[fill], columns[fill], before[fill], after[fill], gap[fill]
+
+        weight = (times[columns] - times[before]) / gap
+        block[rows, columns] = block[rows, before] + (block[rows, after] - block[rows, before]) * weight
+        out[start:end] = block
+        observed[start:end] = valid
+    return out, observed
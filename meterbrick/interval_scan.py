@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：interval_scan.py
+@Time: 10/18/2026 1:45 PM
+@Author: Mingchen Li
+
+Streaming detection of the sampling interval of raw meter exports.
+
+The sampling time only depends on the latest timestamps of a file, so only
+the last TAIL_ROWS rows of the raw workbook are read with openpyxl in
+read-only mode (the row count comes from the dimensions of the sheet), keeping
+a bounded window of the latest timestamps and a histogram of the deltas inside
+that window. No DataFrame is built, so memory does not grow with the size of
+the file and the whole "Raw_data" directory can be scanned before the heavy
+resampling loads. openpyxl still parses the XML of the rows before the tail,
+so this only saves the cell conversion of those rows; a file whose resampled
+data in the store is newer than it is not scanned at all.
+
+Duplicate timestamps are only detected inside the window, while the resampling
+drops them over the whole file (`drop_duplicates`). Both agree on time-ordered
+exports, where a duplicate always follows the timestamp it repeats; a file that
+repeats a timestamp older than the window (or than the tail) counts it again,
+which can change the detected interval of badly ordered exports.
+"""
+import os
+from collections import Counter, deque
+from datetime import datetime
+from functools import partial
+from multiprocessing import Pool
+
+import pandas as pd
+from openpyxl import load_workbook
+from tqdm import tqdm
+
+from meterbrick.resampling import MIN_ROWS, interval_to_sampling_time
+from meterbrick.storage import meter_path
+
+# Number of latest distinct timestamps used to detect the interval
+WINDOW_SIZE = 100
+
+# Number of rows read from the end of a file, room for WINDOW_SIZE distinct timestamps and duplicates
+TAIL_ROWS = 2 * WINDOW_SIZE
+
+
+class IntervalWindow:
+    """
+    Bounded window of the latest distinct timestamps with a histogram of the
+    deltas (in seconds) between consecutive timestamps of the window.
+
+    Timestamps are only deduplicated against the window, not against the
+    whole stream (see the module docstring).
+    """
+
+    def __init__(self, window_size=WINDOW_SIZE):
+        self.times = deque()
+        # The timestamps of the window as a set, for the duplicate check
+        self.time_set = set()
+        self.deltas = deque()
+        self.histogram = Counter()
+        self.window_size = window_size
+
+    def push(self, timestamp):
+        """
+        Add a timestamp. A timestamp already in the window is treated as a
+        duplicate and ignored, as in `data.index.duplicated(keep='first')`;
+        a repeat of a timestamp that has left the window is added again.
+        """
+        if timestamp in self.time_set:
+            return
+        if self.times:
+            delta = (timestamp - self.times[-1]).total_seconds()
+            self.deltas.append(delta)
+            self.histogram[delta] += 1
+        self.times.append(timestamp)
+        self.time_set.add(timestamp)
+        if len(self.times) > self.window_size:
+            self.time_set.discard(self.times.popleft())
+            delta = self.deltas.popleft()
+            self.histogram[delta] -= 1
+            if not self.histogram[delta]:
+                del self.histogram[delta]
+
+    def most_common_interval(self):
+        """
+        Return the most common delta in seconds (the smallest one on ties, like
+        `Series.mode()[0]`), or None if the window holds fewer than two timestamps.
+        """
+        if not self.histogram:
+            return None
+        highest_count = max(self.histogram.values())
+        return min(delta for delta, count in self.histogram.items() if count == highest_count)
+
+
+def _to_datetime(value):
+    """
+    Convert a cell value to a datetime, returning None for empty or invalid cells.
+    """
+    if isinstance(value, datetime):
+        return value
+    if value is None or value == "":
+        return None
+    try:
+        return pd.Timestamp(value).to_pydatetime()
+    except (ValueError, TypeError):
+        return None
+
+
+def _scan_rows(sheet, time_column, window_size, min_row=2):
+    """
+    Push the timestamps of the rows of a sheet from min_row on into a window.
+
+    Returns:
+        tuple: (IntervalWindow, number of rows read)
+    """
+    window = IntervalWindow(window_size)
+    n_rows = 0
+    for row in sheet.iter_rows(min_row=min_row, values_only=True):
+        n_rows += 1
+        timestamp = _to_datetime(row[time_column] if time_column < len(row) else None)
+        if timestamp is not None:
+            window.push(timestamp)
+    return window, n_rows
+
+
+def stored_sampling_time(temp_path, store_dir):
+    """
+    Sampling time of the resampled data of a raw file in the store.
+
+    The resampled data is on the regular grid of the sampling time detected by
+    the resampling, so its last two timestamps give it.
+
+    Args:
+        temp_path (str): Path to the raw Excel file (e.g. 'Raw_data/GUI_NO.12345.xlsx').
+        store_dir (str): The directory of the resampled data store.
+
+    Returns:
+        str: The sampling time, or None if the store has no data of the file
+            written after the file was last modified.
+    """
+    path = meter_path(os.path.basename(temp_path).split('.')[1], store_dir)
+    if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(temp_path):
+        return None
+    times = pd.read_parquet(path, columns=['time'])['time']
+    if len(times) < 2:
+        return None
+    return interval_to_sampling_time((times.iloc[-1] - times.iloc[-2]).total_seconds() / 60)
+
+
+def scan_sampling_time(temp_path, sheet_name='Sheet1', window_size=WINDOW_SIZE, tail_rows=TAIL_ROWS,
+                       store_dir=None):
+    """
+    Detect the sampling time of one raw Excel file by streaming its last rows.
+
+    The whole sheet is streamed when it does not record its dimensions, or when
+    its last tail_rows rows hold fewer than window_size distinct timestamps.
+
+    Args:
+        temp_path (str): Path to the raw Excel file.
+        sheet_name (str): The worksheet holding the readings.
+        window_size (int): Number of latest distinct timestamps considered.
+        tail_rows (int): Number of rows read from the end of the sheet.
+        store_dir (str, optional): The resampled data store. The sampling time
+            of a file whose resampled data is newer than it is read from the
+            store (see `stored_sampling_time`) instead of the file.
+
+    Returns:
+        dict: 'file_name', 'status' ('ok', 'empty' or 'failed'), 'sampling_time',
+            'n_rows' and 'error'.
+    """
+    result = {'file_name': os.path.basename(temp_path), 'status': 'ok',
+              'sampling_time': None, 'n_rows': 0, 'error': None}
+    window = None
+    try:
+        workbook = load_workbook(temp_path, read_only=True, data_only=True)
+        try:
+            sheet = workbook[sheet_name]
+            header = next(sheet.iter_rows(max_row=1, values_only=True), ())
+            time_column = list(header).index('time')
+            # Number of data rows from the dimensions of the sheet, None if the file has none
+            n_rows = sheet.max_row - 1 if sheet.max_row is not None else None
+            if n_rows is not None and n_rows >= MIN_ROWS and store_dir is not None:
+                result['sampling_time'] = stored_sampling_time(temp_path, store_dir)
+            if result['sampling_time'] is None:
+                if n_rows is not None and n_rows > tail_rows:
+                    window, _ = _scan_rows(sheet, time_column, window_size, min_row=sheet.max_row - tail_rows + 1)
+                    if len(window.times) < window_size:
+                        window = None
+                if window is None:
+                    window, n_rows = _scan_rows(sheet, time_column, window_size)
+        finally:
+            workbook.close()
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = repr(e)
+        return result
+
+    result['n_rows'] = n_rows
+    # Files with insufficient data are skipped by the resampling as well
+    if n_rows < MIN_ROWS:
+        result['status'] = 'empty'
+        return result
+    if result['sampling_time'] is not None:
+        return result
+
+    most_common_interval = window.most_common_interval()
+    if most_common_interval is None:
+        result['sampling_time'] = '60T'  # Default value
+    else:
+        result['sampling_time'] = interval_to_sampling_time(most_common_interval / 60)
+    return result
+
+
+def scan_sampling_times(file_paths, n_workers=1, store_dir=None):
+    """
+    Detect the sampling time of many raw files, optionally in a process pool.
+
+    Args:
+        file_paths (list): Paths to the raw Excel files.
+        n_workers (int): Number of worker processes. 1 runs in the current process.
+        store_dir (str, optional): The resampled data store (see `scan_sampling_time`).
+
+    Returns:
+        list: One result dict per file (see `scan_sampling_time`), in input order.
+    """
+    scan = partial(scan_sampling_time, store_dir=store_dir)
+    if n_workers <= 1:
+        return [scan(temp_path) for temp_path in tqdm(file_paths, desc="Scanning files")]
+    with Pool(processes=n_workers) as pool:
+        return list(tqdm(pool.imap(scan, file_paths, chunksize=8),
+                         total=len(file_paths), desc="Scanning files"))
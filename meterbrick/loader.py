@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：loader.py
+@Time: 10/19/2026 9:30 AM
+@Author: Mingchen Li
+
+Shared meter loader with an LRU cache bounded by memory size.
+
+The same meter is often needed several times in one run, e.g. in
+Data_Calculation.py for every zone that references it through isMeteredBy or
+hasPart. The loader keeps the most recently used meters in memory up to a byte
+budget, so each meter file is read at most once as long as it fits. The
+linearly interpolated data is a separate cached view derived from the cached
+raw data, so it does not cause a second read either.
+
+A time window (`start`/`end`) is pushed down to the store, so only the
+requested part of a meter is read from disk, unless the whole meter is already
+cached, in which case the window is sliced from memory.
+"""
+from collections import OrderedDict
+
+import pandas as pd
+
+from meterbrick.storage import DEFAULT_STORE_DIR, meter_id_from_name, read_meter, time_window_mask
+
+# Default memory budget of the cache (2 GB)
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+
+def frame_nbytes(data):
+    """
+    Memory used by a DataFrame in bytes, including its index.
+    """
+    return int(data.memory_usage(index=True, deep=True).sum())
+
+
+class MeterLoader:
+    """
+    Loader of meter data with an LRU cache bounded by bytes.
+    """
+
+    def __init__(self, store_dir=DEFAULT_STORE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            store_dir (str): The directory of the resampled data store.
+            max_bytes (int): Memory budget of the cache. 0 disables caching.
+        """
+        self.store_dir = store_dir
+        self.max_bytes = max_bytes
+        self.cache = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.reads = 0
+
+    def load(self, meter_name, columns=None, interpolate=False, start=None, end=None):
+        """
+        Load the data of a meter, from the cache when possible.
+
+        Args:
+            meter_name (str): The meter name or ID.
+            columns (list, optional): Columns to load besides 'time'. All columns by default.
+            interpolate (bool): Fill missing values by linear interpolation
+                (inside the time window when one is given).
+            start, end (str or pd.Timestamp, optional): Only load the readings
+                between these times (both included). All readings by default.
+
+        Returns:
+            pd.DataFrame: A copy of the meter data, safe to modify.
+
+        Raises:
+            FileNotFoundError: If no data exists for the meter.
+        """
+        meter_id = meter_id_from_name(meter_name)
+        columns = tuple(columns) if columns is not None else None
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+        return self._get(meter_id, columns, interpolate, start, end).copy()
+
+    def _get(self, meter_id, columns, interpolate, start=None, end=None):
+        key = (meter_id, columns, interpolate, start, end)
+        data = self._lookup(key)
+        if data is not None:
+            self.hits += 1
+            return data
+        self.misses += 1
+
+        if interpolate:
+            # The interpolated view is derived from the (cached) raw data
+            data = self._get(meter_id, columns, False, start, end).interpolate(method='linear')
+        else:
+            data = self._from_cached(meter_id, columns, start, end)
+            if data is None:
+                data = read_meter(meter_id, columns=columns, store_dir=self.store_dir, start=start, end=end)
+                self.reads += 1
+        self._store(key, data)
+        return data
+
+    def _from_cached(self, meter_id, columns, start, end):
+        # Project the columns and/or slice the window from cached data covering the
+        # request instead of reading the file again
+        windowed = start is not None or end is not None
+        candidates = []
+        if columns is not None:
+            candidates.append((meter_id, None, False, start, end))
+        if windowed:
+            candidates.append((meter_id, columns, False, None, None))
+            if columns is not None:
+                candidates.append((meter_id, None, False, None, None))
+        for candidate in candidates:
+            data = self._lookup(candidate)
+            if data is None:
+                continue
+            if windowed and candidate[3:] == (None, None):
+                data = data[time_window_mask(data['time'], start, end)].reset_index(drop=True)
+            if columns is not None:
+                data = data[['time'] + [c for c in columns if c != 'time']]
+            return data
+        return None
+
+    def _lookup(self, key):
+        data = self.cache.get(key)
+        if data is not None:
+            self.cache.move_to_end(key)
+            return data[0]
+        return None
+
+    def _store(self, key, data):
+        nbytes = frame_nbytes(data)
+        # Data larger than the whole budget is returned without being cached
+        if nbytes > self.max_bytes:
+            return
+        self.cache[key] = (data, nbytes)
+        self.current_bytes += nbytes
+        while self.current_bytes > self.max_bytes:
+            _, (_, evicted_bytes) = self.cache.popitem(last=False)
+            self.current_bytes -= evicted_bytes
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Empty the cache (the counters are kept).
+        """
+        self.cache.clear()
+        self.current_bytes = 0
+
+    def stats(self):
+        """
+        Return the cache counters.
+
+        Returns:
+            dict: 'hits', 'misses', 'evictions', 'reads' (files read from disk),
+                'entries' and 'bytes'.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'reads': self.reads, 'entries': len(self.cache), 'bytes': self.current_bytes}
+
+
+# Loader shared by the analysis scripts
+default_loader = MeterLoader()
+
+
+def load_meter(meter_name, columns=None, interpolate=False, start=None, end=None):
+    """
+    Load the data of a meter through the shared loader of the analysis scripts.
+
+    Args:
+        meter_name (str): The meter name or ID.
+        columns (list, optional): Columns to load besides 'time'. All columns by default.
+        interpolate (bool): Fill missing values by linear interpolation.
+        start, end (str or pd.Timestamp, optional): Only load the readings
+            between these times (both included). All readings by default.
+
+    Returns:
+        pd.DataFrame: The meter data.
+    """
+    return default_loader.load(meter_name, columns=columns, interpolate=interpolate, start=start, end=end)
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：manifest.py
+@Time: 10/18/2026 11:20 AM
+@Author: Mingchen Li
+
+Manifest of the resampling stage, used to skip unchanged raw files and to
+resume an interrupted run.
+
+The manifest is a JSON-lines file with one entry per processed raw file. An
+entry is appended as soon as a file has been processed, so a crash loses at most
+the files that were being processed at that moment. When a file appears more
+than once, the last entry wins; `compact` rewrites the file with one line per
+raw file.
+"""
+import hashlib
+import json
+import os
+
+MANIFEST_FILE_NAME = "Resampling_Manifest.jsonl"
+
+
+def file_hash(file_path, block_size=1 << 20):
+    """
+    Compute the SHA-256 hash of a file's content.
+
+    Args:
+        file_path (str): Path to the file.
+        block_size (int): Number of bytes read at a time.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def file_signature(file_path, with_hash=True):
+    """
+    Collect the size, modification time and (optionally) hash of a file.
+
+    Args:
+        file_path (str): Path to the file.
+        with_hash (bool): Also compute the content hash.
+
+    Returns:
+        dict: 'size', 'mtime' and 'sha256' (None when with_hash is False).
+    """
+    stat = os.stat(file_path)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime,
+            'sha256': file_hash(file_path) if with_hash else None}
+
+
+class ResamplingManifest:
+    """
+    Per raw file record of size, mtime, hash, detected sampling time and output path.
+    """
+
+    def __init__(self, manifest_path):
+        """
+        Load the manifest (an empty one if the file does not exist yet).
+
+        Args:
+            manifest_path (str): Path to the JSON-lines manifest file.
+        """
+        self.manifest_path = manifest_path
+        self.entries = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r", encoding="utf-8") as file:
+                for line in file:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A line cut short by a crash, the file is processed again
+                        continue
+                    self.entries[entry['file_name']] = entry
+
+    def needs_processing(self, file_path):
+        """
+        Check whether a raw file is new or has changed since it was processed.
+
+        The size and mtime are compared first. When only the mtime differs, the
+        content hash decides, so a file that was touched or copied is not
+        processed again.
+
+        Args:
+            file_path (str): Path to the raw file.
+
+        Returns:
+            bool: True if the file has to be (re-)processed.
+        """
+        entry = self.entries.get(os.path.basename(file_path))
+        if entry is None or entry['status'] == 'failed':
+            return True
+        if entry['status'] == 'ok' and not os.path.exists(entry['output_path']):
+            return True
+
+        signature = file_signature(file_path, with_hash=False)
+        if signature['size'] != entry['size']:
+            return True
+        if signature['mtime'] == entry['mtime']:
+            return False
+        if file_hash(file_path) != entry['sha256']:
+            return True
+
+        # Same content, only remember the new mtime
+        entry['mtime'] = signature['mtime']
+        self._append(entry)
+        return False
+
+    def record(self, result):
+        """
+        Add or replace the entry of a processed file and append it to disk.
+
+        Args:
+            result (dict): A result of `resample_raw_file`, including the file signature.
+        """
+        entry = {key: result.get(key) for key in
+                 ('file_name', 'size', 'mtime', 'sha256', 'status', 'sampling_time',
+                  'duplicated', 'output_path', 'error', 'late_rows')}
+        self.entries[entry['file_name']] = entry
+        self._append(entry)
+
+    def results(self, file_names):
+        """
+        Return the recorded entries of the given raw files, in the given order.
+
+        Args:
+            file_names (list): Names of the raw files currently in "Raw_data".
+
+        Returns:
+            list: Entries usable with `summarize_results`. Files without an entry are left out.
+        """
+        return [self.entries[file_name] for file_name in file_names if file_name in self.entries]
+
+    def compact(self, file_names=None):
+        """
+        Rewrite the manifest with one line per raw file.
+
+        Args:
+            file_names (list, optional): Keep only these raw files, which drops
+                the entries of files removed from "Raw_data".
+        """
+        if file_names is not None:
+            self.entries = {file_name: self.entries[file_name]
+                            for file_name in file_names if file_name in self.entries}
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            for entry in self.entries.values():
+                file.write(json.dumps(entry) + "\n")
+        os.replace(temp_path, self.manifest_path)
+
+    def _append(self, entry):
+        with open(self.manifest_path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(entry) + "\n")
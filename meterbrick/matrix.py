@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：matrix.py
+@Time: 10/19/2026 11:05 AM
+@Author: Mingchen Li
+
+Dense meter x time matrix on a shared time grid, backed by a memory-mapped file.
+
+Every meter is resampled once onto the same grid (hourly by default) and
+written to one row of a float64 array of shape (n_meters, n_timestamps). The
+array is stored as a ".npy" file next to a ".json" file with the meter IDs, the
+grid and the span covered by every meter, so analyses can slice rows without
+copying and sum meter groups with a single vectorized reduction instead of a
+`pd.concat` per group. When the gaps are filled on the grid with a maximum
+gap, the mask of the real readings is stored as a boolean ".observed.npy"
+file next to it.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+from meterbrick.instrumentation import file_size, span
+from meterbrick.interpolation import interpolate_block
+from meterbrick.loader import load_meter
+from meterbrick.storage import meter_id_from_name
+
+
+class MeterMatrix:
+    """
+    Meter x time float64 matrix with a meter ID -> row index.
+    """
+
+    def __init__(self, values, meter_ids, times, spans, observed=None, path=None):
+        """
+        Args:
+            values (np.ndarray): Array of shape (n_meters, n_timestamps), usually a memmap.
+            meter_ids (list): Meter ID of every row.
+            times (pd.DatetimeIndex): The shared time grid.
+            spans (np.ndarray): (n_meters, 2) first and last grid position covered
+                by every meter, -1 for meters without data.
+            observed (np.ndarray, optional): Boolean array of the shape of values,
+                True at the real (not interpolated) readings.
+            path (str, optional): Path of the matrix without extension, when it
+                is stored on disk.
+        """
+        self.values = values
+        self.meter_ids = list(meter_ids)
+        self.times = times
+        self.spans = spans
+        self.observed = observed
+        self.path = path
+        self.row_of = {meter_id: row for row, meter_id in enumerate(self.meter_ids)}
+
+    @staticmethod
+    def paths(path):
+        """
+        Return the data (.npy) and metadata (.json) paths of a matrix.
+        """
+        return path + ".npy", path + ".json"
+
+    @staticmethod
+    def observed_path(path):
+        """
+        Return the path of the mask of the real readings of a matrix.
+        """
+        return path + ".observed.npy"
+
+    @classmethod
+    def open(cls, path, mode='r'):
+        """
+        Open a matrix written by `build_meter_matrix` as a memory map.
+
+        Args:
+            path (str): Path of the matrix without extension.
+            mode (str): Memory-map mode ('r' read-only, 'r+' read-write).
+
+        Returns:
+            MeterMatrix: The matrix.
+        """
+        data_path, meta_path = cls.paths(path)
+        with open(meta_path, "r", encoding="utf-8") as file:
+            meta = json.load(file)
+        values = np.load(data_path, mmap_mode=mode)
+        times = pd.date_range(start=meta['start'], periods=meta['n_timestamps'], freq=meta['freq'])
+        observed = None
+        if os.path.exists(cls.observed_path(path)):
+            observed = np.load(cls.observed_path(path), mmap_mode=mode)
+        return cls(values, meta['meter_ids'], times, np.asarray(meta['spans'], dtype=np.int64).reshape(-1, 2),
+                   observed, path)
+
+    def rows_of(self, meter_names):
+        """
+        Row numbers of the given meters, ignoring meters not in the matrix.
+        """
+        rows = [self.row_of.get(meter_id_from_name(meter_name)) for meter_name in meter_names]
+        return np.array([row for row in rows if row is not None], dtype=np.int64)
+
+    def row(self, meter_name):
+        """
+        Zero-copy view of the row of a meter.
+        """
+        return self.values[self.row_of[meter_id_from_name(meter_name)]]
+
+    def coverage_of(self, rows):
+        """
+        Boolean mask of the grid positions covered by the span of any of the rows.
+        """
+        spans = self.spans[rows]
+        spans = spans[spans[:, 0] >= 0]
+        # +1 at the start and -1 after the end of every span, covered where the running sum is > 0
+        counts = np.zeros(len(self.times) + 1, dtype=np.int64)
+        np.add.at(counts, spans[:, 0], 1)
+        np.add.at(counts, spans[:, 1] + 1, -1)
+        return np.cumsum(counts[:-1]) > 0
+
+    def sum_meters(self, meter_names, trim=True):
+        """
+        Sum the readings of a group of meters at every timestamp.
+
+        Missing readings count as 0, like `DataFrame.sum(axis=1)`.
+
+        Args:
+            meter_names (list): Meter names or IDs of the group.
+            trim (bool): Keep only the timestamps covered by the span of a meter
+                of the group, which is the index `pd.concat` of the group's
+                resampled data would have.
+
+        Returns:
+            pd.Series: The summed readings indexed by time.
+        """
+        # Rows are sorted so a contiguous group is read as one block from the memory map
+        rows = np.sort(self.rows_of(meter_names))
+        total = np.nansum(self.values[rows], axis=0)
+        series = pd.Series(total, index=self.times.rename('time'))
+        if trim:
+            series = series[self.coverage_of(rows)]
+        return series
+
+    def complete_sum(self, meter_names):
+        """
+        Sum a group of meters at the timestamps where every meter has a reading.
+
+        This is the vectorized form of joining the meters column by column,
+        dropping the rows with any NaN and summing what is left. A group without
+        meters sums to 0 at every timestamp.
+
+        Args:
+            meter_names (list): Meter names or IDs of the group.
+
+        Returns:
+            pd.Series: The summed readings indexed by time.
+        """
+        rows = np.sort(self.rows_of(meter_names))
+        block = self.values[rows]
+        complete = ~np.isnan(block).any(axis=0)
+        return pd.Series(block[:, complete].sum(axis=0), index=self.times[complete].rename('time'))
+
+
+def grid_window(freq, start=None, end=None):
+    """
+    Time window of the readings of the grid steps between two times.
+
+    The window is widened to whole steps, so the first and last steps hold all
+    their readings.
+
+    Args:
+        freq (str): Fixed frequency of the time grid.
+        start, end (str or pd.Timestamp, optional): Bounds of the grid.
+
+    Returns:
+        dict: 'start' and/or 'end' of the readings, to be passed to a meter loader.
+    """
+    window = {}
+    if start is not None:
+        window['start'] = pd.Timestamp(start).floor(freq)
+    if end is not None:
+        window['end'] = pd.Timestamp(end).floor(freq) + pd.tseries.frequencies.to_offset(freq) \
+            - pd.Timedelta(1, 'ns')
+    return window
+
+
+def build_meter_matrix(meter_names, path, freq='H', column='number', interpolate=True,
+                       start=None, end=None, loader=load_meter, how='mean', max_gap=None):
+    """
+    Resample meters onto a shared time grid and write them to a memory-mapped matrix.
+
+    Args:
+        meter_names (list): Meter names or IDs (duplicates are ignored).
+        path (str): Path of the matrix without extension.
+        freq (str): Fixed frequency of the time grid, e.g. 'H' or 'D'.
+        column (str): The reading column.
+        interpolate (bool): Linearly interpolate the data before resampling.
+        start, end (str or pd.Timestamp, optional): Bounds of the grid. By
+            default the grid covers all the data of the meters.
+        loader (callable): Function loading a meter, `load_meter` by default.
+            Unless the data is interpolated before resampling, it is passed the
+            `start` and `end` of the grid, so it only reads the readings of the grid.
+        how (str): Aggregation of the readings in every grid step, e.g. 'mean'
+            or 'first' (the first valid reading, used for cumulative kWh).
+        max_gap (pd.Timedelta or dict, optional): With interpolate, the data is
+            resampled without interpolation and only the gaps of at most
+            max_gap (per meter ID for a dict) are filled on the grid, all meters
+            at once (see `interpolate_block`); the mask of the real readings is
+            saved with the matrix. None interpolates every gap of the data of
+            every meter before resampling.
+
+    Returns:
+        MeterMatrix: The matrix, opened read-only.
+    """
+    meter_ids = list(dict.fromkeys(meter_id_from_name(meter_name) for meter_name in meter_names))
+
+    # Without interpolation of the data only the readings of the grid steps are needed, so the
+    # bounds are pushed down to the loader (interpolation needs the readings around them). Gaps
+    # filled on the grid only use the readings of the grid, so the bounds are pushed down as well
+    limit_gaps = interpolate and max_gap is not None
+    if limit_gaps:
+        # The gaps are filled on the grid after all meters are written
+        interpolate = False
+
+    window = grid_window(freq, start, end) if not interpolate else {}
+
+    # Load and resample every meter once; meters that cannot be loaded are left out
+    resampled = {}
+    for meter_id in tqdm(meter_ids, desc="Resampling meters"):
+        try:
+            data = loader(meter_id, columns=[column], interpolate=interpolate, **window)
+        except FileNotFoundError:
+            print(f"File not found for {meter_id}")
+            continue
+        except Exception as e:
+            print(f"An error occurred for {meter_id}: {e}")
+            continue
+        with span("resample_meter", "compute", meter=meter_id, freq=freq, how=how) as info:
+            series = data.set_index('time')[column].resample(freq).agg(how)
+            info['rows'] = len(series)
+        if len(series):
+            resampled[meter_id] = series
+    meter_ids = [meter_id for meter_id in meter_ids if meter_id in resampled]
+
+    # Build the shared grid
+    if start is None:
+        start = min(series.index[0] for series in resampled.values()) if resampled else pd.Timestamp(0)
+    if end is None:
+        end = max(series.index[-1] for series in resampled.values()) if resampled else start
+    times = pd.date_range(start=pd.Timestamp(start).floor(freq), end=pd.Timestamp(end), freq=freq)
+    step = pd.tseries.frequencies.to_offset(freq).nanos
+
+    data_path, meta_path = MeterMatrix.paths(path)
+    os.makedirs(os.path.dirname(os.path.abspath(data_path)), exist_ok=True)
+    with span("write_matrix", "io", path=os.path.basename(path), rows=len(meter_ids)) as info:
+        values = np.lib.format.open_memmap(data_path, mode='w+', dtype=np.float64,
+                                           shape=(len(meter_ids), len(times)))
+        values[:] = np.nan
+        spans = np.full((len(meter_ids), 2), -1, dtype=np.int64)
+
+        # Write every meter to its row at the positions of its timestamps on the grid
+        for row, meter_id in enumerate(meter_ids):
+            series = resampled.pop(meter_id)
+            positions = (series.index.asi8 - times[0].value) // step
+            inside = (positions >= 0) & (positions < len(times))
+            if inside.any():
+                values[row, positions[inside]] = series.to_numpy()[inside]
+                spans[row] = positions[inside][0], positions[inside][-1]
+        observed_path = MeterMatrix.observed_path(path)
+        if limit_gaps:
+            # Fill the short gaps of all meters in place and keep the mask of the real readings
+            gaps = [max_gap.get(meter_id) for meter_id in meter_ids] if isinstance(max_gap, dict) else max_gap
+            _, observed = interpolate_block(values, times, max_gap=gaps, out=values)
+            np.save(observed_path, observed)
+        elif os.path.exists(observed_path):
+            os.remove(observed_path)
+        values.flush()
+        del values
+        info['bytes'] = file_size(data_path)
+
+    with open(meta_path, "w", encoding="utf-8") as file:
+        json.dump({'meter_ids': meter_ids, 'start': str(times[0]), 'freq': freq,
+                   'n_timestamps': len(times), 'spans': spans.tolist()}, file)
+    return MeterMatrix.open(path)
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：missing_rate.py
+@Time: 10/19/2026 4:40 PM
+@Author: Mingchen Li
+
+Quarterly missing rates of the resampled meter data.
+
+`multi_resolution_missing_rates` reads every meter once and computes its
+quarterly missing rates at all the sampling times it contributes to (15T, 30T,
+60T and 1440T) from the same in-memory series, instead of reading a 15-minute
+meter four times.
+
+`category_missing_rates` computes the hourly quarterly missing rates of every
+meter of meter_category.xlsx once, even when the meter belongs to several
+categories, and averages them per category with a groupby.
+
+The missing rates at an hour or coarser are read from the 'count' of the
+rollups of the meters (see `meterbrick.rollup`): a bin without any valid
+reading is exactly a bin whose `.first()` is NaN, so only meters sampled more
+often than hourly still have their resampled data read.
+"""
+import os
+from multiprocessing import Pool
+
+import pandas as pd
+from tqdm import tqdm
+
+from meterbrick.instrumentation import span
+from meterbrick.rollup import read_rollup, rollup_level
+from meterbrick.storage import DEFAULT_STORE_DIR, meter_exists, read_meter
+
+# Sampling times from the finest to the coarsest
+SAMPLING_TIMES = ['15T', '30T', '60T', '1440T']
+
+
+def quarterly_missing_rates(df, resample_freq=None):
+    """
+    Missing rate of the 'number' column in every quarter.
+
+    Args:
+        df (pd.DataFrame): Meter data with 'time' and 'number' columns.
+        resample_freq (str, optional): Resample with `.first()` before counting.
+
+    Returns:
+        pd.Series: Missing rate indexed by quarter (pd.Period).
+    """
+    if resample_freq:
+        df = df.set_index('time').resample(resample_freq).first().reset_index()
+    quarters = df['time'].dt.to_period('Q')
+    return df['number'].isna().groupby(quarters).mean()
+
+
+def rollup_missing_rates(meter_name, freq, store_dir=DEFAULT_STORE_DIR, start=None):
+    """
+    Missing rate of every quarter from the valid-reading counts of the rollups of a meter.
+
+    Args:
+        meter_name (str): The meter name or ID.
+        freq (str): The resolution, an hour or coarser (e.g. '60T' or '1440T').
+        store_dir (str): The directory of the resampled data store.
+        start (str, optional): Ignore the bins before this time.
+
+    Returns:
+        pd.Series: Missing rate indexed by quarter (pd.Period).
+    """
+    counts = read_rollup(meter_name, freq, stats=['count'], store_dir=store_dir, start=start)['count']
+    return (counts == 0).groupby(counts.index.to_period('Q')).mean()
+
+
+def _clean_time(df):
+    # Convert 'time' column to datetime type and drop rows with invalid 'time'
+    df['time'] = pd.to_datetime(df['time'], errors='coerce')
+    return df.dropna(subset=['time'])
+
+
+def file_missing_rates(file_name, sampling_time, store_dir=DEFAULT_STORE_DIR):
+    """
+    Read one meter and compute its quarterly missing rates at its own sampling
+    time and at every coarser one.
+
+    The data is used as it is at 15T and resampled with `.first()` at the other
+    sampling times, as in Missing_Rate_Sampling_Times.py.
+
+    Args:
+        file_name (str): The meter file name or ID, e.g. '12345.xlsx'.
+        sampling_time (str): The sampling time of the meter ('15T', '30T', '60T' or '1440T').
+        store_dir (str): The directory of the resampled data store.
+
+    Returns:
+        dict: Sampling time -> pd.Series of quarterly missing rates, or None if
+            the meter does not exist.
+    """
+    if not meter_exists(file_name, store_dir=store_dir):
+        return None
+    targets = SAMPLING_TIMES[SAMPLING_TIMES.index(sampling_time):]
+
+    rates = {}
+    with span("missing_rates", "compute", meter=file_name, sampling_time=sampling_time):
+        # Sampling times finer than an hour are computed from the resampled data, the others from the rollups
+        fine_targets = [target for target in targets if rollup_level(target) is None]
+        if fine_targets:
+            df = _clean_time(read_meter(file_name, columns=['number'], store_dir=store_dir))
+            for target in fine_targets:
+                rates[target] = quarterly_missing_rates(df, resample_freq=None if target == '15T' else target)
+        for target in targets:
+            if target not in rates:
+                rates[target] = rollup_missing_rates(file_name, target, store_dir=store_dir)
+    return rates
+
+
+def average_quarterly_rates(rates):
+    """
+    Average missing rate of every quarter over several meters.
+
+    Args:
+        rates (list): pd.Series of quarterly missing rates, one per meter.
+
+    Returns:
+        pd.DataFrame: 'Quarter' and 'Average Missing Rate', sorted by quarter.
+    """
+    if not rates:
+        return pd.DataFrame(columns=['Quarter', 'Average Missing Rate'])
+    average = pd.concat(rates).groupby(level=0).mean()
+    results_df = pd.DataFrame({'Quarter': average.index, 'Average Missing Rate': average.values})
+    return results_df.sort_values(by='Quarter')
+
+
+def _file_missing_rates(args):
+    return args[0], file_missing_rates(*args)
+
+
+def multi_resolution_missing_rates(file_sampling_times, store_dir=DEFAULT_STORE_DIR, n_workers=1):
+    """
+    Average quarterly missing rates at 15T, 30T, 60T and 1440T in a single pass over the files.
+
+    A meter sampled at 15T contributes to all four results, a 30T meter to the
+    30T, 60T and 1440T results, and so on.
+
+    Args:
+        file_sampling_times (list): (file name, sampling time) pairs.
+        store_dir (str): The directory of the resampled data store.
+        n_workers (int): Number of worker processes. 1 runs in the current process.
+
+    Returns:
+        dict: Sampling time -> DataFrame of average quarterly missing rates.
+    """
+    tasks = [(file_name, sampling_time, store_dir) for file_name, sampling_time in file_sampling_times]
+    if n_workers <= 1:
+        results = (_file_missing_rates(task) for task in tasks)
+    else:
+        pool = Pool(processes=n_workers)
+        results = pool.imap(_file_missing_rates, tasks, chunksize=4)
+
+    collected = {sampling_time: [] for sampling_time in SAMPLING_TIMES}
+    try:
+        for file_name, rates in tqdm(results, total=len(tasks)):
+            # Check if the file exists, if not, skip it
+            if rates is None:
+                print(f"File {os.path.join(store_dir, file_name)} does not exist. Skipping.")
+                continue
+            for sampling_time, rate in rates.items():
+                collected[sampling_time].append(rate)
+    finally:
+        if n_workers > 1:
+            pool.close()
+            pool.join()
+
+    return {sampling_time: average_quarterly_rates(rates) for sampling_time, rates in collected.items()}
+
+
+def hourly_meter_missing_rates(meter_name, store_dir=DEFAULT_STORE_DIR, resample_freq='H', min_year=2022):
+    """
+    Quarterly missing rates of one meter at hourly resolution, as in Missing_Rate_Building_Hour.py.
+
+    Daily data is not resampled. Data before min_year is ignored. The rates are
+    read from the rollups of the meter.
+
+    Args:
+        meter_name (str): The meter name or ID.
+        store_dir (str): The directory of the resampled data store.
+        resample_freq (str): The resolution of the missing rates, an hour or coarser.
+        min_year (int): First year taken into account.
+
+    Returns:
+        pd.Series: Missing rate indexed by quarter, or None if the meter does not exist.
+    """
+    if not meter_exists(meter_name, store_dir=store_dir):
+        return None
+    # Unreasonable years (e.g., before 2022) are filtered out while reading
+    start = f"{min_year}-01-01"
+    counts = read_rollup(meter_name, resample_freq, stats=['count'], store_dir=store_dir, start=start)['count']
+
+    # Check if data is already daily (every reading at midnight), if so, use one bin per day
+    valid_times = counts.index[counts > 0]
+    if len(valid_times) and (valid_times == valid_times.normalize()).all():
+        return rollup_missing_rates(meter_name, 'D', store_dir=store_dir, start=start)
+    return (counts == 0).groupby(counts.index.to_period('Q')).mean()
+
+
+def _hourly_meter_missing_rates(args):
+    return args[0], hourly_meter_missing_rates(*args)
+
+
+def category_missing_rates(category_meters, store_dir=DEFAULT_STORE_DIR, n_workers=1):
+    """
+    Average quarterly missing rates of meter categories.
+
+    The rates of each unique meter are computed once (in a process pool when
+    n_workers > 1) and the category averages are a groupby over them.
+
+    Args:
+        category_meters (dict): Category -> list of meter IDs.
+        store_dir (str): The directory of the resampled data store.
+        n_workers (int): Number of worker processes. 1 runs in the current process.
+
+    Returns:
+        dict: Category -> DataFrame of average quarterly missing rates.
+    """
+    unique_meters = list(dict.fromkeys(meter for meters in category_meters.values() for meter in meters))
+    tasks = [(meter, store_dir) for meter in unique_meters]
+    if n_workers <= 1:
+        results = (_hourly_meter_missing_rates(task) for task in tasks)
+    else:
+        pool = Pool(processes=n_workers)
+        results = pool.imap_unordered(_hourly_meter_missing_rates, tasks, chunksize=4)
+
+    meter_rates = {}
+    try:
+        for meter, rates in tqdm(results, total=len(tasks)):
+            # Check if the file exists, if not, skip it
+            if rates is None:
+                print(f"File {meter} does not exist. Skipping.")
+                continue
+            meter_rates[meter] = rates
+    finally:
+        if n_workers > 1:
+            pool.close()
+            pool.join()
+
+    # Long table of (Meter, Quarter, rate) joined with the (Category, Meter) membership
+    membership = pd.DataFrame([(category, meter) for category, meters in category_meters.items()
+                               for meter in meters], columns=['Category', 'Meter'])
+    if meter_rates:
+        long_rates = pd.concat(meter_rates, names=['Meter', 'Quarter']).rename('rate').reset_index()
+    else:
+        long_rates = pd.DataFrame(columns=['Meter', 'Quarter', 'rate'])
+    averages = (membership.merge(long_rates, on='Meter')
+                .groupby(['Category', 'Quarter'])['rate'].mean())
+
+    results = {}
+    for category in category_meters:
+        if category in averages.index.get_level_values('Category'):
+            average = averages.loc[category]
+            results[category] = pd.DataFrame({'Quarter': average.index,
+                                              'Average Missing Rate': average.values}).sort_values(by='Quarter')
+        else:
+            results[category] = average_quarterly_rates([])
+    return results
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：outliers.py
+@Time: 10/20/2026 8:40 PM
+@Author: Mingchen Li
+
+1.5*IQR outlier filter backed by a mergeable quantile sketch.
+
+The quartiles are estimated by a KLL sketch: the values are kept in levels of
+sorted "compactors", and a full level keeps every other value (from a random
+offset) with twice the weight in the level above. The sketch uses a bounded
+amount of memory whatever the number of values, is updated chunk by chunk and
+sketches of different chunks, files or worker processes can be merged. Its
+rank error is at most about `epsilon` (with 0.001, at most 0.1% of the values
+lie between an estimated quartile and the exact one). With `epsilon=None` nothing is ever
+compacted and the quartiles are exact, the same as `Series.quantile`.
+
+A filter is used in two passes over data that does not fit in memory:
+
+    outlier_filter = IQRFilter(epsilon=0.001)
+    for chunk in chunks:
+        outlier_filter.update(chunk['kW'])
+    for chunk in chunks:
+        cleaned = chunk[outlier_filter.mask(chunk['kW'])]
+"""
+import math
+
+import numpy as np
+
+# Multiple of the IQR beyond the quartiles outside of which values are outliers
+WHISKER = 1.5
+
+# Sketch size per unit of rank error, k = KLL_CONSTANT / epsilon
+KLL_CONSTANT = 4.0
+
+# Capacity ratio between a level and the level above
+CAPACITY_RATIO = 2 / 3
+
+
+class QuantileSketch:
+    """
+    KLL quantile sketch of a stream of float values (NaN values are ignored).
+    """
+
+    def __init__(self, epsilon=None, seed=0):
+        """
+        Args:
+            epsilon (float, optional): Target rank error, e.g. 0.001. None keeps
+                every value and gives exact quantiles.
+            seed (int): Seed of the random compaction offsets.
+        """
+        self.epsilon = epsilon
+        self.k = None if epsilon is None else max(8, int(math.ceil(KLL_CONSTANT / epsilon)))
+        # The values of level h have a weight of 2 ** h
+        self.levels = [np.empty(0)]
+        self.n = 0
+        self.rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        return max(2, int(math.ceil(self.k * CAPACITY_RATIO ** (len(self.levels) - 1 - level))))
+
+    def _compress(self):
+        if self.k is None:
+            return
+        while True:
+            full = [level for level in range(len(self.levels)) if len(self.levels[level]) > self._capacity(level)]
+            if not full:
+                return
+            level = full[0]
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            values = np.sort(self.levels[level])
+            # With an odd number of values, the smallest one stays in the level
+            odd = len(values) % 2
+            promoted = values[odd:][self.rng.integers(2)::2]
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            self.levels[level] = values[:odd]
+
+    def update(self, values):
+        """
+        Add values (any array-like) to the sketch.
+
+        Returns:
+            QuantileSketch: The sketch itself.
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """
+        Add the values of another sketch (of the same epsilon) to this one.
+
+        Returns:
+            QuantileSketch: The sketch itself.
+        """
+        for level, values in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], values])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def size(self):
+        """
+        Number of values kept by the sketch.
+        """
+        return sum(len(values) for values in self.levels)
+
+    def quantiles(self, qs):
+        """
+        Estimate quantiles with linear interpolation between ranks, like `Series.quantile`.
+
+        Args:
+            qs (list): Quantiles between 0 and 1, e.g. [0.25, 0.75].
+
+        Returns:
+            np.ndarray: The estimated quantiles (NaN for an empty sketch).
+        """
+        qs = np.asarray(qs, dtype=np.float64)
+        if self.n == 0:
+            return np.full(qs.shape, np.nan)
+        if len(self.levels) == 1:
+            # Nothing was compacted, the quantiles are exact
+            return np.quantile(self.levels[0], qs)
+
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level_values), 2 ** level, dtype=np.int64)
+                                  for level, level_values in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        values = values[order]
+        # A value of weight w stands for w consecutive ranks ending at its cumulative weight
+        ends = np.cumsum(weights[order])
+        positions = qs * (ends[-1] - 1)
+        lower = np.floor(positions)
+        lower_values = values[np.searchsorted(ends, lower, side='right')]
+        upper_values = values[np.searchsorted(ends, np.minimum(lower + 1, ends[-1] - 1), side='right')]
+        return lower_values + (upper_values - lower_values) * (positions - lower)
+
+    def quantile(self, q):
+        """
+        Estimate one quantile (see `quantiles`).
+        """
+        return float(self.quantiles([q])[0])
+
+
+class IQRFilter:
+    """
+    Outlier filter keeping the values within WHISKER * IQR of the quartiles.
+    """
+
+    def __init__(self, epsilon=None, whisker=WHISKER, seed=0):
+        """
+        Args:
+            epsilon (float, optional): Rank error of the quartiles. None computes
+                exact quartiles.
+            whisker (float): Multiple of the IQR beyond the quartiles.
+            seed (int): Seed of the sketch.
+        """
+        self.sketch = QuantileSketch(epsilon=epsilon, seed=seed)
+        self.whisker = whisker
+
+    def update(self, values):
+        """
+        Add values (e.g. one chunk of a series) to the quartile sketch.
+
+        Returns:
+            IQRFilter: The filter itself.
+        """
+        self.sketch.update(values)
+        return self
+
+    def merge(self, other):
+        """
+        Add the values seen by another filter, e.g. of another worker process.
+
+        Returns:
+            IQRFilter: The filter itself.
+        """
+        self.sketch.merge(other.sketch)
+        return self
+
+    def bounds(self):
+        """
+        Lower and upper bounds of the values that are not outliers.
+
+        Returns:
+            tuple: (lower, upper)
+        """
+        Q1, Q3 = self.sketch.quantiles([0.25, 0.75])
+        IQR = Q3 - Q1
+        return Q1 - self.whisker * IQR, Q3 + self.whisker * IQR
+
+    def mask(self, values):
+        """
+        True for the values within the bounds (False for NaN values).
+
+        Args:
+            values (pd.Series or np.ndarray): The values to filter.
+
+        Returns:
+            pd.Series or np.ndarray: Boolean mask of the same type and index.
+        """
+        lower, upper = self.bounds()
+        return (values >= lower) & (values <= upper)
+
+
+def iqr_mask(values, epsilon=None, whisker=WHISKER):
+    """
+    Mask of the values that are not outliers with the 1.5*IQR method, in one call.
+
+    Args:
+        values (pd.Series or np.ndarray): The values.
+        epsilon (float, optional): Rank error of the quartiles. None computes
+            exact quartiles.
+        whisker (float): Multiple of the IQR beyond the quartiles.
+
+    Returns:
+        pd.Series or np.ndarray: True for the values to keep.
+    """
+    return IQRFilter(epsilon=epsilon, whisker=whisker).update(values).mask(values)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：queries.py
+@Time: 10/20/2026 11:30 AM
+@Author: Mingchen Li
+
+SPARQL queries of the Query_Example scripts, shared with the command line.
+
+The queries using closure:typeStar need a graph loaded with
+`load_graph(..., materialize=True)`. All functions return local names (the
+part of the URI after "#").
+"""
+
+# SPARQL query to select all buildings
+BUILDINGS_QUERY = """
+    SELECT ?building
+    WHERE {
+        ?building a brick:Building .
+    }
+"""
+
+# SPARQL query to select all zones that are part of a building
+BUILDING_ZONES_QUERY = """
+    SELECT  ?zone
+    WHERE {{
+        ?zone a brick:Zone .
+        bldg:{building} brick:hasPart ?zone  .
+    }}
+"""
+
+# SPARQL query to select all zones that are not part of a building
+OTHER_ZONES_QUERY = """
+    SELECT ?zone
+    WHERE {{
+        ?zone a brick:Zone .
+        FILTER NOT EXISTS {{ bldg:{building} brick:hasPart ?zone }}
+    }}
+"""
+
+# Query to select all meters associated with a zone
+ZONE_METERS_QUERY = """
+    SELECT  ?meter
+    WHERE {{
+        bldg:{zone} brick:isMeteredBy ?meter .
+        ?meter closure:typeStar brick:Meter .
+    }}
+"""
+
+# SPARQL query to select all equipment in a zone, excluding electrical meters
+ZONE_EQUIPMENT_QUERY = """
+    SELECT  ?equip
+    WHERE {{
+        bldg:{zone}  brick:hasPart ?equip  .
+        ?equip a ?Equipment .
+        ?Equipment  closure:typeStar  brick:Equipment  .
+        FILTER(?aa != brick:Electrical_Meter)
+    }}
+"""
+
+
+def local_names(result, variable):
+    """
+    Local names of one variable of the rows of a query result.
+    """
+    return [str(row[variable]).split("#")[-1] for row in result]
+
+
+def buildings(g):
+    """
+    Names of all buildings.
+    """
+    return local_names(g.query(BUILDINGS_QUERY), 'building')
+
+
+def building_zones(g, building="Academic_Building"):
+    """
+    Names of the zones that are part of a building.
+    """
+    return local_names(g.query(BUILDING_ZONES_QUERY.format(building=building)), 'zone')
+
+
+def other_zones(g, building="Academic_Building"):
+    """
+    Names of the zones that are not part of a building.
+    """
+    return local_names(g.query(OTHER_ZONES_QUERY.format(building=building)), 'zone')
+
+
+def zone_meters(g, zone):
+    """
+    Names of the meters of a zone (brick:isMeteredBy, of any brick:Meter type).
+    """
+    return local_names(g.query(ZONE_METERS_QUERY.format(zone=zone)), 'meter')
+
+
+def zone_equipment(g, zone):
+    """
+    URIs of the equipment that is part of a zone, excluding electrical meters.
+    """
+    return [str(row['equip']) for row in g.query(ZONE_EQUIPMENT_QUERY.format(zone=zone))]
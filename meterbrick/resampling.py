@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：resampling.py
+@Time: 10/18/2026 10:05 AM
+@Author: Mingchen Li
+
+Resampling of the raw meter exports in "Raw_data" into the Parquet store.
+
+Every raw file is processed independently by `resample_raw_file`, so the files
+can be spread over a process pool with `run_resampling`.
+"""
+import gc
+import math
+import os
+from multiprocessing import Pool
+
+import pandas as pd
+from tqdm import tqdm
+
+from meterbrick.instrumentation import file_size, span
+from meterbrick.manifest import file_signature
+from meterbrick.rollup import meter_rollups_are_fresh, write_meter_rollups
+from meterbrick.storage import write_meter
+
+# Files with fewer rows than this are reported as empty and skipped
+MIN_ROWS = 100
+
+
+def detect_sampling_time(index):
+    """
+    Detect the sampling interval of a meter from the last 100 timestamps.
+
+    Args:
+        index (pd.DatetimeIndex): The (deduplicated) time index of the meter.
+
+    Returns:
+        str: One of '15T', '30T', '60T' or '1440T'.
+    """
+    last_times = index[-100:]
+    # Calculate time differences
+    time_deltas = last_times.to_series().diff().dt.total_seconds().dropna()
+
+    # Find the most common time interval (in seconds)
+    most_common_interval = time_deltas.mode()[0]
+
+    return interval_to_sampling_time(most_common_interval / 60)
+
+
+def interval_to_sampling_time(interval_in_minutes):
+    """
+    Map an interval in minutes to the nearest supported sampling time.
+
+    Args:
+        interval_in_minutes (float): The most common interval between readings.
+
+    Returns:
+        str: One of '15T', '30T', '60T' or '1440T' ('60T' if nothing matches).
+    """
+    # Check if interval is approximately 15, 30, or 60 minutes using a tolerance
+    if math.isclose(interval_in_minutes, 15, abs_tol=0.9):
+        return '15T'
+    elif math.isclose(interval_in_minutes, 30, abs_tol=0.9):
+        return '30T'
+    elif math.isclose(interval_in_minutes, 60, abs_tol=0.9):
+        return '60T'
+    elif math.isclose(interval_in_minutes, 1440, abs_tol=0.9):
+        return '1440T'
+    return '60T'  # Default value
+
+
+def resample_raw_file(temp_path, store_dir):
+    """
+    Read one raw meter export, remove duplicate timestamps, detect its sampling
+    interval and save the resampled data to the store.
+
+    Args:
+        temp_path (str): Path to the raw Excel file (e.g. 'Raw_data/GUI_NO.12345.xlsx').
+        store_dir (str): The directory of the resampled data store.
+
+    Returns:
+        dict: 'file_name', 'status' ('ok', 'empty' or 'failed'), 'sampling_time',
+            'duplicated', 'output_path' and 'error'.
+    """
+    file_name = os.path.basename(temp_path)
+    result = {'file_name': file_name, 'status': 'ok', 'sampling_time': None,
+              'duplicated': False, 'output_path': None, 'error': None}
+
+    # Read the data from the Excel file
+    with span("read_excel", "io", file=file_name, bytes=file_size(temp_path)) as info:
+        data = pd.read_excel(temp_path, sheet_name='Sheet1')
+        info['rows'] = len(data)
+
+    # Check if the data has less than 100 rows
+    if len(data) < MIN_ROWS:
+        result['status'] = 'empty'
+        return result
+
+    # Convert the 'time' column to datetime
+    with span("to_datetime", "compute", file=file_name, rows=len(data)):
+        data['time'] = pd.to_datetime(data['time'])
+    # Set the 'time' column as the index
+    data.set_index('time', inplace=True)
+
+    # Remove duplicate timestamps
+    if data.index.duplicated().any():
+        result['duplicated'] = True
+        data = data.loc[~data.index.duplicated(keep='first')]
+
+    sampling_time = detect_sampling_time(data.index)
+    result['sampling_time'] = sampling_time
+
+    # Resample the data to the detected sampling interval
+    with span("resample", "compute", file=file_name, sampling_time=sampling_time) as info:
+        resampled_data = data.resample(sampling_time).mean()
+        info['rows'] = len(resampled_data)
+    # Save the resampled data to the Parquet store (one file per meter)
+    result['output_path'] = write_meter(resampled_data, file_name.split('.')[1], store_dir=store_dir)
+    return result
+
+
+# Address-space cap of this worker process in MB, set by `_limit_worker_memory`
+_address_space_cap_mb = None
+
+
+def _limit_worker_memory(max_worker_memory_mb):
+    """
+    Pool initializer capping the address space of a worker process.
+
+    The cap is RLIMIT_AS, a limit on the virtual address space and not on the
+    resident memory (RSS): the shared libraries, the thread stacks and the
+    reserved but unused arenas of NumPy, pandas and openpyxl count towards it,
+    so a worker can fail well before its RSS reaches the cap. The cap relies on
+    the `resource` module and is skipped on platforms that do not provide it
+    (e.g. Windows).
+    """
+    global _address_space_cap_mb
+    if not max_worker_memory_mb:
+        return
+    try:
+        import resource
+    except ImportError:
+        return
+    max_bytes = int(max_worker_memory_mb * 1024 * 1024)
+    resource.setrlimit(resource.RLIMIT_AS, (max_bytes, max_bytes))
+    _address_space_cap_mb = max_worker_memory_mb
+
+
+def _resample_raw_file_safe(args):
+    """
+    Worker wrapper around `resample_raw_file` that adds the signature of the raw
+    file (size, mtime, hash) for the manifest, writes the rollups of the meter
+    if asked and turns exceptions into a 'failed' result. A MemoryError under
+    the address-space cap is reported as such.
+    """
+    temp_path, store_dir, chunked_min_mb, chunk_rows, rollups = args
+    try:
+        signature = file_signature(temp_path)
+        chunked = chunked_min_mb is not None and signature['size'] >= chunked_min_mb * 1024 * 1024
+        with span("resample_raw_file", "stage", file=os.path.basename(temp_path), bytes=signature['size'],
+                  chunked=chunked):
+            if chunked:
+                # Imported here because the ingestion module builds on this one
+                from meterbrick.ingestion import resample_raw_file_chunked
+                result = resample_raw_file_chunked(temp_path, store_dir, chunk_rows=chunk_rows)
+            else:
+                result = resample_raw_file(temp_path, store_dir)
+            if rollups and result['status'] == 'ok':
+                write_meter_rollups(os.path.basename(result['output_path']), store_dir)
+        result.update(signature)
+    except Exception as e:
+        error = repr(e)
+        if isinstance(e, MemoryError) and _address_space_cap_mb is not None:
+            error = (f"MemoryError under the address-space cap of {_address_space_cap_mb} MB "
+                     f"(MAX_WORKER_MEMORY_MB limits virtual memory, not RSS): {error}")
+        result = {'file_name': os.path.basename(temp_path), 'status': 'failed',
+                  'sampling_time': None, 'duplicated': False, 'output_path': None,
+                  'error': error}
+    gc.collect()
+    return result
+
+
+def _refresh_meter_rollups(manifest, skipped_paths, store_dir):
+    """
+    Rebuild the missing or stale rollups of skipped files (e.g. when the
+    rollups are turned on after the files were processed).
+    """
+    stale = [entry['output_path'] for entry in manifest.results([os.path.basename(temp_path)
+                                                                 for temp_path in skipped_paths])
+             if entry['status'] == 'ok' and not meter_rollups_are_fresh(os.path.basename(entry['output_path']),
+                                                                        store_dir)]
+    for output_path in tqdm(stale, desc="Refreshing rollups"):
+        write_meter_rollups(os.path.basename(output_path), store_dir)
+
+
+def run_resampling(file_paths, store_dir, n_workers=1, max_worker_memory_mb=None,
+                   max_tasks_per_worker=50, manifest=None, chunked_min_mb=None, chunk_rows=200_000,
+                   rollups=False):
+    """
+    Resample a list of raw files, optionally in a process pool.
+
+    With a manifest, only new or modified files are processed and every result
+    is recorded as soon as it arrives, so an interrupted run resumes where it
+    stopped.
+
+    Args:
+        file_paths (list): Paths to the raw Excel files.
+        store_dir (str): The directory of the resampled data store.
+        n_workers (int): Number of worker processes. 1 runs in the current process.
+        max_worker_memory_mb (float, optional): Address-space (RLIMIT_AS) cap of
+            each worker in MB, which limits virtual memory rather than RSS. None
+            for no cap. Only applied to the workers of the pool (n_workers > 1).
+        max_tasks_per_worker (int): Files processed by a worker before it is
+            replaced, which returns its memory to the system.
+        manifest (ResamplingManifest, optional): Manifest of previous runs.
+        chunked_min_mb (float, optional): Raw files of at least this size (in MB)
+            are streamed in chunks by `meterbrick.ingestion` instead of being
+            loaded at once. None loads every file at once.
+        chunk_rows (int): Number of raw rows per chunk of the chunked ingestion.
+        rollups (bool): Also write the hourly, daily and monthly rollups of
+            every processed meter (see `meterbrick.rollup`), and rebuild the
+            missing or stale rollups of the skipped ones.
+
+    Returns:
+        list: One result dict per file (see `resample_raw_file`), in input order.
+            With a manifest, the recorded entries of all files are returned,
+            including the ones skipped in this run.
+    """
+    if manifest is not None:
+        todo_paths = [temp_path for temp_path in file_paths if manifest.needs_processing(temp_path)]
+        print(f"{len(file_paths) - len(todo_paths)} unchanged files skipped, "
+              f"{len(todo_paths)} files to process.")
+        if rollups:
+            _refresh_meter_rollups(manifest, [temp_path for temp_path in file_paths if temp_path not in todo_paths],
+                                   store_dir)
+    else:
+        todo_paths = file_paths
+    tasks = [(temp_path, store_dir, chunked_min_mb, chunk_rows, rollups) for temp_path in todo_paths]
+
+    results = []
+    if n_workers <= 1:
+        for task in tqdm(tasks, desc="Processing files"):
+            results.append(_resample_raw_file_safe(task))
+            if manifest is not None:
+                manifest.record(results[-1])
+    else:
+        with Pool(processes=n_workers, initializer=_limit_worker_memory,
+                  initargs=(max_worker_memory_mb,), maxtasksperchild=max_tasks_per_worker) as pool:
+            # imap keeps the input order, so Sampling_Info.xlsx is the same as for a sequential run
+            for result in tqdm(pool.imap(_resample_raw_file_safe, tasks), total=len(tasks),
+                               desc="Processing files"):
+                results.append(result)
+                if manifest is not None:
+                    manifest.record(result)
+
+    # Out-of-order rows of the chunked ingestion could not be checked for duplicates
+    late_files = [(result['file_name'], result['late_rows']) for result in results if result.get('late_rows')]
+    if late_files:
+        print(f"Warning: {len(late_files)} files streamed in chunks have rows out of time order, "
+              f"not checked for duplicate timestamps: "
+              + ", ".join(f"{file_name} ({late_rows} rows)" for file_name, late_rows in late_files))
+
+    if manifest is None:
+        return results
+    file_names = [os.path.basename(temp_path) for temp_path in file_paths]
+    manifest.compact(file_names)
+    return manifest.results(file_names)
+
+
+def summarize_results(results):
+    """
+    Split the per-file results into the lists reported by "Data Resampling.py".
+
+    Args:
+        results (list): Result dicts returned by `run_resampling`.
+
+    Returns:
+        tuple: (sampling_info, empty_data, duplicated_time, failed_files)
+    """
+    sampling_info = []
+    empty_data = []
+    duplicated_time = []
+    failed_files = []
+    for result in results:
+        if result['status'] == 'empty':
+            empty_data.append(result['file_name'])
+        elif result['status'] == 'failed':
+            failed_files.append((result['file_name'], result['error']))
+        else:
+            sampling_info.append([result['file_name'], result['sampling_time']])
+        if result['duplicated']:
+            duplicated_time.append(result['file_name'])
+    return sampling_info, empty_data, duplicated_time, failed_files
@@ -0,0 +1,452 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：rollup.py
+@Time: 10/20/2026 6:10 PM
+@Author: Mingchen Li
+
+Materialized rollup pyramid of the resampled meter data.
+
+The resampling stage writes, next to the data of every meter, its hourly,
+daily and monthly rollups with the 'sum', 'mean', 'first', 'last' and 'count'
+(of valid readings) of the 'number' column, e.g.
+"Resampled Data/Rollups/meters/daily/12345.parquet". The hourly level is
+computed from the resampled data and every coarser level from the level below,
+so the raw series is read once. Rollups of Brick entities (following
+`ENTITY_THROUGH`) are stored the same way under "Rollups/entities", with the
+IDs of their meters in the Parquet metadata. Every statistic of an entity is
+the sum of that statistic over its meters at the same grain (see
+`sum_meter_rollups`), so the entity 'mean' is the summed reading of the
+entity, as `MeterMatrix.sum_meters` of the meter means.
+
+A rollup is only used while it is at least as recent as the file it was built
+from: a meter rollup is compared with the resampled data of the meter, and an
+entity rollup with the rollups of its meters. An entity rollup is also stale
+when the meters of the entity changed. Stale rollups are ignored by
+`read_rollup`, and `write_entity_rollups` only rebuilds the entities with a
+stale or missing rollup, so an incremental run only pays for the meters it
+reprocessed.
+
+`read_rollup` answers a query for any grain from the coarsest level that is
+fine enough: e.g. 'D' or 'W' from the daily level, 'QS' from the monthly level
+and '6H' from the hourly level. Grains finer than an hour are computed from the
+resampled data itself. The sum of the meter means at a grain cannot be derived
+from the sums at a finer one, so an entity at a grain without a level of its
+own (e.g. 'W' or '6H') is summed from the rollups of its meters at that grain.
+"""
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pandas.tseries import offsets
+from pandas.tseries.frequencies import to_offset
+from tqdm import tqdm
+
+from meterbrick.instrumentation import file_size, span
+from meterbrick.loader import MeterLoader
+from meterbrick.storage import (DEFAULT_STORE_DIR, EXCEL_EXTENSION, PARQUET_EXTENSION, ROW_GROUP_ROWS,
+                                meter_id_from_name, meter_path, read_meter)
+
+ROLLUP_DIR_NAME = "Rollups"
+
+# Levels of the pyramid from the finest to the coarsest, with their frequency
+LEVELS = (('hourly', 'H'), ('daily', 'D'), ('monthly', 'MS'))
+
+STATS = ['sum', 'mean', 'first', 'last', 'count']
+
+# Relations followed from an entity to its meters (see `entity_meter_sets`)
+ENTITY_THROUGH = ('isLocationOf', 'hasPart')
+
+# Key of the sorted meter IDs of an entity in the metadata of its rollup files
+METER_IDS_KEY = b"meterbrick.meter_ids"
+
+# Statistics of an entity that are only defined where every one of its meters has a value
+COMPLETE_STATS = ['first', 'last']
+
+# Memory budget of the meter rollups cached while the entity rollups are written (256 MB)
+ENTITY_CACHE_BYTES = 256 * 1024 ** 2
+
+# Calendar offsets whose bins are made of whole months
+MONTHLY_OFFSETS = (offsets.MonthBegin, offsets.MonthEnd, offsets.QuarterBegin, offsets.QuarterEnd,
+                   offsets.YearBegin, offsets.YearEnd)
+
+
+def rollup_path(name, level, store_dir=DEFAULT_STORE_DIR, kind='meters'):
+    """
+    Path of the rollup of a meter or an entity at one level.
+
+    Args:
+        name (str): Meter ID or entity name.
+        level (str): 'hourly', 'daily' or 'monthly'.
+        store_dir (str): The directory of the resampled data store.
+        kind (str): 'meters' or 'entities'.
+
+    Returns:
+        str: The path to the Parquet file.
+    """
+    return os.path.join(store_dir, ROLLUP_DIR_NAME, kind, level, name + PARQUET_EXTENSION)
+
+
+def rollup_series(series, freq):
+    """
+    Roll up a time-indexed series of readings.
+
+    Args:
+        series (pd.Series): The readings indexed by time.
+        freq (str): The grain, e.g. 'H'.
+
+    Returns:
+        pd.DataFrame: 'sum', 'mean', 'first', 'last' and 'count' indexed by time.
+    """
+    return series.resample(freq).agg(STATS)
+
+
+def coarsen(rollup, freq):
+    """
+    Roll up a rollup to a coarser grain.
+
+    The sums and counts are added, the mean is their ratio, and the first and
+    last valid values are taken in order, so the result is the same as rolling
+    up the readings themselves.
+
+    Args:
+        rollup (pd.DataFrame): Rollup indexed by time (see `rollup_series`).
+        freq (str): The coarser grain, e.g. 'D'.
+
+    Returns:
+        pd.DataFrame: The rollup at the coarser grain.
+    """
+    grouped = rollup.resample(freq)
+    coarse = pd.DataFrame({'sum': grouped['sum'].sum(), 'first': grouped['first'].first(),
+                           'last': grouped['last'].last(), 'count': grouped['count'].sum()})
+    coarse['mean'] = coarse['sum'] / coarse['count'].where(coarse['count'] > 0)
+    return coarse[STATS]
+
+
+def build_pyramid(series):
+    """
+    Roll up readings to every level of the pyramid.
+
+    Args:
+        series (pd.Series): The readings indexed by time.
+
+    Returns:
+        dict: Level name -> rollup.
+    """
+    pyramid = {}
+    rollup = None
+    for level, freq in LEVELS:
+        rollup = rollup_series(series, freq) if rollup is None else coarsen(rollup, freq)
+        pyramid[level] = rollup
+    return pyramid
+
+
+def sum_meter_rollups(meter_rollups):
+    """
+    Rollup of an entity from the rollups of its meters at the same grain.
+
+    'sum', 'mean' and 'count' are summed over the meters, a meter without a
+    value counting as 0 (NaN only where no meter has a value). 'first' and
+    'last' are cumulative readings, so they are only summed where every meter
+    has a value: a meter missing in a step would otherwise drop its whole
+    reading from the entity and fake a consumption when the column is
+    differenced.
+
+    Args:
+        meter_rollups (iterable): Rollups of the meters indexed by time (see `rollup_series`).
+
+    Returns:
+        pd.DataFrame: The rollup of the entity, None without meter rollups.
+    """
+    rollup = None
+    for meter_rollup in meter_rollups:
+        meter_rollup = meter_rollup[STATS]
+        if rollup is None:
+            rollup = meter_rollup.copy()
+            continue
+        complete = rollup[COMPLETE_STATS].add(meter_rollup[COMPLETE_STATS])
+        rollup = rollup.add(meter_rollup, fill_value=0)
+        rollup[COMPLETE_STATS] = complete
+    if rollup is not None:
+        rollup['count'] = rollup['count'].fillna(0).astype('int64')
+    return rollup
+
+
+def _write_rollup(rollup, path, meter_ids=None):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(rollup.rename_axis('time').reset_index(), preserve_index=False)
+    if meter_ids is not None:
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                               METER_IDS_KEY: json.dumps(meter_ids).encode()})
+    pq.write_table(table, path, row_group_size=ROW_GROUP_ROWS)
+
+
+def _mtime(path):
+    # Modification time of a file, None if it does not exist
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _source_mtime(meter_id, store_dir):
+    # Modification time of the resampled data of a meter (Parquet, or legacy Excel)
+    for extension in (PARQUET_EXTENSION, EXCEL_EXTENSION):
+        mtime = _mtime(meter_path(meter_id, store_dir, extension))
+        if mtime is not None:
+            return mtime
+    return None
+
+
+def meter_rollup_is_fresh(meter_name, level, store_dir=DEFAULT_STORE_DIR):
+    """
+    Check that the rollup of a meter at one level exists and is not older than
+    the resampled data of the meter.
+
+    Args:
+        meter_name (str): The meter name or ID.
+        level (str): 'hourly', 'daily' or 'monthly'.
+        store_dir (str): The directory of the resampled data store.
+
+    Returns:
+        bool: True if the rollup can be used.
+    """
+    meter_id = meter_id_from_name(meter_name)
+    rollup_mtime = _mtime(rollup_path(meter_id, level, store_dir))
+    source_mtime = _source_mtime(meter_id, store_dir)
+    return rollup_mtime is not None and (source_mtime is None or rollup_mtime >= source_mtime)
+
+
+def meter_rollups_are_fresh(meter_name, store_dir=DEFAULT_STORE_DIR):
+    """
+    Check that the rollups of a meter at every level are fresh (see `meter_rollup_is_fresh`).
+    """
+    return all(meter_rollup_is_fresh(meter_name, level, store_dir) for level, _ in LEVELS)
+
+
+def write_meter_rollups(meter_name, store_dir=DEFAULT_STORE_DIR, column='number'):
+    """
+    Write the rollup pyramid of a meter of the store.
+
+    Args:
+        meter_name (str): The meter name or ID.
+        store_dir (str): The directory of the resampled data store.
+        column (str): The reading column.
+
+    Returns:
+        list: The paths of the written files.
+    """
+    meter_id = meter_id_from_name(meter_name)
+    data = read_meter(meter_id, columns=[column], store_dir=store_dir)
+    paths = []
+    with span("write_rollups", "io", meter=meter_id, rows=len(data)) as info:
+        pyramid = build_pyramid(data.set_index('time')[column])
+        for level, rollup in pyramid.items():
+            paths.append(rollup_path(meter_id, level, store_dir))
+            _write_rollup(rollup, paths[-1])
+        info['bytes'] = sum(file_size(path) for path in paths)
+    return paths
+
+
+def entity_rollup_meters(entity_name, level, store_dir=DEFAULT_STORE_DIR):
+    """
+    Sorted meter IDs an entity rollup was built from.
+
+    Returns:
+        list: The meter IDs, None if the rollup does not exist or has none recorded.
+    """
+    path = rollup_path(entity_name, level, store_dir, kind='entities')
+    if not os.path.exists(path):
+        return None
+    meter_ids = (pq.read_schema(path).metadata or {}).get(METER_IDS_KEY)
+    return json.loads(meter_ids) if meter_ids is not None else None
+
+
+def _entity_is_fresh(entity_name, meter_ids, level, store_dir):
+    # An entity rollup is fresh when it was built from these meters and is not older than any of their
+    # rollups, which are themselves fresh
+    if entity_rollup_meters(entity_name, level, store_dir) != meter_ids:
+        return False
+    entity_mtime = _mtime(rollup_path(entity_name, level, store_dir, kind='entities'))
+    for meter_id in meter_ids:
+        meter_mtime = _mtime(rollup_path(meter_id, level, store_dir))
+        if meter_mtime is None:
+            continue
+        if meter_mtime > entity_mtime or not meter_rollup_is_fresh(meter_id, level, store_dir):
+            return False
+    return True
+
+
+def write_entity_rollups(entity_meters, store_dir=DEFAULT_STORE_DIR, force=False,
+                         cache_bytes=ENTITY_CACHE_BYTES):
+    """
+    Write the rollup pyramid of Brick entities from the rollups of their meters.
+
+    Every statistic of an entity is the sum of that statistic over its meters
+    (e.g. the hourly 'mean' is the sum of the hourly means of the meters, like
+    summing the hourly resampled data, see `sum_meter_rollups`). Meters
+    without rollups are left out. Only the entities whose rollup is missing,
+    was built from other meters or is older than the rollup of one of their
+    meters are written, and the meter rollups are read through a cache bounded
+    by cache_bytes, so the memory does not grow with the number of meters.
+
+    Args:
+        entity_meters (dict): Entity name -> meter names (see `entity_meter_sets`,
+            with `through=ENTITY_THROUGH`).
+        store_dir (str): The directory of the resampled data store.
+        force (bool): Rewrite every entity, even the up-to-date ones.
+        cache_bytes (int): Memory budget of the cached meter rollups.
+
+    Returns:
+        tuple: (number of entities written, number of entities up to date)
+    """
+    written = set()
+    fresh = set()
+    for level, _ in LEVELS:
+        # Meter rollups of this level, read through a bounded LRU cache
+        loader = MeterLoader(store_dir=os.path.join(store_dir, ROLLUP_DIR_NAME, 'meters', level),
+                             max_bytes=cache_bytes)
+        for entity, meters in tqdm(entity_meters.items(), desc=f"Entity rollups ({level})"):
+            entity_name = str(entity).split("#")[-1]
+            meter_ids = sorted({meter_id_from_name(meter) for meter in meters})
+            if not force and _entity_is_fresh(entity_name, meter_ids, level, store_dir):
+                fresh.add(entity)
+                continue
+            with span("entity_rollup", "compute", entity=entity_name, level=level) as info:
+                meter_rollups = []
+                for meter_id in meter_ids:
+                    try:
+                        meter_rollups.append(loader.load(meter_id, columns=STATS).set_index('time'))
+                    except FileNotFoundError:
+                        continue
+                rollup = sum_meter_rollups(meter_rollups)
+                info['meters'] = len(meter_rollups)
+                info['rows'] = len(rollup) if rollup is not None else 0
+            if rollup is None:
+                continue
+            _write_rollup(rollup, rollup_path(entity_name, level, store_dir, kind='entities'), meter_ids)
+            written.add(entity)
+    return len(written), len(fresh - written)
+
+
+def _fits(level_freq, offset):
+    # True if every bin of the offset is a whole number of bins of the level
+    level_offset = to_offset(level_freq)
+    if isinstance(level_offset, offsets.Tick):
+        if isinstance(offset, offsets.Tick):
+            return offset.nanos % level_offset.nanos == 0
+        # Weeks, months, quarters and years are made of whole days
+        return isinstance(offset, (offsets.Week,) + MONTHLY_OFFSETS) and \
+            to_offset('D').nanos % level_offset.nanos == 0
+    return isinstance(offset, MONTHLY_OFFSETS)
+
+
+def rollup_level(freq):
+    """
+    Coarsest level of the pyramid from which a grain can be computed.
+
+    Args:
+        freq (str): The grain, e.g. 'D', '6H', 'W' or 'QS'.
+
+    Returns:
+        tuple: (level name, level frequency), or None if the grain is finer
+            than every level (e.g. '15T').
+    """
+    offset = to_offset(freq)
+    for level, level_freq in reversed(LEVELS):
+        if _fits(level_freq, offset):
+            return level, level_freq
+    return None
+
+
+def read_rollup(name, freq, stats=None, store_dir=DEFAULT_STORE_DIR, kind='meters', column='number',
+                start=None, end=None):
+    """
+    Rollup of a meter or an entity at any grain, read from the coarsest
+    sufficient level of the pyramid.
+
+    Meters without a fresh rollup (see `meter_rollup_is_fresh`), and grains
+    finer than an hour, are rolled up from the resampled data of the meter.
+    Entities at a grain without a level of its own, or with a rollup older
+    than one of their meters, are summed from the rollups of their meters at
+    that grain (see `sum_meter_rollups`).
+
+    Args:
+        name (str): Meter name or ID, or entity name.
+        freq (str): The grain, e.g. 'H', 'D' or 'MS'.
+        stats (list, optional): Statistics to return. All of them by default.
+        store_dir (str): The directory of the resampled data store.
+        kind (str): 'meters' or 'entities'.
+        column (str): The reading column of the meters.
+        start, end (str or pd.Timestamp, optional): Only read the rows of the
+            level between these times (both included), pushed down to Parquet.
+
+    Returns:
+        pd.DataFrame: The statistics indexed by time.
+
+    Raises:
+        FileNotFoundError: If neither a rollup nor data exists for the meter or entity.
+    """
+    name = meter_id_from_name(name) if kind == 'meters' else str(name).split("#")[-1]
+    stats = list(stats) if stats is not None else STATS
+    level = rollup_level(freq)
+    path = rollup_path(name, level[0], store_dir, kind) if level is not None else None
+
+    if kind != 'meters':
+        meter_ids = entity_rollup_meters(name, level[0], store_dir) if level is not None else None
+        if meter_ids is None:
+            raise FileNotFoundError(f"No rollup found for entity {name} in {store_dir}")
+        if to_offset(freq) != to_offset(level[1]) or not _entity_is_fresh(name, meter_ids, level[0], store_dir):
+            meter_rollups = []
+            for meter_id in meter_ids:
+                try:
+                    meter_rollups.append(read_rollup(meter_id, freq, store_dir=store_dir, column=column,
+                                                     start=start, end=end))
+                except FileNotFoundError:
+                    continue
+            rollup = sum_meter_rollups(meter_rollups)
+            if rollup is None:
+                raise FileNotFoundError(f"No data found for the meters of entity {name} in {store_dir}")
+            return rollup[stats]
+
+    # Meter rollups older than the resampled data of the meter are not used
+    if path is not None and (kind != 'meters' or meter_rollup_is_fresh(name, level[0], store_dir)):
+        with span("read_rollup", "io", entity=name, level=level[0], bytes=file_size(path)) as info:
+            filters = [('time', operator, pd.Timestamp(bound))
+                       for operator, bound in (('>=', start), ('<=', end)) if bound is not None]
+            rollup = pd.read_parquet(path, filters=filters or None).set_index('time')
+            info['rows'] = len(rollup)
+        if to_offset(freq) != to_offset(level[1]):
+            rollup = coarsen(rollup, freq)
+        return rollup[stats]
+
+    data = read_meter(name, columns=[column], store_dir=store_dir, start=start, end=end)
+    return rollup_series(data.set_index('time')[column], freq)[stats]
+
+
+def rollup_loader(freq, stat, store_dir=DEFAULT_STORE_DIR):
+    """
+    Meter loader returning one statistic of the rollup of a meter, to be passed
+    as `loader` to `build_meter_matrix`.
+
+    Args:
+        freq (str): The grain, e.g. 'D'.
+        stat (str): The statistic, e.g. 'first'.
+        store_dir (str): The directory of the resampled data store.
+
+    Returns:
+        callable: loader(meter_name, columns=None, interpolate=False, start=None, end=None)
+            -> pd.DataFrame with a 'time' column and the statistic under the
+            requested column name.
+    """
+    def load(meter_name, columns=None, interpolate=False, start=None, end=None):
+        if interpolate:
+            raise ValueError("Rollups hold the data without interpolation")
+        column = columns[0] if columns else 'number'
+        series = read_rollup(meter_name, freq, stats=[stat], store_dir=store_dir, column=column,
+                             start=start, end=end)[stat]
+        return series.rename(column).rename_axis('time').reset_index()
+
+    return load
@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：service.py
+@Time: 10/20/2026 3:20 PM
+@Author: Mingchen Li
+
+Long-running local HTTP query service keeping the graph and meter data warm.
+
+The graph (with the closures of closure.py), the topology index and a
+`MeterLoader` are loaded once when the service starts. Requests are served by
+an asyncio server; the queries themselves run in a thread pool so that slow
+requests do not block the others. Every response is cached by request
+(path and query string), and concurrent identical requests share one
+computation. All responses are JSON.
+
+Endpoints (GET):
+    /sparql?q=SELECT ...                   rows of a SPARQL query, as local names
+    /meters?entity=X[&through=..][&type=..] meters of an entity (see `entity_meter_sets`)
+    /series?entity=X[&freq=H][&start=..][&end=..][&kw=1][&max_gap=..][&through=..][&type=..]
+                                           summed readings of the meters of an entity,
+                                           or their consumption in kW
+    /stats                                 cache and loader counters
+
+The meters of an entity follow isLocationOf and hasPart by default, like the
+entity rollups. A /series request for a grain of an hour or coarser reads the
+rollups (see rollup.py): the summed readings of an entity directly from its
+rollup, otherwise the rollups of its meters put on a shared grid with
+`build_meter_matrix`. Both give the same series: the sum of the mean readings
+of the meters in every step, a missing reading counting as 0, over the steps
+covered by a meter (see `MeterMatrix.sum_meters`). The time window is pushed
+down to the store. With kw=1, every meter is differenced before summing, with
+counter resets and rollovers corrected (see deltas.py). With max_gap (e.g.
+'3H'), the gaps of at most that length are linearly interpolated on the grid;
+by default nothing is interpolated.
+"""
+import asyncio
+import json
+import math
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+
+from meterbrick.aggregation import entity_meter_sets
+from meterbrick.deltas import delta_matrix
+from meterbrick.graph import load_graph
+from meterbrick.loader import MeterLoader
+from meterbrick.matrix import build_meter_matrix, grid_window
+from meterbrick.rollup import ENTITY_THROUGH, entity_rollup_meters, read_rollup, rollup_level, rollup_loader
+from meterbrick.storage import DEFAULT_STORE_DIR, meter_exists, meter_id_from_name
+from meterbrick.topology import load_topology, local_name
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Number of cached responses
+DEFAULT_CACHE_SIZE = 1024
+
+# Number of threads running the queries
+DEFAULT_N_THREADS = 4
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error"}
+
+
+class QueryError(Exception):
+    """
+    Invalid request, answered with a 400 response.
+    """
+
+
+def _clean(value):
+    # JSON has no NaN, missing readings are returned as null
+    return None if isinstance(value, float) and math.isnan(value) else value
+
+
+class QueryService:
+    """
+    Graph, topology and meter data of one TTL file and one data store, with a
+    response cache.
+    """
+
+    def __init__(self, ttl_path, store_dir=DEFAULT_STORE_DIR, cache_size=DEFAULT_CACHE_SIZE,
+                 n_threads=DEFAULT_N_THREADS):
+        """
+        Args:
+            ttl_path (str): Path to the TTL file.
+            store_dir (str): The directory of the resampled data store.
+            cache_size (int): Number of responses kept in the cache.
+            n_threads (int): Number of threads running the queries.
+        """
+        self.g = load_graph(ttl_path, materialize=True)
+        self.topology = load_topology(ttl_path)
+        self.store_dir = store_dir
+        self.loader = MeterLoader(store_dir=store_dir)
+        # Meter matrices of the /series requests (one per thread, overwritten by the next request)
+        self.matrix_dir = tempfile.mkdtemp(prefix="meterbrick_service_")
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.pending = {}
+        self.executor = ThreadPoolExecutor(max_workers=n_threads)
+        # rdflib graphs are not safe for concurrent queries
+        self.graph_lock = threading.Lock()
+        # The meter loader and its LRU cache are shared by the threads
+        self.loader_lock = threading.Lock()
+        self.requests = 0
+        self.hits = 0
+
+    def preload(self):
+        """
+        Load the data of every meter of the graph into the meter loader.
+
+        The raw readings are loaded, the view of the /series requests finer
+        than an hour, which slice their window from it (coarser grains read the
+        rollups).
+
+        Returns:
+            int: Number of meters loaded.
+        """
+        meters = {meter for meters in self.topology.forward['isMeteredBy'].values() for meter in meters}
+        loaded = 0
+        for meter in sorted(meters):
+            try:
+                self.loader.load(meter, columns=['number'])
+                loaded += 1
+            except FileNotFoundError:
+                continue
+        return loaded
+
+    # Query handlers, run in the thread pool
+
+    def sparql(self, params):
+        query = params.get('q')
+        if not query:
+            raise QueryError("missing parameter 'q'")
+        with self.graph_lock:
+            try:
+                result = self.g.query(query)
+                variables = [str(variable) for variable in result.vars]
+                rows = [[str(value).split("#")[-1] if value is not None else None for value in row]
+                        for row in result]
+            except Exception as e:
+                raise QueryError(f"invalid query: {e}")
+        return {'vars': variables, 'rows': rows}
+
+    def _entity_meters(self, params):
+        entity = params.get('entity')
+        if not entity:
+            raise QueryError("missing parameter 'entity'")
+        through = tuple(params.get('through', ",".join(ENTITY_THROUGH)).split(","))
+        unknown = [relation for relation in through if relation not in self.topology.forward]
+        if unknown:
+            raise QueryError(f"unknown relations {unknown}")
+        entity_meters = entity_meter_sets(self.topology, entities=[entity], through=through,
+                                          equipment_type=params.get('type'))
+        return entity, entity_meters.get(entity, [])
+
+    def meters(self, params):
+        entity, meters = self._entity_meters(params)
+        return {'entity': entity, 'meters': meters}
+
+    def _load_meter(self, meter_name, **kwargs):
+        # The meter loader and its LRU cache are shared by the threads
+        with self.loader_lock:
+            return self.loader.load(meter_name, **kwargs)
+
+    def series(self, params):
+        entity, meters = self._entity_meters(params)
+        freq = params.get('freq', 'H')
+        start, end = params.get('start'), params.get('end')
+        try:
+            level = rollup_level(freq)
+            max_gap = pd.Timedelta(params['max_gap']) if params.get('max_gap') else None
+        except ValueError as e:
+            raise QueryError(f"invalid parameter: {e}")
+        kw = params.get('kw') in ('1', 'true')
+
+        # The shared grid needs a fixed frequency (weeks and months are only read from entity rollups)
+        try:
+            fixed = to_offset(freq).nanos > 0
+        except ValueError:
+            fixed = False
+
+        # Summed readings of an entity with a rollup of the same meters, read from the coarsest
+        # sufficient level. The rollup 'mean' is the sum of the means of the meters, NaN where none
+        # of them has a reading; those steps are 0, as missing readings are in `sum_meters` below.
+        # The window is widened to whole steps, like the window of the grid
+        through = tuple(params.get('through', ",".join(ENTITY_THROUGH)).split(","))
+        if not kw and max_gap is None and through == ENTITY_THROUGH and not params.get('type') \
+                and level is not None and entity_rollup_meters(local_name(entity), level[0], self.store_dir) \
+                == sorted({meter_id_from_name(meter) for meter in meters}):
+            window = grid_window(freq, start, end) if fixed else {'start': start, 'end': end}
+            try:
+                total = read_rollup(entity, freq, stats=['mean'], store_dir=self.store_dir, kind='entities',
+                                    **window)['mean'].fillna(0)
+                missing = [meter for meter in meters if not meter_exists(meter, store_dir=self.store_dir)]
+                return self._series_response(entity, meters, missing, freq, total)
+            except FileNotFoundError:
+                pass
+        if not fixed:
+            raise QueryError(f"freq {freq} is only supported for entities with rollups")
+
+        # Meters resampled onto a shared grid (from their rollups when the grain allows it), with the
+        # window pushed down to the store; the gaps of at most max_gap are filled on the grid
+        loader = rollup_loader(freq, 'mean', store_dir=self.store_dir) if level is not None else self._load_meter
+        path = os.path.join(self.matrix_dir, f"series_{threading.get_ident()}")
+        meter_matrix = build_meter_matrix(meters, path, freq=freq, interpolate=max_gap is not None,
+                                          start=start, end=end, loader=loader, max_gap=max_gap)
+        missing = [meter for meter in meters if meter_id_from_name(meter) not in meter_matrix.row_of]
+        if kw:
+            # Consumption of every meter between consecutive steps (counter resets corrected), summed
+            meter_deltas, _ = delta_matrix(meter_matrix)
+            total = meter_deltas.sum_meters(meters)
+        else:
+            total = meter_matrix.sum_meters(meters)
+        return self._series_response(entity, meters, missing, freq, total)
+
+    @staticmethod
+    def _series_response(entity, meters, missing, freq, total):
+        return {'entity': entity, 'meters': meters, 'missing_meters': missing, 'freq': freq,
+                'time': [timestamp.isoformat() for timestamp in total.index],
+                'values': [_clean(value) for value in total.tolist()]}
+
+    def stats(self, params):
+        return {'requests': self.requests, 'cache_hits': self.hits, 'cached_responses': len(self.cache),
+                'meter_loader': self.loader.stats()}
+
+    # Request handling
+
+    async def respond(self, target):
+        """
+        Answer a request target (path and query string).
+
+        Returns:
+            tuple: (status, body bytes)
+        """
+        self.requests += 1
+        url = urlsplit(target)
+        handler = {'/sparql': self.sparql, '/meters': self.meters, '/series': self.series,
+                   '/stats': self.stats}.get(url.path)
+        if handler is None:
+            return 404, json.dumps({'error': f"unknown path {url.path}"}).encode()
+        if url.path == '/stats':
+            return 200, json.dumps(self.stats({})).encode()
+
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        key = (url.path, tuple(sorted(params.items())))
+        if key in self.cache:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        # Concurrent identical requests wait for the same computation
+        if key in self.pending:
+            self.hits += 1
+            return await asyncio.shield(self.pending[key])
+
+        future = asyncio.get_running_loop().run_in_executor(self.executor, self._run, handler, params)
+        self.pending[key] = future
+        try:
+            response = await future
+        finally:
+            del self.pending[key]
+        if response[0] == 200:
+            self.cache[key] = response
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return response
+
+    @staticmethod
+    def _run(handler, params):
+        try:
+            return 200, json.dumps(handler(params)).encode()
+        except QueryError as e:
+            return 400, json.dumps({'error': str(e)}).encode()
+        except Exception as e:
+            return 500, json.dumps({'error': f"{type(e).__name__}: {e}"}).encode()
+
+    async def handle_connection(self, reader, writer):
+        """
+        Serve the HTTP/1.1 requests of one connection (with keep-alive).
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                parts = request_line.decode("latin-1").split()
+                if len(parts) != 3:
+                    status, body = 400, json.dumps({'error': "malformed request line"}).encode()
+                elif parts[0] != "GET":
+                    status, body = 405, json.dumps({'error': "only GET is supported"}).encode()
+                else:
+                    status, body = await self.respond(parts[1])
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and parts[-1:] == ["HTTP/1.1"]
+                writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                             f"Content-Type: application/json\r\n"
+                             f"Content-Length: {len(body)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _serve(service, host, port):
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"Serving on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def serve(ttl_path, store_dir=DEFAULT_STORE_DIR, host=DEFAULT_HOST, port=DEFAULT_PORT,
+          cache_size=DEFAULT_CACHE_SIZE, n_threads=DEFAULT_N_THREADS, preload=False):
+    """
+    Load the graph and start the service until interrupted.
+
+    Args:
+        ttl_path (str): Path to the TTL file.
+        store_dir (str): The directory of the resampled data store.
+        host (str): Address to listen on (local only by default).
+        port (int): Port to listen on.
+        cache_size (int): Number of responses kept in the cache.
+        n_threads (int): Number of threads running the queries.
+        preload (bool): Load the data of every meter before serving.
+    """
+    start = time.perf_counter()
+    service = QueryService(ttl_path, store_dir=store_dir, cache_size=cache_size, n_threads=n_threads)
+    if preload:
+        print(f"Preloaded {service.preload()} meters")
+    print(f"Service ready in {time.perf_counter() - start:.1f} s")
+    try:
+        asyncio.run(_serve(service, host, port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.executor.shutdown(wait=False)
+        shutil.rmtree(service.matrix_dir, ignore_errors=True)
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：storage.py
+@Time: 10/18/2026 9:12 AM
+@Author: Mingchen Li
+
+Columnar (Parquet) store for resampled meter data.
+
+Each meter is stored as one Parquet file named after its meter ID inside the
+"Resampled Data" directory, e.g. "Resampled Data/12345.parquet". The 'time'
+column is kept as datetime64 and the readings as float64, so nothing has to be
+re-parsed when the data is loaded again. Legacy "*.xlsx" files are still read
+when no Parquet file exists for a meter.
+
+The files are written in row groups of about a month of 15-minute readings.
+A time window passed to `read_meter` is pushed down to Parquet, so only the row
+groups whose time statistics overlap the window are read and decoded.
+"""
+import os
+import pandas as pd
+from tqdm import tqdm
+
+from meterbrick.instrumentation import file_size, span
+
+# Default location of the resampled data, relative to the analysis scripts
+DEFAULT_STORE_DIR = os.path.join("..", "Resampled Data")
+
+# Environment variable giving every stage script the same store (set by `python -m meterbrick --store`)
+STORE_DIR_ENV = "METERBRICK_STORE_DIR"
+
+PARQUET_EXTENSION = ".parquet"
+EXCEL_EXTENSION = ".xlsx"
+
+# Rows per Parquet row group (30 days of 15T readings), the unit skipped by a time window
+ROW_GROUP_ROWS = 2880
+
+
+def script_store_dir(default=DEFAULT_STORE_DIR):
+    """
+    Directory of the store used by a stage script.
+
+    Args:
+        default (str): The store of the script when it is run by hand.
+
+    Returns:
+        str: The directory in METERBRICK_STORE_DIR when it is set, otherwise default.
+    """
+    return os.environ.get(STORE_DIR_ENV) or default
+
+
+def meter_id_from_name(meter_name):
+    """
+    Extract the meter ID from a Brick meter name, a URI or a file name.
+
+    Args:
+        meter_name (str): e.g. 'bldg#Electrical_Meter_12345', 'Meter_12345' or '12345.xlsx'.
+
+    Returns:
+        str: The meter ID, e.g. '12345'.
+    """
+    meter_name = str(meter_name).split("#")[-1]
+    # Drop a file extension if there is one
+    for extension in (PARQUET_EXTENSION, EXCEL_EXTENSION):
+        if meter_name.endswith(extension):
+            meter_name = meter_name[:-len(extension)]
+    return meter_name.split("_")[-1]
+
+
+def meter_path(meter_id, store_dir=DEFAULT_STORE_DIR, extension=PARQUET_EXTENSION):
+    """
+    Build the path of the file holding the data of a meter.
+
+    Args:
+        meter_id (str): The meter ID.
+        store_dir (str): The directory of the store.
+        extension (str): The file extension ('.parquet' or '.xlsx').
+
+    Returns:
+        str: The path to the file.
+    """
+    return os.path.join(store_dir, meter_id + extension)
+
+
+def meter_exists(meter_name, store_dir=DEFAULT_STORE_DIR):
+    """
+    Check whether data for a meter is available in the store (Parquet or Excel).
+
+    Args:
+        meter_name (str): The meter name or ID.
+        store_dir (str): The directory of the store.
+
+    Returns:
+        bool: True if a Parquet or Excel file exists for the meter.
+    """
+    meter_id = meter_id_from_name(meter_name)
+    return (os.path.exists(meter_path(meter_id, store_dir, PARQUET_EXTENSION))
+            or os.path.exists(meter_path(meter_id, store_dir, EXCEL_EXTENSION)))
+
+
+def normalize_meter_frame(data):
+    """
+    Bring a meter DataFrame into the canonical layout of the store: a
+    datetime64 'time' column followed by float64 reading columns.
+
+    Args:
+        data (pd.DataFrame): Data with either a 'time' column or a time index.
+
+    Returns:
+        pd.DataFrame: The normalized data.
+    """
+    if 'time' not in data.columns:
+        data = data.rename_axis('time').reset_index()
+    data = data.copy()
+    data['time'] = pd.to_datetime(data['time'], errors='coerce')
+    for column in data.columns:
+        if column != 'time':
+            data[column] = pd.to_numeric(data[column], errors='coerce').astype('float64')
+    return data
+
+
+def write_meter(data, meter_id, store_dir=DEFAULT_STORE_DIR):
+    """
+    Write the data of a single meter to the Parquet store.
+
+    Args:
+        data (pd.DataFrame): Data with a 'time' column or a time index.
+        meter_id (str): The meter ID used as the file name.
+        store_dir (str): The directory of the store.
+
+    Returns:
+        str: The path of the written file.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    save_file_path = meter_path(meter_id, store_dir)
+    with span("write_meter", "io", meter=meter_id, rows=len(data)) as info:
+        normalize_meter_frame(data).to_parquet(save_file_path, index=False, row_group_size=ROW_GROUP_ROWS)
+        info['bytes'] = file_size(save_file_path)
+    return save_file_path
+
+
+def time_window_mask(times, start=None, end=None):
+    """
+    Boolean mask of the timestamps inside a time window (both bounds included).
+
+    Args:
+        times (pd.Series): The timestamps.
+        start, end (str or pd.Timestamp, optional): Bounds of the window.
+
+    Returns:
+        pd.Series: True for the timestamps inside the window.
+    """
+    mask = times.notna()
+    if start is not None:
+        mask &= times >= pd.Timestamp(start)
+    if end is not None:
+        mask &= times <= pd.Timestamp(end)
+    return mask
+
+
+def read_meter(meter_name, columns=None, store_dir=DEFAULT_STORE_DIR, start=None, end=None):
+    """
+    Read the data of a single meter from the store.
+
+    The Parquet file is used when it exists, otherwise the legacy Excel file is
+    read. Only the requested columns are loaded from Parquet, and a time window
+    is pushed down as a Parquet filter, so row groups outside of it are skipped
+    using their statistics.
+
+    Args:
+        meter_name (str): The meter name or ID.
+        columns (list, optional): Columns to load besides 'time'. All columns by default.
+        store_dir (str): The directory of the store.
+        start, end (str or pd.Timestamp, optional): Only read the readings between
+            these times (both included). All readings by default.
+
+    Returns:
+        pd.DataFrame: The meter data with a datetime64 'time' column.
+
+    Raises:
+        FileNotFoundError: If neither a Parquet nor an Excel file exists for the meter.
+    """
+    meter_id = meter_id_from_name(meter_name)
+    if columns is not None:
+        columns = ['time'] + [column for column in columns if column != 'time']
+
+    filters = []
+    if start is not None:
+        filters.append(('time', '>=', pd.Timestamp(start)))
+    if end is not None:
+        filters.append(('time', '<=', pd.Timestamp(end)))
+
+    parquet_path = meter_path(meter_id, store_dir, PARQUET_EXTENSION)
+    if os.path.exists(parquet_path):
+        with span("read_meter", "io", meter=meter_id, format="parquet", bytes=file_size(parquet_path),
+                  start=start, end=end) as info:
+            data = pd.read_parquet(parquet_path, columns=columns, filters=filters or None)
+            info['rows'] = len(data)
+        return data
+
+    excel_path = meter_path(meter_id, store_dir, EXCEL_EXTENSION)
+    if not os.path.exists(excel_path):
+        raise FileNotFoundError(f"No data found for meter {meter_id} in {store_dir}")
+    with span("read_meter", "io", meter=meter_id, format="excel", bytes=file_size(excel_path)) as info:
+        data = normalize_meter_frame(pd.read_excel(excel_path))
+        info['rows'] = len(data)
+    if filters:
+        data = data[time_window_mask(data['time'], start, end)].reset_index(drop=True)
+    if columns is not None:
+        data = data[columns]
+    return data
+
+
+def convert_excel_tree(source_dir, store_dir=None, overwrite=False):
+    """
+    Convert every "*.xlsx" meter file below a directory into the Parquet store.
+
+    Args:
+        source_dir (str): The directory containing the Excel files.
+        store_dir (str, optional): The output directory. Defaults to source_dir.
+        overwrite (bool): Re-convert files that already have a Parquet copy.
+
+    Returns:
+        list: Names of the files that could not be converted.
+    """
+    if store_dir is None:
+        store_dir = source_dir
+
+    excel_files = []
+    for root, _, files in os.walk(source_dir):
+        for file_name in files:
+            # Skip Excel lock files such as '~$12345.xlsx'
+            if file_name.endswith(EXCEL_EXTENSION) and not file_name.startswith("~$"):
+                excel_files.append(os.path.join(root, file_name))
+
+    failed_files = []
+    for excel_path in tqdm(sorted(excel_files), desc="Converting to Parquet"):
+        meter_id = meter_id_from_name(os.path.basename(excel_path))
+        if not overwrite and os.path.exists(meter_path(meter_id, store_dir)):
+            continue
+        try:
+            write_meter(pd.read_excel(excel_path), meter_id, store_dir)
+        except Exception as e:
+            print(f"Failed to convert {excel_path}: {e}")
+            failed_files.append(excel_path)
+    return failed_files
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：synthetic.py
+@Time: 10/19/2026 9:40 PM
+@Author: Mingchen Li
+
+Synthetic campus shaped like HKUST_Meter_Metadata.ttl and the raw meter exports.
+
+The campus is made of buildings with floors and zones. Every zone is metered
+by a total meter (brick:isMeteredBy) and has sub meters (brick:hasPart), and
+every sub meter meters one piece of equipment located on a floor
+(brick:isLocationOf), so the same queries, topology lookups and aggregations
+as on the real graph can be run on it. The raw data of every meter is a
+cumulative kWh reading written to "Raw_data/GUI_NO.<meter ID>.xlsx", with a
+sampling time drawn per zone and injected gaps, missing readings and
+duplicate timestamps.
+"""
+import os
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+SYNTHETIC_NAMESPACE = "urn:meterbrick:synthetic#"
+
+FLOORS = ['GF', '1F', '2F', '3F', '4F', '5F', '6F', '7F']
+
+# Share of the zones sampled at every sampling time
+SAMPLING_WEIGHTS = {'15T': 0.4, '30T': 0.1, '60T': 0.4, '1440T': 0.1}
+
+# Equipment metered by the sub meters, in turn
+EQUIPMENT_TYPES = ['Lighting', 'HVAC_Equipment', 'Elevator']
+
+# First meter ID, so that every ID has the same number of digits as the real ones
+FIRST_METER_ID = 10000
+
+
+def campus_layout(n_meters, meters_per_zone=5, zones_per_floor=4, seed=0):
+    """
+    Lay out the buildings, floors, zones and meters of a synthetic campus.
+
+    Args:
+        n_meters (int): Number of meters (total and sub meters).
+        meters_per_zone (int): Meters of every zone, one total meter and sub meters.
+        zones_per_floor (int): Zones of every floor.
+        seed (int): Seed of the random sampling times.
+
+    Returns:
+        list: One dict per zone with 'building', 'floor', 'zone', 'sampling_time',
+            'total_meter' and 'sub_meters' (meter IDs).
+    """
+    rng = np.random.default_rng(seed)
+    zones_per_building = zones_per_floor * len(FLOORS)
+    n_zones = max(1, n_meters // meters_per_zone)
+    sampling_times = rng.choice(list(SAMPLING_WEIGHTS), size=n_zones, p=list(SAMPLING_WEIGHTS.values()))
+
+    layout = []
+    meter_id = FIRST_METER_ID
+    for i in range(n_zones):
+        b = i // zones_per_building
+        # The first building is named like the real one, so the example queries work as they are
+        building = "Academic_Building" if b == 0 else f"Building_{b}"
+        floor = FLOORS[(i % zones_per_building) // zones_per_floor]
+        # The last zone takes the meters left over
+        n_zone_meters = meters_per_zone if i < n_zones - 1 else max(2, n_meters - meter_id + FIRST_METER_ID)
+        meter_ids = [str(meter_id + k) for k in range(n_zone_meters)]
+        meter_id += n_zone_meters
+        layout.append({'building': building, 'floor': f"{building}_{floor}", 'zone': f"Zone_{i}",
+                       'sampling_time': str(sampling_times[i]),
+                       'total_meter': meter_ids[0], 'sub_meters': meter_ids[1:]})
+    return layout
+
+
+def write_campus_ttl(layout, ttl_path):
+    """
+    Write the Brick graph of a campus layout as Turtle.
+
+    Args:
+        layout (list): Zones returned by `campus_layout`.
+        ttl_path (str): Path of the TTL file.
+    """
+    buildings = list(dict.fromkeys(zone['building'] for zone in layout))
+    floors = list(dict.fromkeys((zone['building'], zone['floor']) for zone in layout))
+
+    os.makedirs(os.path.dirname(os.path.abspath(ttl_path)), exist_ok=True)
+    with open(ttl_path, "w", encoding="utf-8") as file:
+        file.write("@prefix brick: <https://brickschema.org/schema/Brick#> .\n")
+        file.write(f"@prefix bldg: <{SYNTHETIC_NAMESPACE}> .\n")
+        file.write("@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .\n\n")
+
+        # Class hierarchy used by the closures of closure.py
+        file.write("brick:Electrical_Meter rdfs:subClassOf brick:Meter .\n")
+        for equipment_type in EQUIPMENT_TYPES:
+            file.write(f"brick:{equipment_type} rdfs:subClassOf brick:Equipment .\n")
+
+        for building in buildings:
+            file.write(f"bldg:{building} a brick:Building .\n")
+        for building, floor in floors:
+            file.write(f"bldg:{floor} a brick:Floor .\n")
+            file.write(f"bldg:{building} brick:hasPart bldg:{floor} .\n")
+
+        for zone in layout:
+            file.write(f"bldg:{zone['zone']} a brick:Zone ; "
+                       f"brick:isMeteredBy bldg:Electrical_Meter_{zone['total_meter']} .\n")
+            file.write(f"bldg:{zone['building']} brick:hasPart bldg:{zone['zone']} .\n")
+            file.write(f"bldg:Electrical_Meter_{zone['total_meter']} a brick:Electrical_Meter .\n")
+            for k, meter_id in enumerate(zone['sub_meters']):
+                equipment_type = EQUIPMENT_TYPES[k % len(EQUIPMENT_TYPES)]
+                equipment = f"{zone['zone']}_{equipment_type}_{k}"
+                file.write(f"bldg:Electrical_Meter_{meter_id} a brick:Electrical_Meter .\n")
+                file.write(f"bldg:{zone['zone']} brick:hasPart bldg:Electrical_Meter_{meter_id} .\n")
+                file.write(f"bldg:{equipment} a brick:{equipment_type} ; "
+                           f"brick:isMeteredBy bldg:Electrical_Meter_{meter_id} .\n")
+                file.write(f"bldg:{zone['floor']} brick:isLocationOf bldg:{equipment} .\n")
+
+
+def zone_raw_data(zone, start='2022-01-01', days=120, gap_rate=0.2, missing_rate=0.02,
+                  duplicate_rate=0.001, seed=0):
+    """
+    Generate the raw cumulative kWh readings of the meters of one zone.
+
+    The total meter reads the sum of the sub meters plus a few percent of
+    losses, so the zone evaluation has something to measure.
+
+    Args:
+        zone (dict): A zone of `campus_layout`.
+        start (str): First timestamp.
+        days (int): Number of days of data.
+        gap_rate (float): Probability of a meter having a gap of up to 10 days.
+        missing_rate (float): Share of readings left empty.
+        duplicate_rate (float): Share of timestamps written twice.
+        seed (int): Random seed.
+
+    Returns:
+        dict: Meter ID -> DataFrame with 'time' and 'number' columns.
+    """
+    rng = np.random.default_rng(seed)
+    times = pd.date_range(start=start, periods=int(days * pd.Timedelta('1D') / pd.Timedelta(zone['sampling_time'])),
+                          freq=zone['sampling_time'])
+    hours = times.hour.to_numpy() + times.minute.to_numpy() / 60
+    step_hours = pd.Timedelta(zone['sampling_time']) / pd.Timedelta('1H')
+
+    # Daily load profile of every sub meter, in kWh per step
+    profile = 1 + 0.5 * np.sin((hours - 8) / 24 * 2 * np.pi)
+    loads = rng.uniform(0.5, 5, size=(len(zone['sub_meters']), 1)) * profile * step_hours
+    loads = loads * rng.uniform(0.8, 1.2, size=loads.shape)
+    readings = rng.uniform(0, 1e5, size=(len(zone['sub_meters']), 1)) + np.cumsum(loads, axis=1)
+    total = readings.sum(axis=0) * rng.uniform(1.01, 1.05) + np.cumsum(rng.normal(0, 0.1, len(times)))
+
+    meters = {}
+    for meter_id, values in zip([zone['total_meter']] + zone['sub_meters'], np.vstack([total, readings])):
+        data = pd.DataFrame({'time': times, 'number': values})
+        # Missing readings
+        data.loc[rng.random(len(data)) < missing_rate, 'number'] = np.nan
+        # Gap of up to 10 days
+        if rng.random() < gap_rate:
+            gap_start = rng.integers(0, len(data))
+            gap_length = int(rng.integers(1, 10) * pd.Timedelta('1D') / pd.Timedelta(zone['sampling_time']))
+            data = data.drop(data.index[gap_start:gap_start + gap_length])
+        # Duplicate timestamps
+        duplicated = data[rng.random(len(data)) < duplicate_rate]
+        data = pd.concat([data, duplicated]).sort_values('time', kind='stable')
+        meters[meter_id] = data.reset_index(drop=True)
+    return meters
+
+
+def _write_zone_raw_data(args):
+    zone, raw_dir, days, seed = args
+    for meter_id, data in zone_raw_data(zone, days=days, seed=seed).items():
+        data.to_excel(os.path.join(raw_dir, f"GUI_NO.{meter_id}.xlsx"), sheet_name='Sheet1', index=False)
+    return len(zone['sub_meters']) + 1
+
+
+def generate_campus(out_dir, n_meters, days=120, seed=0, n_workers=1):
+    """
+    Generate a synthetic campus: the TTL graph and the raw data of every meter.
+
+    Args:
+        out_dir (str): Output directory. The graph is written to
+            "Synthetic_Meter_Metadata.ttl" and the raw data to "Raw_data".
+        n_meters (int): Number of meters, e.g. 100 to 50000.
+        days (int): Number of days of data of every meter.
+        seed (int): Random seed, the same seed gives the same campus.
+        n_workers (int): Number of worker processes writing the raw files.
+
+    Returns:
+        tuple: (ttl_path, raw_dir, layout)
+    """
+    layout = campus_layout(n_meters, seed=seed)
+    ttl_path = os.path.join(out_dir, "Synthetic_Meter_Metadata.ttl")
+    write_campus_ttl(layout, ttl_path)
+
+    raw_dir = os.path.join(out_dir, "Raw_data")
+    os.makedirs(raw_dir, exist_ok=True)
+    tasks = [(zone, raw_dir, days, seed + i) for i, zone in enumerate(layout)]
+    if n_workers <= 1:
+        for task in tqdm(tasks, desc="Generating raw data"):
+            _write_zone_raw_data(task)
+    else:
+        with Pool(processes=n_workers) as pool:
+            for _ in tqdm(pool.imap_unordered(_write_zone_raw_data, tasks), total=len(tasks),
+                          desc="Generating raw data"):
+                pass
+    return ttl_path, raw_dir, layout
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：topology.py
+@Time: 10/18/2026 4:20 PM
+@Author: Mingchen Li
+
+Precomputed Brick topology index (meter, equipment, zone, floor, building).
+
+The index is built with one pass over the triples of the graph and turns the
+relationships used by the analysis scripts into plain dictionary lookups, so no
+SPARQL query has to be planned and evaluated. All entities are identified by
+their local name, i.e. the URI without the namespace ('Electrical_Meter_12345').
+Inverse relationships found in the graph (isPartOf, hasLocation, meters) are
+folded into their forward counterparts.
+"""
+import pickle
+from collections import defaultdict
+
+from rdflib import RDF
+
+from meterbrick.graph import (DEFAULT_TTL_PATH, load_graph, read_snapshot, snapshot_path,
+                              write_snapshot)
+from meterbrick.instrumentation import span
+from meterbrick.manifest import file_hash
+
+# Version of the index layout, part of the snapshot name so older snapshots are rebuilt
+TOPOLOGY_VERSION = 2
+
+# Forward relationships of the index and the Brick inverse of each of them
+RELATIONS = {
+    'hasPart': 'isPartOf',
+    'isLocationOf': 'hasLocation',
+    'isMeteredBy': 'meters',
+}
+
+
+def local_name(term):
+    """
+    Strip the namespace from a URI ('...#Electrical_Meter_12345' -> 'Electrical_Meter_12345').
+    """
+    term = str(term)
+    if "#" in term:
+        return term.split("#")[-1]
+    return term.rsplit("/", 1)[-1]
+
+
+class TopologyIndex:
+    """
+    Dictionary-backed adjacency of hasPart, isLocationOf, isMeteredBy and rdf:type.
+    """
+
+    def __init__(self):
+        # forward[relation][subject] -> set of objects, reverse[relation][object] -> set of subjects
+        self.forward = {relation: defaultdict(set) for relation in RELATIONS}
+        self.reverse = {relation: defaultdict(set) for relation in RELATIONS}
+        self.types = defaultdict(set)
+        self.instances = defaultdict(set)
+        # Local name -> full URI of every entity
+        self.uris = {}
+
+    @classmethod
+    def from_graph(cls, g):
+        """
+        Build the index with a single pass over the triples of a graph.
+
+        Args:
+            g (rdflib.Graph): The Brick metadata graph.
+
+        Returns:
+            TopologyIndex: The index.
+        """
+        index = cls()
+        inverses = {inverse: relation for relation, inverse in RELATIONS.items()}
+        with span("build_topology", "graph", rows=len(g)):
+            for subject, predicate, obj in g:
+                index.uris.setdefault(local_name(subject), str(subject))
+                if predicate == RDF.type:
+                    index._add_type(local_name(subject), local_name(obj))
+                    continue
+                name = local_name(predicate)
+                if name in RELATIONS:
+                    index.uris.setdefault(local_name(obj), str(obj))
+                    index._add(name, local_name(subject), local_name(obj))
+                elif name in inverses:
+                    index._add(inverses[name], local_name(obj), local_name(subject))
+        return index
+
+    def _add(self, relation, subject, obj):
+        self.forward[relation][subject].add(obj)
+        self.reverse[relation][obj].add(subject)
+
+    def _add_type(self, entity, type_name):
+        self.types[entity].add(type_name)
+        self.instances[type_name].add(entity)
+
+    def _lookup(self, table, key):
+        # .get keeps lookups of unknown entities from growing the defaultdicts
+        return sorted(table.get(local_name(key), ()))
+
+    def meters_of(self, entity):
+        """
+        Meters of an entity through brick:isMeteredBy.
+        """
+        return self._lookup(self.forward['isMeteredBy'], entity)
+
+    def metered_by(self, meter):
+        """
+        Entities metered by a meter (inverse of `meters_of`).
+        """
+        return self._lookup(self.reverse['isMeteredBy'], meter)
+
+    def parts_of(self, entity):
+        """
+        Direct parts of an entity through brick:hasPart.
+        """
+        return self._lookup(self.forward['hasPart'], entity)
+
+    def part_of(self, entity):
+        """
+        Entities having the given entity as a direct part.
+        """
+        return self._lookup(self.reverse['hasPart'], entity)
+
+    def located_at(self, location):
+        """
+        Entities located at a location through brick:isLocationOf (one hop).
+        """
+        return self._lookup(self.forward['isLocationOf'], location)
+
+    def locations_of(self, entity):
+        """
+        Locations of an entity (inverse of `located_at`).
+        """
+        return self._lookup(self.reverse['isLocationOf'], entity)
+
+    def types_of(self, entity):
+        """
+        Classes of an entity through rdf:type.
+        """
+        return self._lookup(self.types, entity)
+
+    def entities_of_type(self, type_name):
+        """
+        Entities directly typed with a class, e.g. entities_of_type("Zone").
+        """
+        return self._lookup(self.instances, type_name)
+
+    def descendants(self, entity, relations=('isLocationOf',)):
+        """
+        Entities reachable from an entity through the given relations, including
+        the entity itself (like "brick:isLocationOf*" in SPARQL).
+        """
+        start = local_name(entity)
+        seen = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for relation in relations:
+                for successor in self.forward[relation].get(node, ()):
+                    if successor not in seen:
+                        seen.add(successor)
+                        stack.append(successor)
+        return sorted(seen)
+
+    def uri_of(self, entity):
+        """
+        Full URI of an entity, or its name if the URI is unknown.
+        """
+        return self.uris.get(local_name(entity), str(entity))
+
+    def submeters_of(self, zone, meter_type="Electrical_Meter"):
+        """
+        Sub-meters of a zone: the parts of the zone typed as meter_type that
+        are not also total meters of the zone (as in Data_Calculation.py).
+        """
+        meters = set(self.meters_of(zone))
+        typed = self.instances.get(meter_type, set())
+        return [part for part in self.parts_of(zone) if part in typed and part not in meters]
+
+    def save(self, path):
+        """
+        Pickle the index to a file.
+        """
+        with open(path, "wb") as file:
+            pickle.dump(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path):
+        """
+        Load an index saved with `save`.
+        """
+        with open(path, "rb") as file:
+            return pickle.load(file)
+
+
+def load_topology(ttl_path=DEFAULT_TTL_PATH, use_cache=True):
+    """
+    Load the topology index of a TTL file, from its snapshot when the TTL is
+    unchanged, so neither the TTL nor the graph snapshot has to be loaded.
+
+    Args:
+        ttl_path (str): Path to the TTL file.
+        use_cache (bool): Read and write the snapshot.
+
+    Returns:
+        TopologyIndex: The index.
+    """
+    if not use_cache:
+        return TopologyIndex.from_graph(load_graph(ttl_path, use_cache=False))
+
+    ttl_hash = file_hash(ttl_path)
+    kind = f"topology-v{TOPOLOGY_VERSION}"
+    index = read_snapshot(snapshot_path(ttl_path, ttl_hash, kind))
+    if index is None:
+        index = TopologyIndex.from_graph(load_graph(ttl_path))
+        write_snapshot(index, ttl_path, ttl_hash, kind)
+    return index
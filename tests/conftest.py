@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：conftest.py
+@Time: 10/25/2026 10:00 AM
+@Author: Mingchen Li
+
+Shared fixtures of the meterbrick tests: small raw exports and a resampled store.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from meterbrick.storage import write_meter
+
+
+def raw_export(n_rows=400, freq='15min', start='2023-01-01', seed=0, duplicates=(), drop=()):
+    """
+    Raw meter export with 'time' and 'number' columns, like the files of "Raw_data".
+
+    Args:
+        n_rows (int): Number of readings.
+        freq (str): Sampling interval.
+        start (str): First timestamp.
+        seed (int): Seed of the readings.
+        duplicates (iterable): Row numbers repeated right after themselves (with another value).
+        drop (iterable): Row numbers left out, which makes gaps.
+    """
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame({'time': pd.date_range(start, periods=n_rows, freq=freq),
+                         'number': np.round(rng.uniform(0, 100, n_rows), 3)})
+    rows = []
+    for row in range(n_rows):
+        if row in drop:
+            continue
+        rows.append(data.iloc[row])
+        if row in duplicates:
+            repeated = data.iloc[row].copy()
+            repeated['number'] += 1
+            rows.append(repeated)
+    return pd.DataFrame(rows).reset_index(drop=True)
+
+
+@pytest.fixture
+def write_raw_file(tmp_path):
+    """
+    Write a raw export to "Raw_data/GUI_NO.<meter id>.xlsx" and return its path.
+    """
+    raw_dir = tmp_path / "Raw_data"
+    raw_dir.mkdir()
+
+    def write(meter_id, data):
+        path = str(raw_dir / f"GUI_NO.{meter_id}.xlsx")
+        data.to_excel(path, sheet_name='Sheet1', index=False)
+        return path
+
+    return write
+
+
+@pytest.fixture
+def meter_store(tmp_path):
+    """
+    Store of three hourly meters with different spans and gaps.
+    """
+    store_dir = str(tmp_path / "Resampled Data")
+    rng = np.random.default_rng(1)
+    spans = {'101': ('2023-01-01', 200), '102': ('2023-01-02', 150), '103': ('2023-01-01 05:00', 250)}
+    for meter_id, (start, periods) in spans.items():
+        values = rng.uniform(0, 10, periods)
+        values[rng.choice(periods, 20, replace=False)] = np.nan
+        write_meter(pd.DataFrame({'number': values}, index=pd.date_range(start, periods=periods, freq='h')),
+                    meter_id, store_dir=store_dir)
+    return store_dir
+
+
+@pytest.fixture(scope='session')
+def campus_ttl(tmp_path_factory):
+    """
+    Brick TTL of a small synthetic campus (see `meterbrick.synthetic`).
+    """
+    from meterbrick.synthetic import campus_layout, write_campus_ttl
+
+    ttl_path = str(tmp_path_factory.mktemp("campus") / "Campus_Metadata.ttl")
+    write_campus_ttl(campus_layout(120, seed=0), ttl_path)
+    return ttl_path
+
+
+@pytest.fixture(scope='session')
+def campus_topology(campus_ttl):
+    """
+    Topology index of the synthetic campus, built without the snapshot cache.
+    """
+    from meterbrick.graph import load_graph
+    from meterbrick.topology import TopologyIndex
+
+    return TopologyIndex.from_graph(load_graph(campus_ttl, use_cache=False))
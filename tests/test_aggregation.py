@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：test_aggregation.py
+@Time: 10/25/2026 10:00 AM
+@Author: Mingchen Li
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from meterbrick.aggregation import aggregate_entities, entity_meter_sets
+from meterbrick.matrix import MeterMatrix
+
+THROUGH = [('isLocationOf',), ('hasPart',), ('isLocationOf', 'hasPart')]
+
+
+@pytest.mark.parametrize('through', THROUGH)
+@pytest.mark.parametrize('equipment_type', [None, 'Lighting'])
+def test_given_entities_match_the_full_closure(campus_topology, through, equipment_type):
+    everything = entity_meter_sets(campus_topology, through=through, equipment_type=equipment_type)
+    entities = sorted(campus_topology.entities_of_type('Building')) + \
+        sorted(campus_topology.entities_of_type('Floor'))[:3] + sorted(campus_topology.entities_of_type('Zone'))[:3]
+
+    some = entity_meter_sets(campus_topology, entities=entities, through=through, equipment_type=equipment_type)
+    assert some == {entity: everything[entity] for entity in entities if entity in everything}
+
+
+def test_meters_of_an_entity(campus_topology):
+    zone = sorted(campus_topology.entities_of_type('Zone'))[0]
+    meters = entity_meter_sets(campus_topology, entities=[zone], through=('hasPart',))[zone]
+
+    # The total meter of the zone, and the sub meters of its parts (none of which meters itself)
+    expected = set(campus_topology.meters_of(zone))
+    for part in campus_topology.parts_of(zone):
+        expected.update(campus_topology.meters_of(part))
+    assert meters == sorted(expected)
+
+    # Entities without meters are left out
+    assert entity_meter_sets(campus_topology, entities=['Nowhere']) == {}
+
+
+def test_building_meters_through_parts_and_locations(campus_topology):
+    building = 'Academic_Building'
+    both = set(entity_meter_sets(campus_topology, entities=[building], through=('isLocationOf', 'hasPart'))[building])
+    zones = [part for part in campus_topology.parts_of(building) if 'Zone' in campus_topology.types_of(part)]
+    zone_meters = set()
+    for zone in zones:
+        zone_meters.update(entity_meter_sets(campus_topology, entities=[zone], through=('hasPart',))[zone])
+    # The floors reach the equipment metered by the sub meters, the zones reach every meter
+    assert zone_meters <= both
+    assert all(meter in both for meter in entity_meter_sets(
+        campus_topology, entities=[building], through=('hasPart', 'isLocationOf'))[building])
+
+
+def test_aggregate_entities_matches_sum_meters(campus_topology):
+    entity_meters = entity_meter_sets(campus_topology, through=('isLocationOf', 'hasPart'))
+    meter_ids = sorted({meter.split('_')[-1] for meters in entity_meters.values() for meter in meters})
+    rng = np.random.default_rng(0)
+    times = pd.date_range('2023-01-01', periods=500, freq='h')
+    values = rng.uniform(0, 10, (len(meter_ids), len(times)))
+    values[rng.random(values.shape) < 0.2] = np.nan
+    spans = np.zeros((len(meter_ids), 2), dtype=np.int64)
+    for row in range(len(meter_ids)):
+        first = int(rng.integers(0, 200))
+        values[row, :first] = np.nan
+        spans[row] = first, len(times) - 1
+    meter_matrix = MeterMatrix(values, meter_ids, times, spans)
+
+    aggregation = aggregate_entities(entity_meters, meter_matrix, chunk_size=64, uris=campus_topology.uris)
+    for entity, meters in entity_meters.items():
+        pd.testing.assert_series_equal(aggregation.series(entity), meter_matrix.sum_meters(meters),
+                                       check_names=False)
+    assert aggregation.series('Nowhere').empty
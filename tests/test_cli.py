@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：test_cli.py
+@Time: 10/25/2026 4:30 PM
+@Author: Mingchen Li
+"""
+import os
+import shutil
+
+import pytest
+
+from meterbrick import cli
+from meterbrick.storage import DEFAULT_STORE_DIR, STORE_DIR_ENV
+
+PIPELINE = [['resample'], ['missing-rate', 'sampling-times'], ['missing-rate', 'building-hour'], ['evaluate'],
+            ['lighting'], ['dorm'], ['serve']]
+
+# Stage script printing the store and the directory it runs from
+PROBE = """
+import os
+import sys
+sys.path.append({repo_dir!r})
+from meterbrick.storage import script_store_dir
+
+if __name__ == "__main__":
+    print("store:", script_store_dir())
+    print("cwd:", os.getcwd())
+"""
+
+
+def test_every_subcommand_has_the_same_store():
+    parser = cli.build_parser()
+    for argv in PIPELINE:
+        assert parser.parse_args(argv).store == cli.DEFAULT_STORE
+        assert parser.parse_args(argv + ['--store', 'elsewhere']).store == 'elsewhere'
+    # The store the analysis scripts read when they are run by hand
+    for relative_path in cli.SCRIPTS.values():
+        stage_dir = os.path.join(cli.REPO_DIR, os.path.dirname(relative_path))
+        if stage_dir != os.path.join(cli.REPO_DIR, "Data Preprocessing"):
+            assert os.path.normpath(os.path.join(stage_dir, DEFAULT_STORE_DIR)) == cli.DEFAULT_STORE
+
+
+@pytest.fixture
+def probe(tmp_path, monkeypatch):
+    stage_dir = tmp_path / "Stage"
+    stage_dir.mkdir()
+    (stage_dir / "probe.py").write_text(PROBE.format(repo_dir=cli.REPO_DIR), encoding="utf-8")
+    monkeypatch.setattr(cli, "REPO_DIR", str(tmp_path))
+    monkeypatch.setitem(cli.SCRIPTS, 'lighting', "Stage/probe.py")
+    monkeypatch.setitem(cli.SCRIPTS, 'relative-error', "Stage/probe.py")
+    monkeypatch.delenv(STORE_DIR_ENV, raising=False)
+    return str(stage_dir)
+
+
+def test_scripts_get_the_store(probe, tmp_path, capsys, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert cli.main(['lighting', '--store', 'My Store']) == 0
+    assert capsys.readouterr().out.splitlines() == [f"store: {tmp_path / 'My Store'}", f"cwd: {probe}"]
+    assert os.getcwd() == str(tmp_path)
+    assert STORE_DIR_ENV not in os.environ
+
+    assert cli.main(['evaluate', '--skip-calculation']) == 0
+    assert capsys.readouterr().out.splitlines()[0] == f"store: {cli.DEFAULT_STORE}"
+
+
+def test_serve_gets_the_store(monkeypatch):
+    import meterbrick.service
+
+    calls = []
+    monkeypatch.setattr(meterbrick.service, "serve", lambda ttl_path, **kwargs: calls.append(kwargs))
+    cli.main(['serve', '--preload'])
+    assert calls[0]['store_dir'] == cli.DEFAULT_STORE and calls[0]['preload']
+
+
+def test_query(campus_ttl, tmp_path, capsys):
+    ttl_path = str(tmp_path / "Campus_Metadata.ttl")
+    shutil.copy(campus_ttl, ttl_path)
+
+    assert cli.main(['query', 'buildings', '--ttl', ttl_path]) == 0
+    assert capsys.readouterr().out.split() == ['Academic_Building']
+    cli.main(['query', 'zones', '--ttl', ttl_path])
+    zones = capsys.readouterr().out.split()
+    assert len(zones) == 24 and 'Zone_0' in zones
+    cli.main(['query', 'other-zones', '--ttl', ttl_path])
+    assert capsys.readouterr().out.split() == []
+    cli.main(['query', 'meters', 'Zone_0', '--ttl', ttl_path])
+    assert capsys.readouterr().out.split() == ['Electrical_Meter_10000']
+
+    with pytest.raises(SystemExit):
+        cli.main(['query', 'meters'])
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：test_closure.py
+@Time: 10/25/2026 11:00 AM
+@Author: Mingchen Li
+"""
+import pytest
+
+from meterbrick.closure import CLOSURE, reachability
+from meterbrick.graph import load_graph
+from meterbrick.queries import zone_meters
+
+PREFIXES = """
+    PREFIX brick: <https://brickschema.org/schema/Brick#>
+    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+    PREFIX closure: <urn:meterbrick:closure#>
+"""
+
+
+def test_reachability():
+    # A chain, a cycle and a diamond sharing nodes
+    edges = {'a': {'b'}, 'b': {'c'}, 'c': {'a', 'd'}, 'e': {'d', 'f'}, 'f': {'d'}}
+    reachable = reachability(edges)
+    assert reachable['a'] == reachable['b'] == reachable['c'] == {'a', 'b', 'c', 'd'}
+    assert reachable['d'] == {'d'}
+    assert reachable['e'] == {'d', 'e', 'f'}
+    assert reachability({}) == {}
+
+
+@pytest.fixture(scope='module')
+def closure_graph(campus_ttl):
+    return load_graph(campus_ttl, use_cache=False, materialize=True)
+
+
+def pairs(g, query):
+    return {tuple(str(term) for term in row) for row in g.query(PREFIXES + query)}
+
+
+@pytest.mark.parametrize('predicate, closure', [
+    ("brick:isLocationOf", "closure:isLocationOfStar"),
+    ("rdfs:subClassOf", "closure:subClassOfStar"),
+])
+def test_closures_match_property_paths(closure_graph, predicate, closure):
+    # Starting from the subjects of the relation, as the zero-length paths of the closures only
+    # cover the nodes of the relation
+    expected = pairs(closure_graph, f"SELECT DISTINCT ?x ?y WHERE {{ ?x {predicate} ?z . ?x {predicate}* ?y . }}")
+    assert expected
+    assert pairs(closure_graph, f"SELECT DISTINCT ?x ?y WHERE {{ ?x {predicate} ?z . ?x {closure} ?y . }}") == expected
+
+
+def test_type_closure_matches_property_path(closure_graph):
+    star = pairs(closure_graph, "SELECT ?x WHERE { ?x a/rdfs:subClassOf* brick:Meter . }")
+    assert star
+    assert pairs(closure_graph, "SELECT ?x WHERE { ?x closure:typeStar brick:Meter . }") == star
+    # The equipment is a brick:Equipment through its subclass only
+    equipment = pairs(closure_graph, "SELECT ?x WHERE { ?x closure:typeStar brick:Equipment . }")
+    assert len(equipment) == len(pairs(closure_graph, "SELECT ?x WHERE { ?x brick:isMeteredBy ?m ; a ?c . "
+                                                      "?c rdfs:subClassOf brick:Equipment . }"))
+
+
+def test_closures_are_cached_separately(campus_ttl, tmp_path):
+    ttl_path = tmp_path / "Campus_Metadata.ttl"
+    ttl_path.write_bytes(open(campus_ttl, "rb").read())
+    plain = load_graph(str(ttl_path))
+    materialized = load_graph(str(ttl_path), materialize=True)
+    assert not list(plain.triples((None, CLOSURE.typeStar, None)))
+    assert len(materialized) > len(plain)
+    # The cached materialized graph is read back with its closures
+    assert len(load_graph(str(ttl_path), materialize=True)) == len(materialized)
+    assert len(load_graph(str(ttl_path))) == len(plain)
+
+
+def test_zone_meters_query(closure_graph, campus_topology):
+    for zone in campus_topology.entities_of_type('Zone')[:5]:
+        assert sorted(zone_meters(closure_graph, zone)) == campus_topology.meters_of(zone)
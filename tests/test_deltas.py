@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：test_deltas.py
+@Time: 10/25/2026 10:00 AM
+@Author: Mingchen Li
+"""
+import numpy as np
+import pandas as pd
+
+from meterbrick.deltas import OK, REJECTED, RESET, ROLLOVER, consumption_deltas, count_flags, delta_matrix
+from meterbrick.matrix import MeterMatrix
+
+N_STEPS = 200
+
+
+def counter(start=0.0, step=10.0):
+    # Cumulative readings of a meter consuming `step` kWh per grid step
+    return start + step * np.arange(N_STEPS + 1, dtype=np.float64)
+
+
+def test_steady_meter():
+    deltas, flags = consumption_deltas(counter()[None])
+    assert np.isnan(deltas[0, 0])
+    np.testing.assert_array_equal(deltas[0, 1:], 10.0)
+    assert (flags == OK).all()
+
+
+def test_rollover():
+    readings = (counter(start=999_000.0) % 1_000_000)[None]
+    deltas, flags = consumption_deltas(readings, rollover=1_000_000)
+
+    wrapped = np.flatnonzero(flags[0] == ROLLOVER)
+    assert len(wrapped) == 1
+    np.testing.assert_allclose(deltas[0, 1:], 10.0)
+
+    # Without the capacity of the register, the wrap is a reset to zero
+    deltas, flags = consumption_deltas(readings)
+    assert flags[0, wrapped[0]] == RESET
+    assert deltas[0, wrapped[0]] == readings[0, wrapped[0]]
+
+
+def test_reset():
+    readings = counter(start=5_000.0)
+    readings[120:] = counter(start=4.0)[:N_STEPS + 1 - 120]
+    deltas, flags = consumption_deltas(readings[None], rollover=1_000_000)
+
+    assert flags[0, 120] == RESET
+    # The consumption since the restart of the counter
+    assert deltas[0, 120] == 4.0
+    assert (flags[0, np.arange(N_STEPS + 1) != 120] == OK).all()
+
+
+def test_rejected_steps():
+    readings = counter(start=5_000.0)
+    # A decrease too large for a plausible reset, and a jump far above the usual steps
+    readings[50:] -= 2_000.0
+    readings[150:] += 50_000.0
+    deltas, flags = consumption_deltas(readings[None])
+
+    assert flags[0, 50] == REJECTED and np.isnan(deltas[0, 50])
+    assert flags[0, 150] == REJECTED and np.isnan(deltas[0, 150])
+    assert count_flags(flags) == {'rollovers': 0, 'resets': 0, 'rejected': 2}
+
+    # Kept without the spike limit
+    deltas, flags = consumption_deltas(readings[None], spike_factor=None)
+    assert deltas[0, 150] == 50_010.0
+
+
+def test_missing_readings_and_tolerance():
+    readings = counter()
+    readings[30] = np.nan
+    readings[80] = readings[79] - 0.05
+    deltas, flags = consumption_deltas(readings[None], tolerance=0.1)
+
+    assert np.isnan(deltas[0, 30]) and np.isnan(deltas[0, 31])
+    assert flags[0, 30] == flags[0, 31] == OK
+    assert flags[0, 80] == OK and np.isclose(deltas[0, 80], -0.05)
+
+
+def test_chunks_and_out_match_one_block():
+    rng = np.random.default_rng(7)
+    readings = np.cumsum(rng.uniform(0, 10, (9, N_STEPS)), axis=1)
+    readings[rng.random(readings.shape) < 0.05] = np.nan
+    readings[3, 100:] -= readings[3, 99]
+
+    expected, expected_flags = consumption_deltas(readings, chunk_rows=1000)
+    out = np.empty(readings.shape)
+    flags_out = np.empty(readings.shape, dtype=np.int8)
+    consumption_deltas(readings, chunk_rows=2, out=out, flags_out=flags_out)
+    np.testing.assert_array_equal(out, expected)
+    np.testing.assert_array_equal(flags_out, expected_flags)
+
+
+def test_delta_matrix_on_disk_matches_memory(tmp_path):
+    readings = np.stack([counter(), counter(start=100.0, step=5.0)])
+    readings[1, 60:] = counter(start=1.0, step=5.0)[:N_STEPS + 1 - 60]
+    readings[0, 90] -= 3_000.0
+    times = pd.date_range('2023-01-01', periods=N_STEPS + 1, freq='D')
+    spans = np.array([[0, N_STEPS], [0, N_STEPS]])
+
+    in_memory, flags = delta_matrix(MeterMatrix(readings, ['1', '2'], times, spans))
+    on_disk, disk_flags = delta_matrix(MeterMatrix(readings, ['1', '2'], times, spans),
+                                       path=str(tmp_path / "deltas"))
+    np.testing.assert_array_equal(on_disk.values, in_memory.values)
+    np.testing.assert_array_equal(disk_flags, flags)
+    assert on_disk.meter_ids == ['1', '2']
+
+    # complete_sum drops the first step and the steps where a meter of the group was rejected
+    total = on_disk.complete_sum(['1', '2'])
+    rejected_steps = set(times[np.flatnonzero((flags == REJECTED).any(axis=0))])
+    assert times[0] not in total.index
+    assert rejected_steps and not rejected_steps & set(total.index)
+    assert len(total) == N_STEPS - len(rejected_steps)
+    assert total[times[60]] == 10.0 + 1.0
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：test_evaluation.py
+@Time: 10/25/2026 1:30 PM
+@Author: Mingchen Li
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from meterbrick.evaluation import (daily_zone_readings, load_zone_table, write_zone_data, zone_mae_percentages,
+                                   zone_meter_sets)
+from meterbrick.graph import load_graph
+from meterbrick.loader import MeterLoader
+from meterbrick.rollup import rollup_loader, write_meter_rollups
+from meterbrick.storage import write_meter
+from meterbrick.synthetic import campus_layout, write_campus_ttl, zone_raw_data
+
+# Meter left out of the store, so its zone is skipped
+MISSING_METER = '10007'
+
+
+@pytest.fixture(scope='module')
+def layout():
+    return campus_layout(30, seed=0)
+
+
+@pytest.fixture(scope='module')
+def campus_graph(layout, tmp_path_factory):
+    """
+    Graph of a campus of six zones.
+    """
+    ttl_path = str(tmp_path_factory.mktemp("campus") / "Campus_Metadata.ttl")
+    write_campus_ttl(layout, ttl_path)
+    return load_graph(ttl_path, use_cache=False)
+
+
+@pytest.fixture(scope='module')
+def campus_store(layout, tmp_path_factory):
+    """
+    Store of the meters of the campus with 30 days of data.
+    """
+    store_dir = str(tmp_path_factory.mktemp("store"))
+    for i, zone in enumerate(layout):
+        for meter_id, data in zone_raw_data(zone, days=30, seed=i).items():
+            if meter_id == MISSING_METER:
+                continue
+            write_meter(data.drop_duplicates('time').set_index('time'), meter_id, store_dir=store_dir)
+            write_meter_rollups(meter_id, store_dir)
+    return store_dir
+
+
+def legacy_zone_meters(g, zone):
+    # The two queries of every zone in the original Data_Calculation.py
+    meters = [str(row['meter']).split("#")[-1] for row in g.query(f"""
+        SELECT ?meter WHERE {{ ?meter a brick:Electrical_Meter . bldg:{zone} brick:isMeteredBy ?meter . }}""")]
+    has_meters = [str(row['meter']).split("#")[-1] for row in g.query(f"""
+        SELECT ?meter WHERE {{ ?meter a brick:Electrical_Meter . bldg:{zone} brick:hasPart ?meter . }}""")]
+    return meters, [meter for meter in has_meters if meter not in meters]
+
+
+def legacy_zone_series(loader, meters):
+    # Daily first reading of every meter, the days where all meters have one, summed then differenced
+    data = pd.concat([loader.load(meter, columns=['number']).set_index('time')['number']
+                      .resample('D').first().rename(meter) for meter in meters], axis=1)
+    return data.dropna().sum(axis=1).diff().dropna()
+
+
+def test_zone_meter_sets(campus_graph):
+    g = campus_graph
+    zone_meters, zone_has_meters = zone_meter_sets(g)
+    assert len(zone_meters) == 6
+    for zone in zone_meters:
+        meters, has_meters = legacy_zone_meters(g, zone)
+        assert sorted(zone_meters[zone]) == sorted(meters)
+        assert sorted(item for item in zone_has_meters.get(zone, []) if item not in meters) == sorted(has_meters)
+
+
+@pytest.fixture(scope='module')
+def zone_data(campus_graph, campus_store, tmp_path_factory):
+    zone_meters, zone_has_meters = zone_meter_sets(campus_graph)
+    out_dir = tmp_path_factory.mktemp("zone_data")
+    daily_readings = daily_zone_readings(zone_meters, zone_has_meters, str(out_dir / "daily"),
+                                         loader=rollup_loader('D', 'first', campus_store))
+    output_dir = str(out_dir / "Zone_Data")
+    written, _ = write_zone_data(zone_meters, zone_has_meters, daily_readings, output_dir,
+                                           meter_deltas=False)
+    return zone_meters, zone_has_meters, output_dir, written
+
+
+def test_write_zone_data_matches_legacy(campus_graph, campus_store, zone_data):
+    zone_meters, zone_has_meters, output_dir, written = zone_data
+    loader = MeterLoader(campus_store)
+
+    skipped = [zone for zone in zone_meters if not os.path.exists(os.path.join(output_dir, f"{zone}_data.csv"))]
+    assert written == len(zone_meters) - 1
+    assert any(meter.endswith(MISSING_METER) for meter in zone_meters[skipped[0]] + zone_has_meters[skipped[0]])
+
+    for zone in zone_meters:
+        if zone in skipped:
+            continue
+        meters, has_meters = legacy_zone_meters(campus_graph, zone)
+        total_kwh_series = legacy_zone_series(loader, meters)
+        sub_meter_kwh_series = legacy_zone_series(loader, has_meters)
+        valid_indices = total_kwh_series.index.intersection(sub_meter_kwh_series.index)
+
+        data = pd.read_csv(os.path.join(output_dir, f"{zone}_data.csv"), parse_dates=['date'])
+        assert len(data) > 10
+        assert (data['date'] == valid_indices).all()
+        np.testing.assert_allclose(data['total_kwh'], total_kwh_series[valid_indices])
+        np.testing.assert_allclose(data['sub_meter_kwh'], sub_meter_kwh_series[valid_indices])
+
+
+def legacy_mae_percentage(file_path):
+    # calculate_metrics of the original Relative Error.py
+    df = pd.read_csv(file_path)
+    df['difference'] = df['total_kwh'] - df['sub_meter_kwh']
+    Q1 = df['difference'].quantile(0.25)
+    Q3 = df['difference'].quantile(0.75)
+    IQR = Q3 - Q1
+    df_filtered = df[(df['difference'] >= Q1 - 1.5 * IQR) & (df['difference'] <= Q3 + 1.5 * IQR)]
+    if df_filtered.shape[0] < 2:
+        return None
+    mae = (df_filtered['total_kwh'] - df_filtered['sub_meter_kwh']).abs().mean()
+    return mae / max(df_filtered['total_kwh'].mean(), df_filtered['sub_meter_kwh'].mean()) * 100
+
+
+def test_zone_mae_percentages_match_legacy(zone_data, tmp_path):
+    output_dir = zone_data[2]
+    # A zone with a single day and a zone without data
+    pd.read_csv(os.path.join(output_dir, os.listdir(output_dir)[0])).head(1).to_csv(
+        tmp_path / "Zone_short_data.csv", index=False)
+    pd.DataFrame(columns=['date', 'total_kwh', 'sub_meter_kwh']).to_csv(tmp_path / "Zone_empty_data.csv",
+                                                                          index=False)
+    for filename in os.listdir(output_dir):
+        pd.read_csv(os.path.join(output_dir, filename)).to_csv(tmp_path / filename, index=False)
+
+    table, zones = load_zone_table(str(tmp_path))
+    results = zone_mae_percentages(table, zones).set_index('zone')
+    assert list(results.index) == zones
+    for filename in zones:
+        expected = legacy_mae_percentage(os.path.join(tmp_path, filename))
+        if expected is None:
+            assert np.isnan(results.loc[filename, 'mae_percentage'])
+        else:
+            assert results.loc[filename, 'mae_percentage'] == pytest.approx(expected)
+    assert results.loc["Zone_empty_data.csv", 'n_days'] == 0
+
+    # With quantile sketches, the bounds are estimated
+    sketched = zone_mae_percentages(table, zones, epsilon=0.01).set_index('zone')
+    assert (sketched['n_days'] == results['n_days']).all()
+    np.testing.assert_allclose(sketched['mae_percentage'], results['mae_percentage'], rtol=0.1)
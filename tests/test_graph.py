@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：test_graph.py
+@Time: 10/25/2026 11:30 AM
+@Author: Mingchen Li
+"""
+import os
+
+import pytest
+
+from meterbrick.graph import CACHE_DIR_NAME, load_graph, snapshot_path
+from meterbrick.manifest import file_hash
+
+TTL = """@prefix brick: <https://brickschema.org/schema/Brick#> .
+@prefix bldg: <urn:test#> .
+
+bldg:Building a brick:Building ; brick:hasPart bldg:Zone_1 .
+bldg:Zone_1 a brick:Zone ; brick:isMeteredBy bldg:Electrical_Meter_1 .
+"""
+
+
+@pytest.fixture
+def ttl_path(tmp_path):
+    path = tmp_path / "Test_Metadata.ttl"
+    path.write_text(TTL, encoding="utf-8")
+    return str(path)
+
+
+def cached_files(ttl_path):
+    return sorted(os.listdir(os.path.join(os.path.dirname(ttl_path), CACHE_DIR_NAME)))
+
+
+def test_snapshot_is_reused_while_the_ttl_is_unchanged(ttl_path):
+    parsed = load_graph(ttl_path)
+    path = snapshot_path(ttl_path, file_hash(ttl_path))
+    assert os.path.exists(path)
+
+    # Loaded from the snapshot, not from the TTL
+    os.utime(path, (0, 0))
+    cached = load_graph(ttl_path)
+    assert os.stat(path).st_mtime == 0
+    assert set(cached) == set(parsed)
+    assert dict(cached.namespaces())['bldg'] == dict(parsed.namespaces())['bldg']
+
+
+def test_snapshot_is_rebuilt_when_the_ttl_changes(ttl_path):
+    load_graph(ttl_path)
+    old_path = snapshot_path(ttl_path, file_hash(ttl_path))
+
+    with open(ttl_path, "a", encoding="utf-8") as file:
+        file.write("bldg:Zone_2 a brick:Zone .\n")
+    g = load_graph(ttl_path)
+    assert len(g) == 5
+    # The snapshot of the old TTL content is removed
+    assert cached_files(ttl_path) == [os.path.basename(snapshot_path(ttl_path, file_hash(ttl_path)))]
+    assert not os.path.exists(old_path)
+
+
+def test_unreadable_snapshot_is_ignored(ttl_path, capsys):
+    path = snapshot_path(ttl_path, file_hash(ttl_path))
+    os.makedirs(os.path.dirname(path))
+    with open(path, "wb") as file:
+        file.write(b"not a pickle")
+    assert len(load_graph(ttl_path)) == 4
+    assert "Ignoring unreadable snapshot" in capsys.readouterr().out
+    # Replaced by a valid snapshot
+    assert len(load_graph(ttl_path)) == 4
+    assert "Ignoring" not in capsys.readouterr().out
+
+
+def test_without_cache(ttl_path):
+    assert len(load_graph(ttl_path, use_cache=False)) == 4
+    assert not os.path.exists(os.path.join(os.path.dirname(ttl_path), CACHE_DIR_NAME))
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：test_ingestion.py
+@Time: 10/25/2026 10:00 AM
+@Author: Mingchen Li
+"""
+import pandas as pd
+import pytest
+from conftest import raw_export
+
+from meterbrick.ingestion import resample_raw_file_chunked
+from meterbrick.manifest import ResamplingManifest
+from meterbrick.resampling import resample_raw_file, run_resampling
+from meterbrick.storage import read_meter
+
+
+@pytest.mark.parametrize('freq, chunk_rows', [('15min', 50), ('30min', 64), ('60min', 1000)])
+def test_chunked_matches_full_read(tmp_path, write_raw_file, freq, chunk_rows):
+    # Duplicates inside and across the chunk boundaries, and gaps
+    data = raw_export(n_rows=400, freq=freq, duplicates=(10, 49, 63, 200), drop=range(120, 140))
+    path = write_raw_file('12345', data)
+
+    full = resample_raw_file(path, str(tmp_path / "full"))
+    chunked = resample_raw_file_chunked(path, str(tmp_path / "chunked"), chunk_rows=chunk_rows)
+
+    assert chunked['status'] == full['status'] == 'ok'
+    assert chunked['sampling_time'] == full['sampling_time']
+    assert chunked['duplicated'] == full['duplicated'] is True
+    assert chunked['late_rows'] == 0
+    pd.testing.assert_frame_equal(read_meter('12345', store_dir=str(tmp_path / "chunked")),
+                                  read_meter('12345', store_dir=str(tmp_path / "full")))
+
+
+def test_short_file_is_empty(tmp_path, write_raw_file):
+    path = write_raw_file('1', raw_export(n_rows=50))
+    assert resample_raw_file(path, str(tmp_path / "store"))['status'] == 'empty'
+    assert resample_raw_file_chunked(path, str(tmp_path / "store"), chunk_rows=16)['status'] == 'empty'
+
+
+def test_late_rows_are_counted_and_recorded(tmp_path, write_raw_file, capsys):
+    data = raw_export(n_rows=400)
+    # Five rows of the first day exported again at the end, out of time order
+    path = write_raw_file('1', pd.concat([data, data.iloc[10:15]], ignore_index=True))
+    manifest_path = str(tmp_path / "manifest.jsonl")
+
+    results = run_resampling([path], str(tmp_path / "store"), manifest=ResamplingManifest(manifest_path),
+                             chunked_min_mb=0, chunk_rows=100)
+
+    assert results[0]['late_rows'] == 5
+    assert ResamplingManifest(manifest_path).entries['GUI_NO.1.xlsx']['late_rows'] == 5
+    assert "GUI_NO.1.xlsx (5 rows)" in capsys.readouterr().out
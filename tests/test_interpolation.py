@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：test_interpolation.py
+@Time: 10/25/2026 10:00 AM
+@Author: Mingchen Li
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from meterbrick.interpolation import interpolate_block, max_gaps
+from meterbrick.loader import MeterLoader
+from meterbrick.matrix import MeterMatrix, build_meter_matrix
+
+STEP = pd.Timedelta('15min')
+
+
+def pandas_reference(series, limit):
+    # Gaps of at most limit missing samples, filled like interpolate(limit=limit, limit_area='inside');
+    # longer gaps stay NaN as a whole
+    filled = series.interpolate(method='time', limit_area='inside')
+    missing = series.isna()
+    run = (missing != missing.shift()).cumsum()
+    run_length = missing.groupby(run).transform('sum')
+    return filled.where(~missing | (run_length <= limit))
+
+
+@pytest.mark.parametrize('limit', [1, 3, 10])
+def test_interpolate_block_matches_pandas(limit):
+    rng = np.random.default_rng(2)
+    times = pd.date_range('2023-01-01', periods=300, freq=STEP)
+    values = rng.uniform(0, 10, (5, len(times)))
+    values[rng.random(values.shape) < 0.3] = np.nan
+    values[1, :20] = np.nan
+    values[2, 100:150] = np.nan
+
+    filled, observed = interpolate_block(values, times, max_gap=(limit + 1) * STEP, chunk_rows=2)
+
+    np.testing.assert_array_equal(observed, ~np.isnan(values))
+    for row in range(len(values)):
+        series = pd.Series(values[row], index=times)
+        np.testing.assert_allclose(filled[row], pandas_reference(series, limit).to_numpy())
+        # With the longer gaps set to 0, no gap is longer than limit and this is exactly interpolate(limit)
+        short = series.copy()
+        short[pandas_reference(series, limit).isna() & series.isna()] = 0.0
+        expected = short.interpolate(method='time', limit=limit, limit_area='inside')
+        np.testing.assert_allclose(interpolate_block(short.to_numpy()[None], times, max_gap=(limit + 1) * STEP)[0][0],
+                                   expected.to_numpy())
+
+
+def test_interpolate_block_without_limit_matches_pandas():
+    rng = np.random.default_rng(3)
+    times = pd.date_range('2023-01-01', periods=200, freq='h').delete([50, 51, 120])
+    values = rng.uniform(0, 10, (3, len(times)))
+    values[rng.random(values.shape) < 0.4] = np.nan
+
+    filled, _ = interpolate_block(values, times)
+    for row in range(len(values)):
+        expected = pd.Series(values[row], index=times).interpolate(method='time', limit_area='inside')
+        np.testing.assert_allclose(filled[row], expected.to_numpy())
+
+
+def test_max_gap_per_row_and_in_place():
+    times = pd.date_range('2023-01-01', periods=6, freq=STEP)
+    values = np.array([[0.0, np.nan, np.nan, 3.0, np.nan, 5.0]] * 3)
+
+    # One row unlimited, one limited to a single missing sample, one limited to two
+    filled, _ = interpolate_block(values, times, max_gap=[None, 2 * STEP, 3 * STEP], out=values)
+    assert filled is values
+    np.testing.assert_array_equal(values[0], [0, 1, 2, 3, 4, 5])
+    np.testing.assert_array_equal(values[1], [0, np.nan, np.nan, 3, 4, 5])
+    np.testing.assert_array_equal(values[2], [0, 1, 2, 3, 4, 5])
+
+
+def test_max_gaps_from_sampling_times():
+    gaps = max_gaps(['Electrical_Meter_1', '2', '3'], {'1': '15T', '2': '1440T'}, 4)
+    assert gaps == {'1': pd.Timedelta(hours=1), '2': pd.Timedelta(days=4), '3': pd.Timedelta(hours=4)}
+
+
+def test_matrix_fills_gaps_on_the_grid(tmp_path, meter_store):
+    path = str(tmp_path / "matrix")
+    meters = ['101', '102', '103']
+    matrix = build_meter_matrix(meters, path, loader=MeterLoader(meter_store).load, max_gap=pd.Timedelta(hours=3))
+    raw = build_meter_matrix(meters, str(tmp_path / "raw"), interpolate=False, loader=MeterLoader(meter_store).load)
+
+    assert os.path.exists(MeterMatrix.observed_path(path))
+    np.testing.assert_array_equal(MeterMatrix.open(path).observed, ~np.isnan(raw.values))
+    expected, _ = interpolate_block(np.array(raw.values), raw.times, max_gap=pd.Timedelta(hours=3))
+    np.testing.assert_array_equal(matrix.values, expected)
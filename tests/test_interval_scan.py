@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：test_interval_scan.py
+@Time: 10/25/2026 5:30 PM
+@Author: Mingchen Li
+"""
+import os
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+from conftest import raw_export
+
+from meterbrick import interval_scan
+from meterbrick.interval_scan import IntervalWindow, scan_sampling_time, scan_sampling_times
+from meterbrick.resampling import resample_raw_file
+
+
+def test_interval_window():
+    window = IntervalWindow(window_size=3)
+    start = datetime(2023, 1, 1)
+    for minutes in [0, 15, 15, 30, 60, 0]:
+        window.push(start + timedelta(minutes=minutes))
+    # The repeat of 15 is ignored, the repeat of 0 has left the window and is added again
+    assert list(window.times) == [start + timedelta(minutes=minutes) for minutes in [30, 60, 0]]
+    assert window.time_set == set(window.times)
+    assert window.histogram == {1800.0: 1, -3600.0: 1}
+    assert window.most_common_interval() == -3600.0
+    assert IntervalWindow().most_common_interval() is None
+
+
+@pytest.mark.parametrize('freq, rows', [('15min', 600), ('30min', 600), ('h', 150), ('D', 400)])
+def test_matches_resampling(tmp_path, write_raw_file, freq, rows):
+    # Duplicates and gaps inside the last rows, and a change of interval before them
+    data = pd.concat([raw_export(300, freq='D', start='2021-01-01', seed=1),
+                      raw_export(rows, freq=freq, start='2022-01-01', duplicates=range(rows - 90, rows, 7),
+                                 drop=range(rows - 60, rows - 50))])
+    path = write_raw_file('12345', data)
+    expected = resample_raw_file(path, str(tmp_path / "store"))
+    os.remove(os.path.join(tmp_path, "store", "12345.parquet"))
+
+    tail = scan_sampling_time(path)
+    full = scan_sampling_time(path, tail_rows=10 ** 9)
+    assert tail == full
+    assert tail['status'] == 'ok' and tail['n_rows'] == len(data)
+    assert tail['sampling_time'] == expected['sampling_time']
+
+
+def test_repeated_tail_scans_the_whole_file(write_raw_file, monkeypatch):
+    # Every timestamp is written twice, so the last 150 rows only hold 75 distinct timestamps
+    path = write_raw_file('12345', raw_export(400, freq='30min', duplicates=range(400)))
+    scans = []
+    scan_rows = interval_scan._scan_rows
+    monkeypatch.setattr(interval_scan, "_scan_rows",
+                        lambda *args, **kwargs: scans.append(kwargs.get('min_row', 2)) or scan_rows(*args, **kwargs))
+    result = scan_sampling_time(path, tail_rows=150)
+    assert scans == [652, 2]
+    assert result == scan_sampling_time(path, tail_rows=10 ** 9)
+    assert result['sampling_time'] == '30T' and result['n_rows'] == 800
+
+
+def test_sampling_time_from_store(tmp_path, write_raw_file):
+    path = write_raw_file('12345', raw_export(400, freq='h'))
+    store_dir = str(tmp_path / "store")
+    assert scan_sampling_time(path, store_dir=store_dir)['sampling_time'] == '60T'
+
+    resample_raw_file(path, store_dir)
+    # The stored data is read instead of the file, which is only opened for its dimensions
+    write_raw_file('12345', raw_export(400, freq='15min'))
+    os.utime(os.path.join(store_dir, "12345.parquet"), (os.path.getmtime(path) + 10,) * 2)
+    assert scan_sampling_time(path, store_dir=store_dir) == {
+        'file_name': 'GUI_NO.12345.xlsx', 'status': 'ok', 'sampling_time': '60T', 'n_rows': 400, 'error': None}
+    # A file changed after its resampling is scanned
+    os.utime(path, (os.path.getmtime(path) + 20,) * 2)
+    assert scan_sampling_time(path, store_dir=store_dir)['sampling_time'] == '15T'
+
+
+def test_empty_and_failed_files(tmp_path, write_raw_file):
+    short = write_raw_file('1', raw_export(50))
+    broken = str(tmp_path / "GUI_NO.2.xlsx")
+    with open(broken, "w") as file:
+        file.write("not a workbook")
+    results = scan_sampling_times([short, broken])
+    assert [result['status'] for result in results] == ['empty', 'failed']
+    assert results[0]['n_rows'] == 50
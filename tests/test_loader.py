@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：test_loader.py
+@Time: 10/25/2026 10:00 AM
+@Author: Mingchen Li
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from meterbrick.loader import MeterLoader
+from meterbrick.storage import read_meter, write_meter
+
+WINDOWS = [('2023-01-02', None), (None, '2023-01-03 12:00'), ('2023-01-02 06:30', '2023-01-05')]
+
+
+@pytest.fixture
+def minute_store(tmp_path):
+    # Several row groups, so a window skips some of them
+    times = pd.date_range('2023-01-01', periods=10_000, freq='min')
+    write_meter(pd.DataFrame({'number': np.arange(len(times), dtype=np.float64)}, index=times), '42',
+                store_dir=str(tmp_path))
+    return str(tmp_path)
+
+
+def filtered(data, start, end):
+    if start is not None:
+        data = data[data['time'] >= pd.Timestamp(start)]
+    if end is not None:
+        data = data[data['time'] <= pd.Timestamp(end)]
+    return data.reset_index(drop=True)
+
+
+@pytest.mark.parametrize('start, end', WINDOWS)
+def test_store_window_matches_filtering(minute_store, start, end):
+    expected = filtered(read_meter('42', store_dir=minute_store), start, end)
+    result = read_meter('42', store_dir=minute_store, start=start, end=end)
+    pd.testing.assert_frame_equal(result.reset_index(drop=True), expected)
+
+
+@pytest.mark.parametrize('start, end', WINDOWS)
+def test_loader_window_from_store_and_cache(minute_store, start, end):
+    expected = filtered(read_meter('42', store_dir=minute_store), start, end)
+
+    # Pushed down to the store while the meter is not cached
+    loader = MeterLoader(store_dir=minute_store)
+    pd.testing.assert_frame_equal(loader.load('42', start=start, end=end).reset_index(drop=True), expected)
+
+    # Sliced from memory once the whole meter is cached
+    loader.load('42')
+    reads = loader.reads
+    pd.testing.assert_frame_equal(loader.load('42', start=start, end=end).reset_index(drop=True), expected)
+    assert loader.reads == reads
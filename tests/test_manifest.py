@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：test_manifest.py
+@Time: 10/25/2026 10:00 AM
+@Author: Mingchen Li
+"""
+import os
+
+from conftest import raw_export
+
+from meterbrick.manifest import ResamplingManifest
+from meterbrick.resampling import run_resampling
+
+
+def test_manifest_skips_unchanged_files(tmp_path, write_raw_file):
+    paths = [write_raw_file(str(meter_id), raw_export(seed=meter_id)) for meter_id in (1, 2)]
+    store_dir = str(tmp_path / "store")
+    manifest_path = str(tmp_path / "manifest.jsonl")
+
+    first = run_resampling(paths, store_dir, manifest=ResamplingManifest(manifest_path))
+    assert [result['status'] for result in first] == ['ok', 'ok']
+
+    manifest = ResamplingManifest(manifest_path)
+    assert not any(manifest.needs_processing(path) for path in paths)
+
+    # Touching a file without changing it does not make it stale
+    os.utime(paths[0], (0, 0))
+    assert not manifest.needs_processing(paths[0])
+
+    # A modified file and a file whose output was deleted are processed again
+    write_raw_file('1', raw_export(seed=10))
+    os.remove(first[1]['output_path'])
+    assert manifest.needs_processing(paths[0])
+    assert manifest.needs_processing(paths[1])
+
+    # The second run returns the entries of all the files in input order
+    second = run_resampling(paths, store_dir, manifest=manifest)
+    assert [result['file_name'] for result in second] == [os.path.basename(path) for path in paths]
+    assert not any(ResamplingManifest(manifest_path).needs_processing(path) for path in paths)
+
+
+def test_truncated_line_is_ignored(tmp_path, write_raw_file):
+    path = write_raw_file('1', raw_export())
+    manifest_path = str(tmp_path / "manifest.jsonl")
+    run_resampling([path], str(tmp_path / "store"), manifest=ResamplingManifest(manifest_path))
+
+    # A run killed while appending leaves half a line
+    with open(manifest_path, "a", encoding="utf-8") as file:
+        file.write('{"file_name": "GUI_NO.2.xl')
+    manifest = ResamplingManifest(manifest_path)
+    assert list(manifest.entries) == ['GUI_NO.1.xlsx']
+    assert not manifest.needs_processing(path)
+
+
+def test_failed_files_are_processed_again(tmp_path):
+    manifest = ResamplingManifest(str(tmp_path / "manifest.jsonl"))
+    manifest.record({'file_name': 'GUI_NO.1.xlsx', 'status': 'failed', 'error': 'MemoryError()'})
+    assert manifest.needs_processing(str(tmp_path / "GUI_NO.1.xlsx"))
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：test_matrix.py
+@Time: 10/25/2026 10:00 AM
+@Author: Mingchen Li
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from meterbrick.loader import MeterLoader
+from meterbrick.matrix import MeterMatrix, build_meter_matrix
+
+METERS = ['Electrical_Meter_101', 'Electrical_Meter_102', 'Electrical_Meter_103']
+
+
+def resampled(loader, meter, freq, interpolate=False):
+    # What the analysis scripts concatenated before the matrix: every meter resampled on its own
+    data = loader.load(meter, columns=['number'], interpolate=interpolate)
+    return data.set_index('time')['number'].resample(freq).mean()
+
+
+@pytest.mark.parametrize('freq', ['h', 'D'])
+@pytest.mark.parametrize('interpolate', [False, True])
+def test_sum_meters_matches_concat_sum(tmp_path, meter_store, freq, interpolate):
+    loader = MeterLoader(store_dir=meter_store)
+    matrix = build_meter_matrix(METERS, str(tmp_path / "matrix"), freq=freq, interpolate=interpolate,
+                                loader=loader.load)
+
+    expected = pd.concat([resampled(loader, meter, freq, interpolate) for meter in METERS], axis=1).sum(axis=1)
+    pd.testing.assert_series_equal(matrix.sum_meters(METERS), expected, check_names=False, check_freq=False)
+    # A subset of the meters is a subset of the rows
+    expected = pd.concat([resampled(loader, meter, freq, interpolate) for meter in METERS[1:]], axis=1).sum(axis=1)
+    pd.testing.assert_series_equal(matrix.sum_meters(METERS[1:]), expected, check_names=False, check_freq=False)
+
+
+def test_open_reads_back_the_matrix(tmp_path, meter_store):
+    path = str(tmp_path / "matrix")
+    matrix = build_meter_matrix(METERS + ['Electrical_Meter_404'], path, loader=MeterLoader(meter_store).load)
+    opened = MeterMatrix.open(path)
+
+    # The meter that cannot be loaded is left out
+    assert opened.meter_ids == ['101', '102', '103']
+    np.testing.assert_array_equal(opened.values, matrix.values)
+    np.testing.assert_array_equal(opened.spans, matrix.spans)
+    assert isinstance(opened.values, np.memmap)
+    np.testing.assert_array_equal(opened.row('Electrical_Meter_102'), matrix.values[1])
+
+
+def test_matrix_without_meters(tmp_path, meter_store):
+    matrix = build_meter_matrix(['Electrical_Meter_404'], str(tmp_path / "matrix"),
+                                loader=MeterLoader(meter_store).load)
+    assert matrix.meter_ids == []
+    assert matrix.sum_meters(['Electrical_Meter_404']).empty
+
+
+def test_window_is_pushed_down(tmp_path, meter_store):
+    loader = MeterLoader(store_dir=meter_store, max_bytes=0)
+    windows = []
+
+    def load(meter, **kwargs):
+        windows.append((kwargs.get('start'), kwargs.get('end')))
+        return loader.load(meter, **kwargs)
+
+    full = build_meter_matrix(METERS, str(tmp_path / "full"), interpolate=False, loader=load)
+    window = build_meter_matrix(METERS, str(tmp_path / "window"), interpolate=False, loader=load,
+                                start='2023-01-03', end='2023-01-05 23:30')
+
+    # The loader only reads the readings of the grid steps
+    assert windows[-1] == (pd.Timestamp('2023-01-03'), pd.Timestamp('2023-01-05 23:59:59.999999999'))
+    assert window.times[0] == pd.Timestamp('2023-01-03')
+    assert window.times[-1] == pd.Timestamp('2023-01-05 23:00')
+    expected = full.sum_meters(METERS)
+    expected = expected[(expected.index >= window.times[0]) & (expected.index <= window.times[-1])]
+    pd.testing.assert_series_equal(window.sum_meters(METERS), expected, check_freq=False)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：test_missing_rate.py
+@Time: 10/25/2026 2:30 PM
+@Author: Mingchen Li
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from meterbrick.missing_rate import category_missing_rates, multi_resolution_missing_rates
+from meterbrick.rollup import write_meter_rollups
+from meterbrick.storage import read_meter, write_meter
+
+# Meter ID -> (sampling time, first timestamp, number of days)
+METERS = {
+    '1': ('15T', '2023-03-01', 60),
+    '2': ('15T', '2023-02-20 06:15', 45),
+    '3': ('30T', '2023-03-10', 50),
+    '4': ('60T', '2023-03-05 13:00', 40),
+    '5': ('1440T', '2023-01-15', 120),
+    '6': ('60T', '2021-12-25', 30),
+}
+
+
+@pytest.fixture
+def sampled_store(tmp_path):
+    """
+    Store of resampled meters at different sampling times, with missing readings and a gap.
+    """
+    store_dir = str(tmp_path)
+    rng = np.random.default_rng(2)
+    for meter_id, (sampling_time, start, days) in METERS.items():
+        times = pd.date_range(start, periods=int(pd.Timedelta(days=days) / pd.Timedelta(sampling_time)),
+                              freq=sampling_time)
+        values = rng.uniform(0, 10, len(times))
+        values[rng.random(len(times)) < 0.1] = np.nan
+        gap = int(rng.integers(0, len(times) // 2))
+        values[gap:gap + len(times) // 5] = np.nan
+        write_meter(pd.DataFrame({'number': values}, index=times.rename('time')), meter_id, store_dir=store_dir)
+        write_meter_rollups(meter_id, store_dir)
+    return store_dir
+
+
+def legacy_missing_rates(file_names, store_dir, resample_freq=None, min_year=None):
+    # calculate_quarterly_missing_rates of the original Missing_Rate_*.py scripts
+    quarterly_missing_rates = {}
+    for file_name in file_names:
+        df = read_meter(file_name, store_dir=store_dir)
+        if min_year is not None:
+            df = df[df['time'].dt.year >= min_year]
+        freq = resample_freq
+        if min_year is not None and df['time'].dt.date.nunique() == df.shape[0]:
+            freq = None
+        if freq:
+            df = df.set_index('time').resample(freq).first().reset_index()
+        df['quarter'] = df['time'].dt.to_period('Q')
+        for quarter, rate in df.groupby('quarter')['number'].apply(lambda x: x.isna().mean()).items():
+            quarterly_missing_rates.setdefault(quarter, []).append(rate)
+    average = {quarter: sum(rates) / len(rates) for quarter, rates in quarterly_missing_rates.items()}
+    return pd.DataFrame(list(average.items()), columns=['Quarter', 'Average Missing Rate']).sort_values(by='Quarter')
+
+
+def assert_rates_equal(results, expected):
+    assert list(results['Quarter']) == list(expected['Quarter'])
+    np.testing.assert_allclose(results['Average Missing Rate'].to_numpy(dtype=float),
+                               expected['Average Missing Rate'].to_numpy(dtype=float))
+
+
+@pytest.mark.parametrize('n_workers', [1, 2])
+def test_multi_resolution_missing_rates(sampled_store, capsys, n_workers):
+    file_sampling_times = [(f"{meter_id}.xlsx", sampling_time) for meter_id, (sampling_time, _, _) in METERS.items()]
+    results = multi_resolution_missing_rates(file_sampling_times + [("404.xlsx", '15T')], store_dir=sampled_store,
+                                             n_workers=n_workers)
+    assert "404.xlsx does not exist" in capsys.readouterr().out
+
+    # A meter contributes to its own sampling time and to every coarser one
+    for k, sampling_time in enumerate(['15T', '30T', '60T', '1440T']):
+        file_names = [file_name for file_name, meter_sampling_time in file_sampling_times
+                      if meter_sampling_time in ['15T', '30T', '60T', '1440T'][:k + 1]]
+        expected = legacy_missing_rates(file_names, sampled_store,
+                                        resample_freq=None if sampling_time == '15T' else sampling_time)
+        assert_rates_equal(results[sampling_time], expected)
+
+
+def test_category_missing_rates(sampled_store, capsys):
+    # Meters shared by several categories, a category with a meter that does not exist and an empty one
+    category_meters = {'Academic': ['1', '3', '5'], 'Residential': ['2', '3', '6'], 'Sports': ['4', '404'],
+                       'Empty': ['405']}
+    results = category_missing_rates(category_meters, store_dir=sampled_store)
+    assert "File 404 does not exist" in capsys.readouterr().out
+
+    for category, meters in category_meters.items():
+        # The daily meter is not resampled and the data before 2022 is ignored
+        expected = legacy_missing_rates([meter for meter in meters if meter in METERS], sampled_store,
+                                        resample_freq='H', min_year=2022)
+        assert_rates_equal(results[category].reset_index(drop=True), expected)
+    assert results['Empty'].empty
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：test_outliers.py
+@Time: 10/25/2026 10:00 AM
+@Author: Mingchen Li
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from meterbrick.outliers import QuantileSketch, iqr_mask
+
+QUANTILES = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+def rank_errors(sorted_values, estimates, qs):
+    # Distance between the normalized rank of every estimate and its quantile
+    n = len(sorted_values)
+    low = np.searchsorted(sorted_values, estimates, side='left') / n
+    high = np.searchsorted(sorted_values, estimates, side='right') / n
+    return np.maximum(0, np.maximum(low - qs, qs - high))
+
+
+@pytest.mark.parametrize('epsilon', [0.05, 0.01, 0.002])
+@pytest.mark.parametrize('seed', [0, 1])
+def test_rank_error_is_bounded(epsilon, seed):
+    rng = np.random.default_rng(seed)
+    values = np.concatenate([rng.lognormal(0, 1, 150_000), rng.normal(50, 5, 50_000)])
+    rng.shuffle(values)
+
+    sketch = QuantileSketch(epsilon=epsilon, seed=seed)
+    for chunk in np.array_split(values, 37):
+        sketch.update(chunk)
+
+    assert sketch.n == len(values)
+    assert sketch.size() < len(values) / 10
+    qs = np.array(QUANTILES)
+    assert rank_errors(np.sort(values), sketch.quantiles(qs), qs).max() <= epsilon
+
+
+def test_merged_sketches_keep_the_bound():
+    rng = np.random.default_rng(4)
+    parts = [rng.exponential(3, 40_000) for _ in range(5)]
+    sketch = QuantileSketch(epsilon=0.01)
+    for seed, part in enumerate(parts):
+        sketch.merge(QuantileSketch(epsilon=0.01, seed=seed).update(part))
+
+    values = np.sort(np.concatenate(parts))
+    qs = np.array(QUANTILES)
+    assert rank_errors(values, sketch.quantiles(qs), qs).max() <= 0.01
+
+
+def test_exact_without_epsilon():
+    values = np.random.default_rng(5).normal(size=10_001)
+    values[::7] = np.nan
+    sketch = QuantileSketch().update(values)
+    np.testing.assert_allclose(sketch.quantiles(QUANTILES), pd.Series(values).quantile(QUANTILES).to_numpy())
+
+
+def test_exact_iqr_mask_matches_pandas():
+    series = pd.Series(np.random.default_rng(6).standard_t(2, 5_000))
+    Q1, Q3 = series.quantile(0.25), series.quantile(0.75)
+    IQR = Q3 - Q1
+    expected = (series >= Q1 - 1.5 * IQR) & (series <= Q3 + 1.5 * IQR)
+    pd.testing.assert_series_equal(iqr_mask(series), expected)
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：test_rollup.py
+@Time: 10/25/2026 10:00 AM
+@Author: Mingchen Li
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from meterbrick.matrix import build_meter_matrix
+from meterbrick.rollup import (entity_rollup_meters, meter_rollup_is_fresh, read_rollup, rollup_loader,
+                               rollup_path, rollup_series, write_entity_rollups, write_meter_rollups)
+from meterbrick.storage import read_meter, write_meter
+
+GRAINS = ['H', '6H', 'D', 'W', 'MS', 'QS']
+
+
+def write_meters(store_dir, readings):
+    # readings: meter ID -> series of 15-minute readings
+    for meter_id, series in readings.items():
+        write_meter(series.rename('number').to_frame(), meter_id, store_dir=store_dir)
+        write_meter_rollups(meter_id, store_dir)
+
+
+def constant(value, start='2023-01-01', periods=4 * 24 * 90):
+    return pd.Series(float(value), index=pd.date_range(start, periods=periods, freq='15min'))
+
+
+@pytest.fixture
+def constant_store(tmp_path):
+    store_dir = str(tmp_path)
+    write_meters(store_dir, {'1': constant(10), '2': constant(10), '3': constant(10)})
+    write_entity_rollups({'Zone': ['Electrical_Meter_1', 'Electrical_Meter_2', 'Electrical_Meter_3']}, store_dir)
+    return store_dir
+
+
+@pytest.mark.parametrize('freq', GRAINS)
+def test_entity_scale_is_the_same_at_every_grain(constant_store, freq):
+    rollup = read_rollup('Zone', freq, store_dir=constant_store, kind='entities')
+    # Three meters reading 10: the entity reads 30 at every grain, stored level or not
+    np.testing.assert_allclose(rollup['mean'], 30.0)
+    np.testing.assert_allclose(rollup['first'], 30.0)
+    meter = read_rollup('1', freq, store_dir=constant_store)
+    np.testing.assert_array_equal(rollup['count'], 3 * meter['count'])
+    np.testing.assert_allclose(rollup['sum'], 3 * meter['sum'])
+
+
+@pytest.mark.parametrize('freq', GRAINS)
+def test_meter_rollup_matches_the_data(tmp_path, freq):
+    rng = np.random.default_rng(0)
+    series = constant(0).add(rng.uniform(0, 5, 4 * 24 * 90))
+    series[rng.random(len(series)) < 0.2] = np.nan
+    write_meters(str(tmp_path), {'1': series})
+
+    expected = rollup_series(read_meter('1', store_dir=str(tmp_path)).set_index('time')['number'], freq)
+    pd.testing.assert_frame_equal(read_rollup('1', freq, store_dir=str(tmp_path)), expected,
+                                  check_freq=False, check_dtype=False, check_names=False)
+
+
+@pytest.mark.parametrize('freq', ['H', '6H', 'D', 'W'])
+def test_entity_mean_is_the_sum_of_the_meter_means(tmp_path, freq):
+    rng = np.random.default_rng(1)
+    readings = {'1': constant(0).add(rng.uniform(0, 5, 4 * 24 * 90)),
+                '2': constant(0, start='2023-01-10', periods=4 * 24 * 30).add(rng.uniform(0, 5, 4 * 24 * 30))}
+    readings['1'][rng.random(len(readings['1'])) < 0.3] = np.nan
+    write_meters(str(tmp_path), readings)
+    write_entity_rollups({'Zone': ['1', '2']}, str(tmp_path))
+
+    # Summing the meters resampled to the grain, as the analyses did with pd.concat
+    expected = pd.concat([read_meter(meter_id, store_dir=str(tmp_path)).set_index('time')['number']
+                          .resample(freq).mean() for meter_id in readings], axis=1).sum(axis=1, min_count=1)
+    result = read_rollup('Zone', freq, stats=['mean'], store_dir=str(tmp_path), kind='entities')['mean']
+    pd.testing.assert_series_equal(result, expected, check_names=False, check_freq=False)
+
+    if freq != 'W':
+        # The same as the meter matrix of the meter rollups, where a meter without a value counts as 0
+        meter_matrix = build_meter_matrix(['1', '2'], str(tmp_path / "matrix"), freq=freq, interpolate=False,
+                                          loader=rollup_loader(freq, 'mean', str(tmp_path)))
+        pd.testing.assert_series_equal(result.fillna(0), meter_matrix.sum_meters(['1', '2']),
+                                       check_names=False, check_freq=False)
+
+
+def test_first_and_last_need_every_meter(tmp_path):
+    gap = constant(100)
+    gap['2023-01-05':'2023-01-06'] = np.nan
+    write_meters(str(tmp_path), {'1': constant(10), '2': gap})
+    write_entity_rollups({'Zone': ['1', '2']}, str(tmp_path))
+
+    daily = read_rollup('Zone', 'D', store_dir=str(tmp_path), kind='entities')
+    missing = daily.index.isin(pd.date_range('2023-01-05', '2023-01-06'))
+    assert daily.loc[missing, ['first', 'last']].isna().all().all()
+    np.testing.assert_allclose(daily.loc[~missing, 'first'], 110.0)
+    # The sums and means only lose the missing meter
+    np.testing.assert_allclose(daily.loc[missing, 'mean'], 10.0)
+
+
+def test_entity_rollups_follow_membership_and_freshness(tmp_path):
+    store_dir = str(tmp_path)
+    write_meters(store_dir, {'1': constant(10), '2': constant(20), '3': constant(30)})
+
+    assert write_entity_rollups({'Zone': ['1', '2']}, store_dir) == (1, 0)
+    assert entity_rollup_meters('Zone', 'daily', store_dir) == ['1', '2']
+    assert write_entity_rollups({'Zone': ['2', '1']}, store_dir) == (0, 1)
+
+    # A meter added to the entity in the graph makes the rollup stale
+    assert write_entity_rollups({'Zone': ['1', '2', '3']}, store_dir) == (1, 0)
+    np.testing.assert_allclose(read_rollup('Zone', 'D', store_dir=store_dir, kind='entities')['mean'], 60.0)
+
+    # Resampled data newer than the rollups: the meter rollup and the entity rollup are not used
+    write_meter(constant(40).rename('number').to_frame(), '3', store_dir=store_dir)
+    later = os.stat(rollup_path('Zone', 'daily', store_dir, kind='entities')).st_mtime + 10
+    os.utime(os.path.join(store_dir, '3.parquet'), (later, later))
+    assert not meter_rollup_is_fresh('3', 'daily', store_dir)
+    np.testing.assert_allclose(read_rollup('Zone', 'D', store_dir=store_dir, kind='entities')['mean'], 70.0)
+
+    # Once the meter rollups are rewritten, only the stale entity is written again
+    write_meter_rollups('3', store_dir)
+    for level in ('hourly', 'daily', 'monthly'):
+        os.utime(rollup_path('3', level, store_dir), (later + 10, later + 10))
+    assert write_entity_rollups({'Zone': ['1', '2', '3'], 'Other': ['1']}, store_dir) == (2, 0)
+    np.testing.assert_allclose(read_rollup('Zone', 'D', store_dir=store_dir, kind='entities')['mean'], 70.0)
+
+
+def test_missing_entity_rollup_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        read_rollup('Nowhere', 'D', store_dir=str(tmp_path), kind='entities')
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：test_service.py
+@Time: 10/25/2026 3:30 PM
+@Author: Mingchen Li
+"""
+import asyncio
+import json
+import shutil
+
+import numpy as np
+import pytest
+
+from meterbrick.aggregation import entity_meter_sets
+from meterbrick.rollup import ENTITY_THROUGH, write_entity_rollups, write_meter_rollups
+from meterbrick.service import QueryService
+from meterbrick.storage import write_meter
+from meterbrick.synthetic import campus_layout, write_campus_ttl, zone_raw_data
+from meterbrick.topology import load_topology
+
+# Meter without data in the store
+MISSING_METER = '10003'
+
+# Same relations as ENTITY_THROUGH in another order, so the entity rollups are not used
+MATRIX_THROUGH = ",".join(reversed(ENTITY_THROUGH))
+
+
+@pytest.fixture(scope='module')
+def service(tmp_path_factory):
+    """
+    Service of a campus of six zones with 20 days of data and the rollups of its entities.
+    """
+    out_dir = tmp_path_factory.mktemp("service")
+    layout = campus_layout(30, seed=0)
+    ttl_path = str(out_dir / "Campus_Metadata.ttl")
+    write_campus_ttl(layout, ttl_path)
+
+    store_dir = str(out_dir / "Resampled Data")
+    for i, zone in enumerate(layout):
+        for meter_id, data in zone_raw_data(zone, days=20, seed=i).items():
+            if meter_id == MISSING_METER:
+                continue
+            write_meter(data.drop_duplicates('time').set_index('time'), meter_id, store_dir=store_dir)
+            write_meter_rollups(meter_id, store_dir)
+    write_entity_rollups(entity_meter_sets(load_topology(ttl_path), through=ENTITY_THROUGH), store_dir)
+
+    service = QueryService(ttl_path, store_dir=store_dir, n_threads=2)
+    yield service
+    service.executor.shutdown()
+    shutil.rmtree(service.matrix_dir, ignore_errors=True)
+
+
+def request(service, target):
+    status, body = asyncio.run(service.respond(target))
+    return status, json.loads(body)
+
+
+@pytest.mark.parametrize('entity', ['Zone_0', 'Academic_Building', 'Academic_Building_GF'])
+@pytest.mark.parametrize('freq', ['H', '6H', 'D'])
+@pytest.mark.parametrize('window', ['', '&start=2022-01-05&end=2022-01-12 18:00'])
+def test_series_rollup_matches_matrix(service, entity, freq, window):
+    status, rollup = request(service, f"/series?entity={entity}&freq={freq}{window}")
+    assert status == 200
+    status, matrix = request(service, f"/series?entity={entity}&freq={freq}{window}&through={MATRIX_THROUGH}")
+    assert status == 200
+
+    assert rollup['meters'] == matrix['meters']
+    assert rollup['missing_meters'] == matrix['missing_meters']
+    assert rollup['time'] == matrix['time'] and len(rollup['time']) > 1
+    assert None not in rollup['values']
+    np.testing.assert_allclose(rollup['values'], matrix['values'])
+
+
+def test_series_missing_meter(service):
+    status, response = request(service, "/series?entity=Academic_Building_GF&freq=D")
+    assert status == 200
+    assert response['missing_meters'] == [f"Electrical_Meter_{MISSING_METER}"]
+
+
+def test_series_non_fixed_frequency(service):
+    status, rollup = request(service, "/series?entity=Zone_1&freq=W")
+    assert status == 200 and len(rollup['time']) >= 3
+    # Weeks cannot be put on the shared grid of the meters
+    status, response = request(service, f"/series?entity=Zone_1&freq=W&through={MATRIX_THROUGH}")
+    assert status == 400 and "only supported for entities with rollups" in response['error']
+
+
+def test_preload_raw_readings(service):
+    assert service.preload() == 29
+    # /series requests finer than an hour slice their window from the preloaded readings
+    reads = service.loader.reads
+    status, response = request(service, "/series?entity=Zone_2&freq=15T&start=2022-01-03&end=2022-01-04")
+    assert status == 200 and len(response['time']) == 97
+    assert service.loader.reads == reads
+    assert all(not interpolate for _, _, interpolate, _, _ in service.loader.cache)
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：test_storage.py
+@Time: 10/25/2026 10:00 AM
+@Author: Mingchen Li
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from meterbrick.storage import EXCEL_EXTENSION, meter_path, read_meter, write_meter
+
+
+def test_round_trip_keeps_values_and_dtypes(tmp_path):
+    data = pd.DataFrame({'number': [1.5, np.nan, 3.0]}, index=pd.date_range('2023-01-01', periods=3, freq='h'))
+    write_meter(data, '42', store_dir=str(tmp_path))
+
+    result = read_meter('Electrical_Meter_42', store_dir=str(tmp_path))
+    assert list(result.columns) == ['time', 'number']
+    assert result['time'].dtype.kind == 'M'
+    assert result['number'].dtype == np.float64
+    np.testing.assert_array_equal(result['time'].to_numpy(), data.index.to_numpy())
+    np.testing.assert_array_equal(result['number'].to_numpy(), data['number'].to_numpy())
+
+
+def test_column_projection(tmp_path):
+    data = pd.DataFrame({'number': [1.0, 2.0], 'other': [3.0, 4.0]},
+                        index=pd.date_range('2023-01-01', periods=2, freq='h'))
+    write_meter(data, '42', store_dir=str(tmp_path))
+
+    assert list(read_meter('42', columns=['number'], store_dir=str(tmp_path)).columns) == ['time', 'number']
+
+
+def test_excel_fallback(tmp_path):
+    data = pd.DataFrame({'time': pd.date_range('2023-01-01', periods=48, freq='h'),
+                         'number': np.arange(48)})
+    data.to_excel(meter_path('7', str(tmp_path), EXCEL_EXTENSION), index=False)
+
+    result = read_meter('7', store_dir=str(tmp_path))
+    assert result['time'].dtype.kind == 'M'
+    assert result['number'].dtype == np.float64
+    np.testing.assert_array_equal(result['number'].to_numpy(), np.arange(48))
+
+
+def test_missing_meter_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        read_meter('404', store_dir=str(tmp_path))
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+@Project ：HKUST_Meter_Brick
+@File    ：test_topology.py
+@Time: 10/25/2026 11:45 AM
+@Author: Mingchen Li
+"""
+import os
+
+from meterbrick.graph import CACHE_DIR_NAME, load_graph, snapshot_path, write_snapshot
+from meterbrick.manifest import file_hash
+from meterbrick.topology import TOPOLOGY_VERSION, TopologyIndex, load_topology
+
+TTL = """@prefix brick: <https://brickschema.org/schema/Brick#> .
+@prefix bldg: <urn:test#> .
+
+bldg:Building a brick:Building ; brick:hasPart bldg:Zone_1 .
+bldg:Zone_2 a brick:Zone ; brick:isPartOf bldg:Building .
+bldg:Zone_1 a brick:Zone ; brick:isMeteredBy bldg:Electrical_Meter_1 ;
+    brick:hasPart bldg:Electrical_Meter_2, bldg:Electrical_Meter_3, bldg:Light_1 .
+bldg:Electrical_Meter_1 a brick:Electrical_Meter .
+bldg:Electrical_Meter_2 a brick:Electrical_Meter ; brick:meters bldg:Light_1 .
+bldg:Electrical_Meter_3 a brick:Electrical_Meter .
+bldg:Light_1 a brick:Lighting ; brick:hasLocation bldg:Building_1F .
+"""
+
+
+def test_lookups_and_inverse_relations(tmp_path):
+    ttl_path = tmp_path / "Test_Metadata.ttl"
+    ttl_path.write_text(TTL, encoding="utf-8")
+    topology = TopologyIndex.from_graph(load_graph(str(ttl_path), use_cache=False))
+
+    assert topology.parts_of('Building') == ['Zone_1', 'Zone_2']
+    assert topology.part_of('urn:test#Zone_2') == ['Building']
+    assert topology.meters_of('Zone_1') == ['Electrical_Meter_1']
+    assert topology.meters_of('Light_1') == ['Electrical_Meter_2']
+    assert topology.metered_by('Electrical_Meter_2') == ['Light_1']
+    assert topology.located_at('Building_1F') == ['Light_1']
+    assert topology.locations_of('Light_1') == ['Building_1F']
+    assert topology.entities_of_type('Zone') == ['Zone_1', 'Zone_2']
+    assert topology.types_of('Light_1') == ['Lighting']
+    assert topology.submeters_of('Zone_1') == ['Electrical_Meter_2', 'Electrical_Meter_3']
+    assert topology.descendants('Building', ('hasPart',)) == [
+        'Building', 'Electrical_Meter_2', 'Electrical_Meter_3', 'Light_1', 'Zone_1', 'Zone_2']
+    assert topology.uri_of('Zone_1') == "urn:test#Zone_1"
+
+    # Unknown entities are not added to the index
+    assert topology.meters_of('Nowhere') == []
+    assert 'Nowhere' not in topology.forward['isMeteredBy']
+
+
+def test_matches_sparql(campus_ttl, campus_topology):
+    g = load_graph(campus_ttl, use_cache=False)
+    meters = {}
+    for zone, meter in g.query("SELECT ?zone ?meter WHERE { ?zone a brick:Zone ; brick:isMeteredBy ?meter . }"):
+        meters.setdefault(str(zone).split("#")[-1], []).append(str(meter).split("#")[-1])
+    assert meters
+    for zone, zone_meters in meters.items():
+        assert campus_topology.meters_of(zone) == sorted(zone_meters)
+
+
+def test_snapshot(tmp_path, campus_ttl):
+    ttl_path = str(tmp_path / "Campus_Metadata.ttl")
+    with open(campus_ttl, "rb") as source, open(ttl_path, "wb") as target:
+        target.write(source.read())
+    ttl_hash = file_hash(ttl_path)
+    # Snapshot of an older index layout
+    write_snapshot({}, ttl_path, ttl_hash, f"topology-v{TOPOLOGY_VERSION - 1}")
+
+    topology = load_topology(ttl_path)
+    path = snapshot_path(ttl_path, ttl_hash, f"topology-v{TOPOLOGY_VERSION}")
+    assert os.path.exists(path)
+    assert not os.path.exists(snapshot_path(ttl_path, ttl_hash, f"topology-v{TOPOLOGY_VERSION - 1}"))
+    # The graph snapshot is kept next to the topology
+    assert os.path.exists(snapshot_path(ttl_path, ttl_hash))
+    assert len(os.listdir(os.path.join(tmp_path, CACHE_DIR_NAME))) == 2
+
+    # Read back from the snapshot
+    os.utime(path, (0, 0))
+    cached = load_topology(ttl_path)
+    assert os.stat(path).st_mtime == 0
+    assert cached.forward == topology.forward and cached.types == topology.types